@@ -0,0 +1,730 @@
+# FlowFree/algoritmos_busqueda.py
+"""
+Motor de resolución automática de Flow Free.
+
+Todas las estrategias trabajan sobre EstadoBusqueda (ver tablero_juego.py) y generan
+sucesores igual: se elige el color sin terminar con menos movimientos posibles y se
+ramifica solo sobre los movimientos de ese color. Como todos los colores deben
+terminarse, el orden en que se extienden no cambia el conjunto de soluciones.
+
+Después de cada paso se consulta el Podador (poda.py) para descartar callejones.
+
+Punto de entrada: resolver(tablero, algoritmo, ...) -> ResultadoBusqueda.
+"""
+import importlib
+import os
+import threading
+import time
+
+from structures.structures import Stack, Queue, PriorityQueue
+from tablero_juego import TableroJuego, EstadoBusqueda, cargar_nivel_desde_archivo
+import heuristicas
+from poda import Podador
+from propagacion import Propagador
+from tabla_transposicion import TablaTransposicion
+from utilidades_metricas import METRICAS_NULAS
+
+try:
+    import resource
+    RESOURCE_DISPONIBLE = True
+except ImportError: # Windows
+    RESOURCE_DISPONIBLE = False
+
+
+def memoria_actual_mb():
+    """Memoria residente del proceso en MB, o None si no se puede medir."""
+    try:
+        with open('/proc/self/statm') as f:
+            paginas_residentes = int(f.read().split()[1])
+        return paginas_residentes * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    if RESOURCE_DISPONIBLE:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss está en KB en Linux y en bytes en macOS
+        return pico / (1024 * 1024) if os.uname().sysname == 'Darwin' else pico / 1024
+    return None
+
+
+class TokenCancelacion:
+    """
+    Cancelación cooperativa: el motor la consulta junto al resto del presupuesto
+    y termina con motivo 'cancelado'. Se puede cancelar desde cualquier hilo. Al
+    copiarse a otro proceso solo viaja su estado en ese momento.
+    """
+    def __init__(self):
+        self._evento = threading.Event()
+
+    def cancelar(self):
+        self._evento.set()
+
+    @property
+    def cancelado(self):
+        return self._evento.is_set()
+
+    def __getstate__(self):
+        return self.cancelado
+
+    def __setstate__(self, cancelado):
+        self._evento = threading.Event()
+        if cancelado:
+            self._evento.set()
+
+
+class Presupuesto:
+    """Límites de una búsqueda. None significa sin límite."""
+    def __init__(self, max_nodos=None, max_segundos=None, max_memoria_mb=None, cancelacion=None):
+        self.max_nodos = max_nodos
+        self.max_segundos = max_segundos
+        self.max_memoria_mb = max_memoria_mb
+        self.cancelacion = cancelacion # TokenCancelacion, o None
+
+    def cancelado(self):
+        return self.cancelacion is not None and self.cancelacion.cancelado
+
+    def __repr__(self):
+        return (f"Presupuesto(max_nodos={self.max_nodos}, max_segundos={self.max_segundos}, "
+                f"max_memoria_mb={self.max_memoria_mb}, cancelacion={self.cancelacion is not None})")
+
+
+class ResultadoBusqueda:
+    """
+    Resultado de una ejecución del motor.
+    - resuelto: True si se encontró una solución.
+    - caminos: {color: [(f, c), ...]} en el formato de TableroJuego.caminos, o None.
+    - motivo: 'solucion', 'agotado' (no hay solución), 'limite_nodos',
+      'limite_tiempo', 'limite_memoria', 'limite_recursion' (IDDFS/IDA* sin pila
+      de Python suficiente) o 'cancelado'.
+    - frontera_maxima: nodos que llegó a guardar la frontera; en IDDFS e IDA*, la
+      profundidad máxima de la pila de recursión.
+    - podas: {regla: veces que cortó} (ver poda.REGLAS).
+    - transposicion: estadísticas de la TablaTransposicion, si se usó una.
+    - propagacion: estadísticas del Propagador (decisiones_evitadas...), si se usó.
+    - desde_cache: True si la solución salió de una CacheSoluciones sin buscar.
+    - parcial: sin solución, los caminos del estado más avanzado que se expandió
+      (solo si la búsqueda tenía observador, ver resolucion_progresiva.py);
+      parcial_fin, lo que creció desde cada 'fin' (formato de TableroJuego.caminos_fin).
+    """
+    def __init__(self, algoritmo, resuelto, caminos, motivo, nodos_expandidos=0,
+                 nodos_generados=0, frontera_maxima=0, tiempo_segundos=0.0, memoria_pico_mb=None,
+                 podas=None, transposicion=None, propagacion=None, desde_cache=False, parcial=None,
+                 parcial_fin=None):
+        self.algoritmo = algoritmo
+        self.resuelto = resuelto
+        self.caminos = caminos
+        self.motivo = motivo
+        self.nodos_expandidos = nodos_expandidos
+        self.nodos_generados = nodos_generados
+        self.frontera_maxima = frontera_maxima
+        self.tiempo_segundos = tiempo_segundos
+        self.memoria_pico_mb = memoria_pico_mb
+        self.podas = podas or {}
+        self.transposicion = transposicion
+        self.propagacion = propagacion
+        self.desde_cache = desde_cache
+        self.parcial = parcial
+        self.parcial_fin = parcial_fin
+
+    def a_diccionario(self):
+        return {
+            'algoritmo': self.algoritmo,
+            'resuelto': self.resuelto,
+            'motivo': self.motivo,
+            'nodos_expandidos': self.nodos_expandidos,
+            'nodos_generados': self.nodos_generados,
+            'frontera_maxima': self.frontera_maxima,
+            'tiempo_segundos': self.tiempo_segundos,
+            'memoria_pico_mb': self.memoria_pico_mb,
+            'podas': dict(self.podas),
+            'transposicion': self.transposicion,
+            'propagacion': self.propagacion,
+            'desde_cache': self.desde_cache,
+            'caminos': ({color: [list(p) for p in ruta] for color, ruta in self.caminos.items()}
+                        if self.caminos else None),
+            'parcial': ({color: [list(p) for p in ruta] for color, ruta in self.parcial.items()}
+                        if self.parcial else None),
+            'parcial_fin': ({color: [list(p) for p in ruta] for color, ruta in self.parcial_fin.items()}
+                            if self.parcial_fin else None),
+        }
+
+    def __repr__(self):
+        return (f"ResultadoBusqueda({self.algoritmo}: {self.motivo}, expandidos={self.nodos_expandidos}, "
+                f"generados={self.nodos_generados}, frontera_max={self.frontera_maxima}, "
+                f"tiempo={self.tiempo_segundos:.3f}s)")
+
+
+class LimiteAlcanzado(Exception):
+    """Se lanza dentro del motor cuando se agota el presupuesto."""
+    def __init__(self, motivo):
+        super().__init__(motivo)
+        self.motivo = motivo
+
+
+class ContextoBusqueda:
+    """
+    Contadores, conjunto de cerrados y control de presupuesto de una ejecución.
+    Con 'observador' se guarda además el estado expandido más avanzado y se llama
+    a observador(ctx, estado) en cada comprobación de límites.
+    """
+    INTERVALO_COMPROBACION = 256 # Nodos entre comprobaciones de tiempo y memoria
+
+    def __init__(self, algoritmo, presupuesto=None, podador=None, tabla=None, metricas=None, propagador=None,
+                 observador=None):
+        self.algoritmo = algoritmo
+        self.presupuesto = presupuesto or Presupuesto()
+        self.podador = podador
+        self.propagador = propagador
+        self.tabla = tabla # TablaTransposicion de memoria acotada, o None para un set
+        self.metricas = metricas or METRICAS_NULAS
+        self.inicio = time.perf_counter()
+        self.nodos_expandidos = 0
+        self.nodos_generados = 0
+        self.frontera_maxima = 0
+        self.frontera_actual = 0
+        self.memoria_pico_mb = None
+        self.cerrados = set()
+        self.observador = observador
+        self.mejor_parcial = None # Copia del estado expandido con más pasos dados
+        self.mejor_avance = -1
+        self.puntos_control = None # PuntosControl de la búsqueda, si se guardan (ver puntos_control.py)
+        self.elegir_color = elegir_color
+        self.copiar = EstadoBusqueda.copiar
+        self.marcar_visto = marcar_visto # IDDFS/IDA*: sus vistos son de cada iteración, no 'cerrados'
+        if self.metricas.activo:
+            # Solo con métricas activas se sustituyen los pasos del bucle por versiones cronometradas
+            self.elegir_color = self.metricas.envolver('generacion', elegir_color)
+            self.copiar = self.metricas.envolver('copia', EstadoBusqueda.copiar)
+            self.es_nuevo = self.metricas.envolver('hash', self.es_nuevo)
+            self.marcar_visto = self.medir('hash', marcar_visto)
+            self.poda = self.metricas.envolver('poda', self.poda)
+            self.propagar = self.metricas.envolver('propagacion', self.propagar)
+
+    def medir(self, seccion, funcion):
+        """'funcion' cronometrada en 'seccion' si hay métricas activas; sin cambios si no."""
+        return self.metricas.envolver(seccion, funcion)
+
+    def contar_expansion(self, estado=None):
+        self.nodos_expandidos += 1
+        if self.observador is not None and estado is not None:
+            avance = pasos_dados(estado)
+            if avance > self.mejor_avance:
+                self.mejor_avance = avance
+                self.mejor_parcial = estado.copiar() # IDDFS/IDA* modifican el estado en el sitio
+        presupuesto = self.presupuesto
+        if presupuesto.max_nodos is not None and self.nodos_expandidos > presupuesto.max_nodos:
+            raise LimiteAlcanzado('limite_nodos')
+        if self.nodos_expandidos % self.INTERVALO_COMPROBACION == 0:
+            self.metricas.muestrear(self)
+            if self.observador is not None:
+                self.observador(self, estado)
+            self.comprobar_limites()
+
+    def comprobar_limites(self):
+        presupuesto = self.presupuesto
+        if presupuesto.cancelado():
+            raise LimiteAlcanzado('cancelado')
+        if presupuesto.max_segundos is not None and time.perf_counter() - self.inicio > presupuesto.max_segundos:
+            raise LimiteAlcanzado('limite_tiempo')
+        if presupuesto.max_memoria_mb is not None:
+            memoria = self._medir_memoria()
+            if memoria is not None and memoria > presupuesto.max_memoria_mb:
+                raise LimiteAlcanzado('limite_memoria')
+
+    def _medir_memoria(self):
+        memoria = memoria_actual_mb()
+        if memoria is not None and (self.memoria_pico_mb is None or memoria > self.memoria_pico_mb):
+            self.memoria_pico_mb = memoria
+        return memoria
+
+    def registrar_frontera(self, tamano):
+        self.frontera_actual = tamano
+        if tamano > self.frontera_maxima:
+            self.frontera_maxima = tamano
+
+    def es_nuevo(self, estado, profundidad=0):
+        """
+        Añade el estado a cerrados; devuelve False si ya se había visto.
+        'profundidad' (pasos que faltan) solo la usa la tabla de transposición.
+        """
+        if self.tabla is not None:
+            return self.tabla.visitar(estado.hash_zobrist, profundidad)
+        return marcar_visto(self.cerrados, estado.hash_zobrist)
+
+    def nuevos_vistos(self, estado):
+        """Conjunto de vistos vacío (salvo 'estado') para una iteración de IDDFS/IDA*."""
+        if self.tabla is not None:
+            self.tabla.limpiar()
+            self.tabla.visitar(estado.hash_zobrist)
+            return self.tabla
+        return {estado.hash_zobrist}
+
+    def resultado(self, estado_final, motivo):
+        self._medir_memoria()
+        resultado = ResultadoBusqueda(
+            self.algoritmo, estado_final is not None,
+            estado_final.caminos_por_color() if estado_final is not None else None,
+            motivo, self.nodos_expandidos, self.nodos_generados, self.frontera_maxima,
+            time.perf_counter() - self.inicio, self.memoria_pico_mb,
+            dict(self.podador.contadores) if self.podador else None,
+            self.tabla.estadisticas() if self.tabla is not None else None,
+            self.propagador.estadisticas() if self.propagador is not None else None,
+            parcial=(self.mejor_parcial.caminos_por_color()
+                     if estado_final is None and self.mejor_parcial is not None else None),
+            parcial_fin=(self.mejor_parcial.caminos_fin_por_color()
+                         if estado_final is None and self.mejor_parcial is not None else None))
+        self.metricas.registrar_resultado(resultado)
+        return resultado
+
+    def poda(self, estado, e, celda_anterior):
+        """True si el paso del extremo e desde 'celda_anterior' deja 'estado' en un callejón."""
+        return self.podador is not None and self.podador.es_callejon(estado, e, celda_anterior)
+
+    def propagar(self, estado):
+        """Aplica los movimientos forzados; (ok, rastro) como Propagador.propagar."""
+        if self.propagador is None:
+            return True, ()
+        return self.propagador.propagar(estado, self)
+
+
+def marcar_visto(vistos, huella, profundidad=0):
+    """Marca una huella en un set o en una TablaTransposicion; False si ya estaba."""
+    if isinstance(vistos, TablaTransposicion):
+        return vistos.visitar(huella, profundidad)
+    if huella in vistos:
+        return False
+    vistos.add(huella)
+    return True
+
+
+# --- Generación de sucesores ---
+
+def elegir_color(estado):
+    """
+    Devuelve (e, movimientos) del extremo más restringido entre los colores sin
+    terminar: cada color crece por sus dos cabezas (e = k desde 'inicio', e = k + n
+    desde 'fin') y se ramifica por la que tiene menos salidas.
+    Si algún extremo sin terminar no puede moverse devuelve (e, []): el nodo es un callejón.
+    Devuelve (None, []) si no quedan colores por terminar.
+    """
+    mejor_e, mejores = None, None
+    for e in range(len(estado.caminos)):
+        if estado.esta_completo(e):
+            continue
+        movimientos = estado.movimientos(e)
+        if len(movimientos) <= 1:
+            return e, movimientos
+        if mejores is None or len(movimientos) < len(mejores):
+            mejor_e, mejores = e, movimientos
+    return mejor_e, (mejores or [])
+
+
+def generar_sucesores(estado, ctx=None):
+    """Copias del estado con un paso más del color más restringido, sin los callejones."""
+    if ctx is None:
+        e, movimientos = elegir_color(estado)
+        copiar = EstadoBusqueda.copiar
+    else:
+        e, movimientos = ctx.elegir_color(estado)
+        copiar = ctx.copiar
+    if not movimientos:
+        return []
+    cabeza = estado.cabeza(e)
+    sucesores = []
+    for destino in movimientos:
+        hijo = copiar(estado)
+        hijo.extender(e, destino)
+        if ctx is not None:
+            ctx.nodos_generados += 1
+            if ctx.poda(hijo, e, cabeza) or not ctx.propagar(hijo)[0]:
+                continue
+        sucesores.append(hijo)
+    return sucesores
+
+
+def pasos_dados(estado):
+    return sum(len(camino) for camino in estado.caminos) - len(estado.caminos)
+
+
+# --- Fronteras ---
+
+class FronteraPila:
+    def __init__(self):
+        self.pila = Stack()
+    def meter(self, estado, g):
+        self.pila.push((estado, g))
+    def meter_hijos(self, hijos):
+        # Al revés para explorar primero el primer movimiento generado
+        for nodo in reversed(hijos):
+            self.pila.push(nodo)
+    def sacar(self):
+        return self.pila.pop()
+    def esta_vacia(self):
+        return self.pila.is_empty()
+    def tamano(self):
+        return self.pila.size()
+    def instantanea(self):
+        # En el orden en que hay que volver a meterlos
+        return list(self.pila.items)
+
+
+class FronteraCola:
+    def __init__(self):
+        self.cola = Queue()
+    def meter(self, estado, g):
+        self.cola.enqueue((estado, g))
+    def meter_hijos(self, hijos):
+        for nodo in hijos:
+            self.cola.enqueue(nodo)
+    def sacar(self):
+        return self.cola.dequeue()
+    def esta_vacia(self):
+        return self.cola.is_empty()
+    def tamano(self):
+        return self.cola.size()
+    def instantanea(self):
+        return list(self.cola.items)
+
+
+class FronteraPrioridad:
+    """Cola de prioridad ordenada por prioridad(estado, g); a igualdad, los nodos más profundos primero."""
+    def __init__(self, prioridad):
+        self.cola = PriorityQueue()
+        self.prioridad = prioridad
+    def meter(self, estado, g):
+        self.cola.add((estado, g), (self.prioridad(estado, g), -g))
+    def meter_hijos(self, hijos):
+        for estado, g in hijos:
+            self.meter(estado, g)
+    def sacar(self):
+        return self.cola.remove()
+    def esta_vacia(self):
+        return self.cola.is_empty()
+    def tamano(self):
+        return self.cola.size()
+    def instantanea(self):
+        # Entradas del montículo sin ordenar: ordenarlas es trabajo del que serializa
+        return list(self.cola.items)
+
+
+def busqueda_con_frontera(estado_inicial, ctx, frontera):
+    """Bucle común de BFS, DFS, voraz y A*. Devuelve el estado solución o None."""
+    g_inicial = pasos_dados(estado_inicial)
+    pasos_totales = g_inicial + heuristicas.pasos_restantes(estado_inicial)
+    puntos = ctx.puntos_control
+    if puntos is None or not puntos.reanudar(estado_inicial, ctx, frontera):
+        ctx.es_nuevo(estado_inicial, pasos_totales - g_inicial)
+        frontera.meter(estado_inicial, g_inicial)
+    if puntos is not None:
+        puntos.empezar(estado_inicial, ctx)
+    ctx.registrar_frontera(frontera.tamano())
+    while not frontera.esta_vacia():
+        if puntos is not None and ctx.nodos_expandidos >= puntos.proxima_comprobacion:
+            puntos.tal_vez_guardar(ctx, frontera)
+        estado, g = frontera.sacar()
+        if estado.esta_resuelto():
+            return estado
+        ctx.contar_expansion(estado)
+        hijos = []
+        for hijo in generar_sucesores(estado, ctx):
+            # Con propagación un hijo puede llevar varios pasos forzados además de la decisión
+            g_hijo = pasos_dados(hijo) if ctx.propagador is not None else g + 1
+            if ctx.es_nuevo(hijo, pasos_totales - g_hijo):
+                hijos.append((hijo, g_hijo))
+        frontera.meter_hijos(hijos)
+        ctx.registrar_frontera(frontera.tamano())
+    return None
+
+
+# --- Estrategias ---
+
+def bfs(estado, ctx, heuristica=None):
+    return busqueda_con_frontera(estado, ctx, FronteraCola())
+
+
+def dfs(estado, ctx, heuristica=None):
+    return busqueda_con_frontera(estado, ctx, FronteraPila())
+
+
+def voraz(estado, ctx, heuristica=None):
+    h = ctx.medir('heuristica', heuristica or heuristicas.ponderada)
+    return busqueda_con_frontera(estado, ctx, FronteraPrioridad(lambda e, g: h(e)))
+
+
+def a_estrella(estado, ctx, heuristica=None):
+    h = ctx.medir('heuristica', heuristica or heuristicas.pasos_restantes)
+    return busqueda_con_frontera(estado, ctx, FronteraPrioridad(lambda e, g: g + h(e)))
+
+
+def _dfs_limitada(estado, ctx, limite, vistos, profundidad=1):
+    """
+    DFS recursiva en el sitio (extender/deshacer) hasta 'limite' pasos más.
+    'profundidad' es el número de marcos en la pila, que se registra como frontera.
+    """
+    if estado.esta_resuelto():
+        return True
+    if limite == 0:
+        return False
+    ctx.contar_expansion(estado)
+    ctx.registrar_frontera(profundidad)
+    e, movimientos = ctx.elegir_color(estado)
+    cabeza = estado.cabeza(e) if movimientos else None
+    for destino in movimientos:
+        estado.extender(e, destino)
+        ctx.nodos_generados += 1
+        if estado.hash_zobrist not in vistos and not ctx.poda(estado, e, cabeza):
+            ok, rastro = ctx.propagar(estado)
+            if ok and ctx.marcar_visto(vistos, estado.hash_zobrist, limite):
+                if _dfs_limitada(estado, ctx, limite - 1, vistos, profundidad + 1):
+                    return True
+            Propagador.deshacer(estado, rastro)
+        estado.deshacer(e)
+    return False
+
+
+def iddfs(estado, ctx, heuristica=None):
+    """Profundización iterativa. Cada iteración usa su propio conjunto de vistos."""
+    estado = estado.copiar()
+    maximo = heuristicas.pasos_restantes(estado)
+    for limite in range(maximo + 1):
+        vistos = ctx.nuevos_vistos(estado)
+        if _dfs_limitada(estado, ctx, limite, vistos):
+            return estado
+    return None
+
+
+def _ida_estrella(estado, ctx, g, umbral, h, vistos, profundidad=1):
+    """Devuelve (True, _) si encuentra solución o (False, menor f que superó el umbral)."""
+    f = g + h(estado)
+    if f > umbral:
+        return False, f
+    if estado.esta_resuelto():
+        return True, f
+    ctx.contar_expansion(estado)
+    ctx.registrar_frontera(profundidad)
+    siguiente = float('inf')
+    e, movimientos = ctx.elegir_color(estado)
+    cabeza = estado.cabeza(e) if movimientos else None
+    for destino in movimientos:
+        estado.extender(e, destino)
+        ctx.nodos_generados += 1
+        if estado.hash_zobrist not in vistos and not ctx.poda(estado, e, cabeza):
+            ok, rastro = ctx.propagar(estado)
+            if ok and ctx.marcar_visto(vistos, estado.hash_zobrist, umbral - g):
+                encontrado, valor = _ida_estrella(estado, ctx, g + 1 + len(rastro), umbral, h, vistos,
+                                                  profundidad + 1)
+                if encontrado:
+                    return True, valor
+                siguiente = min(siguiente, valor)
+            Propagador.deshacer(estado, rastro)
+        estado.deshacer(e)
+    return False, siguiente
+
+
+def ida_estrella(estado, ctx, heuristica=None):
+    h = ctx.medir('heuristica', heuristica or heuristicas.pasos_restantes)
+    estado = estado.copiar()
+    g = pasos_dados(estado)
+    umbral = g + h(estado)
+    while umbral != float('inf'):
+        vistos = ctx.nuevos_vistos(estado)
+        encontrado, siguiente = _ida_estrella(estado, ctx, g, umbral, h, vistos)
+        if encontrado:
+            return estado
+        umbral = siguiente
+    return None
+
+
+def haz(estado, ctx, heuristica=None):
+    # Búsqueda en haz con evaluación por lotes; ver evaluacion_lotes.py
+    return importlib.import_module('evaluacion_lotes').busqueda_haz(estado, ctx, heuristica)
+
+
+ALGORITMOS = {
+    'bfs': bfs,
+    'dfs': dfs,
+    'iddfs': iddfs,
+    'voraz': voraz,
+    'a_estrella': a_estrella,
+    'ida_estrella': ida_estrella,
+    'haz': haz,
+}
+
+# Motores que no son búsqueda en el espacio de estados. Se importan bajo demanda
+# y reciben (tablero, presupuesto); devuelven el mismo ResultadoBusqueda. Respetan
+# la cancelación del presupuesto, pero no llaman al observador.
+MOTORES = {
+    'sat': ('solucionador_sat', 'resolver_sat'),
+    'carrera': ('carrera', 'resolver_en_carrera'),
+    'dfs_paralelo': ('dfs_paralelo', 'resolver_dfs_paralelo'),
+    'dlx': ('solucionador_dlx', 'resolver_dlx'),
+    'regiones': ('descomposicion', 'resolver_regiones'),
+}
+
+
+def nombres_algoritmos():
+    return list(ALGORITMOS) + list(MOTORES)
+
+
+def resolver(tablero, algoritmo='dfs', heuristica=None, presupuesto=None, podar=True,
+             tabla_transposicion=None, metricas=None, propagar=True, cache=None, observador=None,
+             puntos_control=None):
+    """
+    Resuelve un TableroJuego (o EstadoBusqueda) con la estrategia indicada.
+    'heuristica' puede ser una función o el nombre de una en heuristicas.HEURISTICAS.
+    'podar' activa la detección de callejones de poda.py tras cada paso.
+    'tabla_transposicion' (TablaTransposicion) sustituye al set de cerrados para
+    acotar su memoria.
+    'metricas' (utilidades_metricas.Metricas) recoge contadores y tiempos por sección;
+    de los motores externos solo se registran los totales del resultado.
+    'propagar' aplica los movimientos forzados (propagacion.py) tras cada decisión.
+    'cache' (cache_soluciones.CacheSoluciones) devuelve sin buscar la solución de un
+    nivel ya resuelto, aunque esté girado, reflejado o con otros colores; solo se usa
+    con un TableroJuego sin caminos empezados (ni desde el inicio ni desde el fin).
+    'observador' se llama como observador(ctx, estado) cada pocos cientos de nodos
+    (ver resolucion_progresiva.py, que lo usa para emitir eventos de progreso).
+    'puntos_control' (puntos_control.PuntosControl) guarda la búsqueda en disco cada
+    cierto tiempo y, si su archivo ya tiene un punto de la misma búsqueda, la
+    reanuda desde él. Solo para bfs, dfs, voraz y a_estrella.
+    """
+    usar_cache = (cache is not None and isinstance(tablero, TableroJuego)
+                  and all(len(ruta) <= 1 for ruta in tablero.caminos.values())
+                  and all(len(ruta) <= 1 for ruta in tablero.caminos_fin.values()))
+    if usar_cache:
+        inicio = time.perf_counter()
+        caminos = cache.buscar(tablero)
+        if caminos is not None and verificar_solucion(tablero, caminos):
+            resultado = ResultadoBusqueda(algoritmo, True, caminos, 'solucion',
+                                          tiempo_segundos=time.perf_counter() - inicio, desde_cache=True)
+            if metricas is not None:
+                metricas.registrar_resultado(resultado)
+            return resultado
+    resultado = _resolver(tablero, algoritmo, heuristica, presupuesto, podar, tabla_transposicion, metricas, propagar,
+                          observador, puntos_control)
+    if usar_cache and resultado.resuelto:
+        cache.guardar(tablero, resultado.caminos)
+    return resultado
+
+
+def _resolver(tablero, algoritmo, heuristica, presupuesto, podar, tabla_transposicion, metricas, propagar,
+              observador=None, puntos_control=None):
+    metricas = metricas or METRICAS_NULAS
+    metricas.iniciar()
+    if algoritmo in MOTORES:
+        modulo, funcion = MOTORES[algoritmo]
+        resultado = getattr(importlib.import_module(modulo), funcion)(tablero, presupuesto)
+        metricas.registrar_resultado(resultado)
+        return resultado
+    if algoritmo not in ALGORITMOS:
+        raise ValueError(f"Algoritmo desconocido '{algoritmo}'. Opciones: {', '.join(nombres_algoritmos())}")
+    if isinstance(heuristica, str):
+        heuristica = heuristicas.HEURISTICAS[heuristica]
+    if puntos_control is not None:
+        puntos_control.preparar(algoritmo, heuristica)
+    estado = tablero if isinstance(tablero, EstadoBusqueda) else EstadoBusqueda.desde_tablero(tablero)
+
+    ctx = ContextoBusqueda(algoritmo, presupuesto, Podador() if podar else None, tabla_transposicion, metricas,
+                           Propagador() if propagar else None, observador)
+    ctx.puntos_control = puntos_control
+    if ctx.podador is not None and ctx.podador.es_callejon(estado):
+        return ctx.resultado(None, 'agotado')
+    if ctx.propagador is not None:
+        estado = estado.copiar() # La propagación de la raíz no debe tocar el estado de quien llama
+        if not ctx.propagar(estado)[0]:
+            return ctx.resultado(None, 'agotado')
+    try:
+        solucion = ALGORITMOS[algoritmo](estado, ctx, heuristica)
+    except LimiteAlcanzado as limite:
+        return ctx.resultado(None, limite.motivo)
+    except RecursionError:
+        return ctx.resultado(None, 'limite_recursion')
+    finally:
+        if puntos_control is not None:
+            puntos_control.cerrar() # Espera a que se terminen de escribir los puntos pendientes
+    return ctx.resultado(solucion, 'solucion' if solucion is not None else 'agotado')
+
+
+def verificar_solucion(tablero, caminos):
+    """Comprueba que 'caminos' une cada par de extremos y llena el tablero sin cruces."""
+    if not caminos:
+        return False
+    ocupadas = set()
+    for color, detalles in tablero.pares_colores.items():
+        ruta = caminos.get(color)
+        if not ruta or tuple(ruta[0]) != detalles['inicio'] or tuple(ruta[-1]) != detalles['fin']:
+            return False
+        for i, (f, c) in enumerate(ruta):
+            if not tablero.es_posicion_valida(f, c) or (f, c) in ocupadas:
+                return False
+            base = tablero.cuadricula_base_con_paredes[f][c]
+            if base != TableroJuego.CARACTER_VACIO and base != color:
+                return False
+            if i > 0 and abs(f - ruta[i - 1][0]) + abs(c - ruta[i - 1][1]) != 1:
+                return False
+            ocupadas.add((f, c))
+    libres = sum(1 for fila in tablero.cuadricula_base_con_paredes for x in fila if x != TableroJuego.CARACTER_PARED)
+    return len(ocupadas) == libres
+
+
+def menu_algoritmos():
+    """Menú de la opción 2: carga un nivel, elige estrategia y muestra la solución."""
+    ruta_predeterminada = "Levels/ejemplo_con_pared.txt"
+    entrada_ruta = input(f"Ruta del nivel (Enter para '{ruta_predeterminada}'): ").strip()
+    ruta_archivo = entrada_ruta or ruta_predeterminada
+    tablero = cargar_nivel_desde_archivo(ruta_archivo)
+    if not tablero:
+        print(f"No se pudo cargar el nivel desde '{ruta_archivo}'.")
+        return
+
+    nombres = nombres_algoritmos()
+    print("\n--- ALGORITMOS ---")
+    for i, nombre in enumerate(nombres):
+        print(f"{i+1}. {nombre}")
+    eleccion = input(f"Elige un algoritmo (1-{len(nombres)}, Enter para dfs): ").strip()
+    if eleccion.isdigit() and 1 <= int(eleccion) <= len(nombres):
+        algoritmo = nombres[int(eleccion) - 1]
+    else:
+        algoritmo = 'dfs'
+    limite = input("Límite de tiempo en segundos (Enter para 60): ").strip()
+    presupuesto = Presupuesto(max_segundos=float(limite) if limite.replace('.', '', 1).isdigit() else 60.0)
+
+    titulo = f"Resolviendo '{os.path.basename(ruta_archivo)}' con {algoritmo}... (Ctrl+C para parar)"
+    # Importación diferida: resolucion_progresiva importa este módulo
+    from resolucion_progresiva import resolver_progresivo
+    from renderizador import Renderizador, mostrar_progreso
+    renderizador = Renderizador(tablero.cuadricula_base_con_paredes)
+    if renderizador.ansi:
+        # Tablero parcial en vivo: solo se reescriben las celdas que cambian entre eventos
+        eventos = resolver_progresivo(tablero, algoritmo, presupuesto=presupuesto, intervalo=1 / 30)
+        evento = mostrar_progreso(tablero, eventos, renderizador, titulo)
+    else:
+        print(f"\n{titulo}")
+        for evento in resolver_progresivo(tablero, algoritmo, presupuesto=presupuesto):
+            if evento.tipo == 'progreso':
+                print(f"\r  {evento.nodos_expandidos} nodos | profundidad {evento.profundidad} | "
+                      f"{evento.tiempo_segundos:.1f}s", end='', flush=True)
+    resultado = evento.resultado
+    print()
+    if resultado.resuelto:
+        tablero.caminos = resultado.caminos
+        tablero._actualizar_cuadricula_de_trabajo_desde_caminos()
+        if not renderizador.ansi: # Con ANSI ya está dibujado
+            tablero.mostrar_tablero_consola()
+        if algoritmo == 'carrera':
+            print(f"\nGanó la carrera: {resultado.algoritmo}")
+        print("\n¡Solución encontrada!")
+    else:
+        print(f"\nNo se encontró solución ({resultado.motivo}).")
+        if resultado.parcial and not renderizador.ansi:
+            tablero.caminos = resultado.parcial
+            tablero.caminos_fin = resultado.parcial_fin or tablero.caminos_fin
+            tablero._actualizar_cuadricula_de_trabajo_desde_caminos()
+            print("Mejor asignación parcial:")
+            tablero.mostrar_tablero_consola()
+    print(f"Nodos expandidos: {resultado.nodos_expandidos} | Generados: {resultado.nodos_generados} | "
+          f"Frontera máxima: {resultado.frontera_maxima} | Tiempo: {resultado.tiempo_segundos:.3f}s")
+    if resultado.propagacion:
+        print(f"Decisiones evitadas por movimientos forzados: {resultado.propagacion['decisiones_evitadas']}")
+
+
+if __name__ == "__main__":
+    print("Este módulo está diseñado para ser importado por main.py")
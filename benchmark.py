@@ -0,0 +1,266 @@
+# FlowFree/benchmark.py
+"""
+Benchmark reproducible de los motores sobre Levels/ con seguimiento de regresiones.
+
+Para cada par (nivel, configuración) se lanza un proceso nuevo que hace las
+ejecuciones de calentamiento y después las repeticiones medidas; cada ejecución
+carga el nivel de nuevo para no aprovechar cachés de la anterior. Se registran la
+mediana y el p95 del tiempo, los nodos expandidos y el pico de memoria (RSS del
+proceso hijo). Los micro-benchmarks miden por separado las operaciones de
+TableroJuego y de EstadoBusqueda y los contenedores de structures/.
+
+    python benchmark.py --salida bench.json
+    python benchmark.py --linea-base bench_base.json --umbral 0.15
+    python benchmark.py --solo-micro
+
+Con --linea-base se compara contra un resultado guardado y se marca como
+regresión cualquier medida que empeore más que el umbral (o un nivel que deja de
+resolverse). El código de salida es 1 si hay regresiones.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import timeit
+from concurrent.futures import ProcessPoolExecutor
+
+from tablero_juego import cargar_nivel_desde_archivo, EstadoBusqueda
+from algoritmos_busqueda import resolver, verificar_solucion, nombres_algoritmos, Presupuesto
+from tabla_transposicion import TablaTransposicion
+from lote_niveles import descubrir_niveles
+from utilidades_metricas import rss_pico_mb
+from structures import bench_structures
+
+NIVELES_POR_DEFECTO = ['Levels/5x5', 'Levels/7x7', 'Levels/15x15', 'Levels/ejemplo_con_pared.txt']
+ARCHIVO_SALIDA = 'benchmark_resultados.json'
+# La carrera reparte el tiempo entre otros motores que ya se miden por separado
+EXCLUIDOS_POR_DEFECTO = {'carrera'}
+
+
+def configuraciones():
+    """Nombre -> argumentos de resolver(). Un motor por algoritmo más variantes de la búsqueda."""
+    configs = {nombre: {'algoritmo': nombre} for nombre in nombres_algoritmos()
+               if nombre not in EXCLUIDOS_POR_DEFECTO}
+    configs['dfs_sin_poda'] = {'algoritmo': 'dfs', 'podar': False}
+    configs['dfs_tabla_64mb'] = {'algoritmo': 'dfs', 'tabla_mb': 64}
+    configs['a_estrella_paredes'] = {'algoritmo': 'a_estrella', 'heuristica': 'distancia_paredes'}
+    return configs
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    if not ordenados:
+        return None
+    i = min(len(ordenados) - 1, max(0, int(round(p / 100 * (len(ordenados) - 1)))))
+    return ordenados[i]
+
+
+def _una_ejecucion(ruta, config, timeout):
+    tablero = cargar_nivel_desde_archivo(ruta)
+    opciones = dict(config)
+    algoritmo = opciones.pop('algoritmo')
+    tabla_mb = opciones.pop('tabla_mb', None)
+    if tabla_mb:
+        opciones['tabla_transposicion'] = TablaTransposicion.con_memoria(tabla_mb)
+    inicio = time.perf_counter()
+    resultado = resolver(tablero, algoritmo, presupuesto=Presupuesto(max_segundos=timeout), **opciones)
+    tiempo = time.perf_counter() - inicio
+    return resultado, tiempo, resultado.resuelto and verificar_solucion(tablero, resultado.caminos)
+
+
+def medir_caso(ruta, nombre, config, repeticiones, calentamiento, timeout):
+    """Se ejecuta en un proceso propio: calentamiento + repeticiones medidas de un (nivel, config)."""
+    for _ in range(calentamiento):
+        _una_ejecucion(ruta, config, timeout)
+    tiempos, nodos, motivos, verificado = [], [], set(), True
+    for _ in range(repeticiones):
+        resultado, tiempo, correcto = _una_ejecucion(ruta, config, timeout)
+        tiempos.append(tiempo)
+        nodos.append(resultado.nodos_expandidos)
+        motivos.add(resultado.motivo)
+        verificado = verificado and (correcto or not resultado.resuelto)
+        if resultado.motivo.startswith('limite'):
+            break # Repetir un timeout no aporta nada
+    return {
+        'nivel': ruta,
+        'configuracion': nombre,
+        'resuelto': motivos == {'solucion'},
+        'motivos': sorted(motivos),
+        'verificado': verificado,
+        'repeticiones': len(tiempos),
+        'tiempo_mediana': statistics.median(tiempos),
+        'tiempo_p95': percentil(tiempos, 95),
+        'nodos_expandidos': int(statistics.median(nodos)),
+        'memoria_pico_mb': rss_pico_mb(),
+    }
+
+
+def benchmark_niveles(niveles, configs, repeticiones=5, calentamiento=1, timeout=10.0, trabajadores=1, avisar=print):
+    """Devuelve {'nivel|config': registro}. Con trabajadores > 1 los tiempos son menos fiables."""
+    resultados = {}
+    casos = [(ruta, nombre) for ruta in niveles for nombre in configs]
+    # max_tasks_per_child=1: cada caso arranca en un proceso limpio y su RSS pico es solo suyo
+    with ProcessPoolExecutor(max_workers=trabajadores, max_tasks_per_child=1) as pool:
+        futuros = [(ruta, nombre, pool.submit(medir_caso, ruta, nombre, configs[nombre],
+                                              repeticiones, calentamiento, timeout))
+                   for ruta, nombre in casos]
+        for ruta, nombre, futuro in futuros:
+            try:
+                registro = futuro.result()
+            except Exception as e:
+                registro = {'nivel': ruta, 'configuracion': nombre, 'resuelto': False,
+                            'motivos': ['error'], 'error': repr(e)}
+            resultados[f"{ruta}|{nombre}"] = registro
+            avisar(_linea_caso(registro))
+    return resultados
+
+
+def _linea_caso(r):
+    if 'tiempo_mediana' not in r:
+        return f"{r['configuracion']:<20} {r['nivel']:<32} error: {r.get('error')}"
+    return (f"{r['configuracion']:<20} {r['nivel']:<32} {'/'.join(r['motivos']):<14}"
+            f"{r['tiempo_mediana']:>9.3f}s {r['tiempo_p95']:>9.3f}s {r['nodos_expandidos']:>10} nodos"
+            f" {r['memoria_pico_mb'] or 0:>7.1f} MB")
+
+
+# --- Micro-benchmarks ---
+
+def _por_llamada(funcion):
+    """Segundos por llamada de 'funcion' (mejor de 3 tandas de al menos 0.2 s cada una)."""
+    temporizador = timeit.Timer(funcion)
+    numero, _ = temporizador.autorange()
+    return min(temporizador.repeat(3, numero)) / numero
+
+
+def _movimiento_valido(tablero):
+    for color in tablero.obtener_colores():
+        for direccion in ('arriba', 'abajo', 'izquierda', 'derecha'):
+            exito, _ = tablero.intentar_extender_camino(color, direccion)
+            if exito:
+                tablero.deshacer_ultimo_paso(color)
+                return color, direccion
+    return None, None
+
+
+def benchmark_micro(ruta_nivel='Levels/15x15/nivel_1.txt', tamano_contenedores=256_000):
+    """Nanosegundos por operación de las piezas que usa la búsqueda."""
+    tablero = cargar_nivel_desde_archivo(ruta_nivel)
+    estado = EstadoBusqueda.desde_tablero(tablero)
+    color, direccion = _movimiento_valido(tablero)
+
+    def extender_tablero():
+        tablero.intentar_extender_camino(color, direccion)
+        tablero.deshacer_ultimo_paso(color)
+
+    def extender_estado():
+        estado.intentar_extender_camino(color, direccion)
+        estado.deshacer_ultimo_paso(color)
+
+    medidas = {
+        'TableroJuego.generar_copia_profunda': _por_llamada(tablero.generar_copia_profunda),
+        'TableroJuego.__hash__': _por_llamada(tablero.__hash__),
+        'TableroJuego.intentar_extender_camino+deshacer': _por_llamada(extender_tablero),
+        'EstadoBusqueda.copiar': _por_llamada(estado.copiar),
+        'EstadoBusqueda.__hash__': _por_llamada(estado.__hash__),
+        'EstadoBusqueda.intentar_extender_camino+deshacer': _por_llamada(extender_estado),
+    }
+    micro = {nombre: segundos * 1e9 for nombre, segundos in medidas.items()}
+    for contenedor, n, _, ns in bench_structures.run(tamano_contenedores):
+        if n == max(bench_structures.sizes_up_to(tamano_contenedores)):
+            micro[f"structures.{contenedor}(n={n})"] = ns
+    return micro
+
+
+# --- Línea base ---
+
+def comparar(actual, base, umbral):
+    """Lista de textos con las regresiones de 'actual' respecto a 'base'."""
+    regresiones = []
+    for clave, registro in actual.get('niveles', {}).items():
+        anterior = base.get('niveles', {}).get(clave)
+        if not anterior:
+            continue
+        # Antes de mirar tiempos: un registro que falla (p. ej. con error) no tiene 'tiempo_mediana'
+        if anterior.get('resuelto') and not registro.get('resuelto'):
+            regresiones.append(f"{clave}: ya no se resuelve ({'/'.join(registro.get('motivos', ()))})")
+            continue
+        if not registro.get('resuelto') or 'tiempo_mediana' not in registro or 'tiempo_mediana' not in anterior:
+            continue
+        for medida in ('tiempo_mediana', 'tiempo_p95', 'nodos_expandidos', 'memoria_pico_mb'):
+            antes, ahora = anterior.get(medida), registro.get(medida)
+            if antes and ahora is not None and ahora > antes * (1 + umbral):
+                regresiones.append(f"{clave}: {medida} {antes:.4g} -> {ahora:.4g} (+{100 * (ahora / antes - 1):.0f}%)")
+    for nombre, ns in actual.get('micro', {}).items():
+        antes = base.get('micro', {}).get(nombre)
+        if antes and ns > antes * (1 + umbral):
+            regresiones.append(f"micro {nombre}: {antes:.0f} -> {ns:.0f} ns (+{100 * (ns / antes - 1):.0f}%)")
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de los motores de Flow Free.")
+    parser.add_argument('--niveles', nargs='+', default=NIVELES_POR_DEFECTO)
+    parser.add_argument('--configuraciones', default=None,
+                        help=f"lista separada por comas (por defecto todas): {', '.join(configuraciones())}")
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--calentamiento', type=int, default=1)
+    parser.add_argument('--timeout', type=float, default=10.0, help="segundos por ejecución")
+    parser.add_argument('--trabajadores', type=int, default=1,
+                        help="casos en paralelo (más de 1 acelera, pero los tiempos se interfieren)")
+    parser.add_argument('--salida', default=ARCHIVO_SALIDA)
+    parser.add_argument('--linea-base', default=None, help="JSON de una ejecución anterior con el que comparar")
+    parser.add_argument('--umbral', type=float, default=0.10, help="empeoramiento relativo que cuenta como regresión")
+    parser.add_argument('--sin-micro', action='store_true')
+    parser.add_argument('--solo-micro', action='store_true')
+    args = parser.parse_args(argv)
+
+    todas = configuraciones()
+    nombres = [c.strip() for c in args.configuraciones.split(',')] if args.configuraciones else list(todas)
+    desconocidas = [c for c in nombres if c not in todas]
+    if desconocidas:
+        parser.error(f"configuraciones desconocidas: {', '.join(desconocidas)}")
+
+    informe = {
+        'meta': {
+            'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'argumentos': vars(args),
+        },
+        'niveles': {},
+        'micro': {},
+    }
+    if not args.solo_micro:
+        niveles = descubrir_niveles(args.niveles)
+        print(f"{len(niveles)} niveles x {len(nombres)} configuraciones, "
+              f"{args.calentamiento} calentamiento + {args.repeticiones} repeticiones")
+        print(f"{'configuración':<20} {'nivel':<32} {'motivo':<14}{'mediana':>10} {'p95':>10}")
+        informe['niveles'] = benchmark_niveles(niveles, {n: todas[n] for n in nombres}, args.repeticiones,
+                                               args.calentamiento, args.timeout, args.trabajadores)
+    if not args.sin_micro:
+        print("\n--- Micro-benchmarks (ns por operación) ---")
+        informe['micro'] = benchmark_micro()
+        for nombre, ns in informe['micro'].items():
+            print(f"{nombre:<52}{ns:>12.0f}")
+
+    with open(args.salida, 'w') as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados en {args.salida}")
+
+    if args.linea_base:
+        with open(args.linea_base) as f:
+            base = json.load(f)
+        regresiones = comparar(informe, base, args.umbral)
+        if regresiones:
+            print(f"\n{len(regresiones)} regresiones respecto a {args.linea_base} (umbral {args.umbral:.0%}):")
+            for texto in regresiones:
+                print(f"  {texto}")
+            return 1
+        print(f"\nSin regresiones respecto a {args.linea_base}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+# FlowFree/cache_soluciones.py
+"""
+Caché de soluciones por forma canónica del nivel.
+
+Dos niveles que solo se diferencian en un giro, una simetría o los nombres de los
+colores tienen la misma solución salvo esa transformación. forma_canonica() prueba
+las 8 simetrías del cuadrado (diedral D4), renombra los colores por orden de
+aparición en cada una y se queda con la menor; la clave es el sha256 de esa forma.
+Las soluciones se guardan en coordenadas y colores canónicos y, al encontrarlas,
+se devuelven transformadas al nivel consultado (invirtiendo el camino de un color
+si su 'inicio' cae en el otro extremo).
+
+CacheSoluciones tiene dos niveles LRU: un OrderedDict en memoria y un directorio
+con un JSON por solución, limitado en número de entradas (la fecha de modificación
+hace de marca de último uso).
+"""
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+from tablero_juego import TableroJuego
+
+DIRECTORIO_CACHE = '.cache_soluciones'
+CODIGO_VACIO = 0
+CODIGO_PARED = 255
+
+# Inversa de cada transformación de transformar(): los giros de 90 y 270 grados se
+# deshacen entre sí y el resto son involuciones.
+INVERSA = (0, 3, 2, 1, 4, 5, 6, 7)
+
+
+def dimensiones(t, alto, ancho):
+    """Dimensiones del tablero tras la transformación t."""
+    return (ancho, alto) if t in (1, 3, 5, 7) else (alto, ancho)
+
+
+def transformar(t, f, c, alto, ancho):
+    """
+    Posición de (f, c) tras la transformación t de un tablero alto x ancho:
+    0 identidad, 1-3 giros de 90/180/270 grados, 4 espejo horizontal,
+    5 trasposición, 6 espejo vertical, 7 antitrasposición.
+    """
+    if t == 0: return f, c
+    if t == 1: return c, alto - 1 - f
+    if t == 2: return alto - 1 - f, ancho - 1 - c
+    if t == 3: return ancho - 1 - c, f
+    if t == 4: return f, ancho - 1 - c
+    if t == 5: return c, f
+    if t == 6: return alto - 1 - f, c
+    return ancho - 1 - c, alto - 1 - f
+
+
+def _codificar(filas, t):
+    """(bytes de la cuadrícula transformada con colores renombrados, {color: índice canónico})."""
+    alto, ancho = len(filas), len(filas[0])
+    nuevo_alto, nuevo_ancho = dimensiones(t, alto, ancho)
+    # Posición original de cada celda de la cuadrícula transformada
+    inversa = INVERSA[t]
+    codigos = bytearray(nuevo_alto * nuevo_ancho)
+    indices = {}
+    for f in range(nuevo_alto):
+        for c in range(nuevo_ancho):
+            of, oc = transformar(inversa, f, c, nuevo_alto, nuevo_ancho)
+            caracter = filas[of][oc]
+            if caracter == TableroJuego.CARACTER_PARED:
+                codigo = CODIGO_PARED
+            elif caracter == TableroJuego.CARACTER_VACIO:
+                codigo = CODIGO_VACIO
+            else:
+                if caracter not in indices:
+                    indices[caracter] = len(indices)
+                codigo = indices[caracter] + 1
+            codigos[f * nuevo_ancho + c] = codigo
+    return bytes([nuevo_alto, nuevo_ancho]) + bytes(codigos), indices
+
+
+def forma_canonica(tablero):
+    """
+    Devuelve (clave, t, indices): el sha256 hexadecimal de la forma canónica, la
+    transformación que lleva el tablero a ella y el renombrado {color: índice}.
+    """
+    filas = tablero.cuadricula_base_con_paredes
+    if len(filas) > 255 or len(filas[0]) > 255 or len(tablero.pares_colores) >= CODIGO_PARED:
+        raise ValueError("Nivel demasiado grande para la forma canónica.")
+    mejor = None
+    for t in range(8):
+        codigo, indices = _codificar(filas, t)
+        if mejor is None or codigo < mejor[0]:
+            mejor = (codigo, t, indices)
+    codigo, t, indices = mejor
+    return hashlib.sha256(codigo).hexdigest(), t, indices
+
+
+def a_canonica(tablero, caminos, t, indices):
+    """Caminos del tablero -> {índice canónico: [[f, c], ...]} en coordenadas canónicas."""
+    alto, ancho = tablero.alto, tablero.ancho
+    return {indices[color]: [list(transformar(t, f, c, alto, ancho)) for f, c in ruta]
+            for color, ruta in caminos.items()}
+
+
+def desde_canonica(tablero, canonicos, t, indices):
+    """Inversa de a_canonica: caminos en el formato de TableroJuego.caminos, desde cada 'inicio'."""
+    nuevo_alto, nuevo_ancho = dimensiones(t, tablero.alto, tablero.ancho)
+    inversa = INVERSA[t]
+    caminos = {}
+    for color, k in indices.items():
+        ruta = [transformar(inversa, f, c, nuevo_alto, nuevo_ancho) for f, c in canonicos[k]]
+        if ruta and ruta[0] != tablero.pares_colores[color]['inicio']:
+            ruta.reverse()
+        caminos[color] = ruta
+    return caminos
+
+
+class CacheSoluciones:
+    """
+    Caché LRU de soluciones en memoria (hasta 'max_memoria' niveles) respaldada
+    por 'directorio' (hasta 'max_disco' archivos). directorio=None la deja solo en memoria.
+    """
+    def __init__(self, directorio=DIRECTORIO_CACHE, max_memoria=1024, max_disco=10000):
+        self.directorio = directorio
+        self.max_memoria = max_memoria
+        self.max_disco = max_disco
+        self.memoria = OrderedDict() # clave -> caminos canónicos
+        self.aciertos_memoria = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+        self._en_disco = None # Número de archivos, contado la primera vez que hace falta
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave + '.json')
+
+    def buscar(self, tablero):
+        """Caminos (formato TableroJuego.caminos) de la solución guardada para 'tablero', o None."""
+        clave, t, indices = forma_canonica(tablero)
+        canonicos = self.memoria.get(clave)
+        if canonicos is not None:
+            self.memoria.move_to_end(clave)
+            self.aciertos_memoria += 1
+            return desde_canonica(tablero, canonicos, t, indices)
+        canonicos = self._leer_disco(clave)
+        if canonicos is None:
+            self.fallos += 1
+            return None
+        self.aciertos_disco += 1
+        self._guardar_memoria(clave, canonicos)
+        return desde_canonica(tablero, canonicos, t, indices)
+
+    def guardar(self, tablero, caminos):
+        clave, t, indices = forma_canonica(tablero)
+        canonicos = a_canonica(tablero, caminos, t, indices)
+        self._guardar_memoria(clave, canonicos)
+        self._escribir_disco(clave, canonicos)
+
+    def _guardar_memoria(self, clave, canonicos):
+        self.memoria[clave] = canonicos
+        self.memoria.move_to_end(clave)
+        while len(self.memoria) > self.max_memoria:
+            self.memoria.popitem(last=False)
+
+    def _leer_disco(self, clave):
+        if self.directorio is None:
+            return None
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta) as f:
+                datos = json.load(f)
+            os.utime(ruta) # Marca de último uso para el LRU
+        except (OSError, ValueError):
+            return None
+        return {int(k): ruta for k, ruta in datos['caminos'].items()}
+
+    def _escribir_disco(self, clave, canonicos):
+        if self.directorio is None:
+            return
+        ruta = self._ruta(clave)
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            nueva = not os.path.exists(ruta)
+            temporal = f"{ruta}.{os.getpid()}.tmp"
+            with open(temporal, 'w') as f:
+                json.dump({'caminos': canonicos}, f)
+            os.replace(temporal, ruta)
+        except OSError as e:
+            print(f"Aviso: no se pudo guardar la solución en caché ({e}).")
+            return
+        if self._en_disco is None:
+            self._en_disco = len(self._archivos())
+        elif nueva:
+            self._en_disco += 1
+        if self._en_disco > self.max_disco:
+            self._recortar_disco()
+
+    def _archivos(self):
+        try:
+            return [os.path.join(self.directorio, n) for n in os.listdir(self.directorio) if n.endswith('.json')]
+        except OSError:
+            return []
+
+    def _recortar_disco(self):
+        """Borra los archivos usados hace más tiempo hasta quedar en max_disco."""
+        archivos = []
+        for ruta in self._archivos():
+            try:
+                archivos.append((os.path.getmtime(ruta), ruta))
+            except OSError:
+                pass
+        archivos.sort()
+        sobrantes = len(archivos) - self.max_disco
+        for _, ruta in archivos[:max(0, sobrantes)]:
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+        self._en_disco = min(len(archivos), self.max_disco)
+
+    def estadisticas(self):
+        return {'aciertos_memoria': self.aciertos_memoria, 'aciertos_disco': self.aciertos_disco,
+                'fallos': self.fallos, 'en_memoria': len(self.memoria)}
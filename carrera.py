@@ -0,0 +1,133 @@
+# FlowFree/carrera.py
+"""
+Modo carrera: lanza varias estrategias sobre el mismo tablero en procesos
+separados, se queda con la primera solución verificada y mata al resto.
+
+Cada carrera actualiza un archivo JSON de estadísticas por estrategia (carreras
+corridas, victorias y tiempo medio de victoria) para poder ajustar el portafolio
+por defecto con portafolio_recomendado().
+"""
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import time
+
+from algoritmos_busqueda import resolver, verificar_solucion, Presupuesto, ResultadoBusqueda
+from tablero_juego import EstadoBusqueda
+
+PORTAFOLIO_POR_DEFECTO = ('dfs', 'voraz', 'sat')
+# Estrategias completas: su 'agotado' demuestra que el nivel no tiene solución.
+# El de cualquier otra se trata como un límite.
+ESTRATEGIAS_COMPLETAS = frozenset(('bfs', 'dfs', 'iddfs', 'voraz', 'a_estrella', 'ida_estrella',
+                                   'sat', 'dlx', 'regiones', 'dfs_paralelo', 'carrera'))
+ARCHIVO_ESTADISTICAS = 'estadisticas_carrera.json'
+
+
+def _corredor(tablero, algoritmo, presupuesto, cola):
+    """Cuerpo de cada proceso: resuelve y manda (algoritmo, resultado) a la cola."""
+    # Al terminarlo, que salgan los 'finally': dfs_paralelo y regiones cierran así sus propios procesos
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(1))
+    try:
+        cola.put((algoritmo, resolver(tablero, algoritmo, presupuesto=presupuesto)))
+    except Exception as e:
+        cola.put((algoritmo, ResultadoBusqueda(algoritmo, False, None, f'error: {e!r}')))
+
+
+def cargar_estadisticas(ruta=ARCHIVO_ESTADISTICAS):
+    try:
+        with open(ruta) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _registrar_carrera(ruta, participantes, ganador, tiempo):
+    if ruta is None:
+        return
+    estadisticas = cargar_estadisticas(ruta)
+    for algoritmo in participantes:
+        datos = estadisticas.setdefault(algoritmo, {'carreras': 0, 'victorias': 0, 'tiempo_victorias': 0.0})
+        datos['carreras'] += 1
+        if algoritmo == ganador:
+            datos['victorias'] += 1
+            datos['tiempo_victorias'] += tiempo
+    temporal = ruta + '.tmp'
+    with open(temporal, 'w') as f:
+        json.dump(estadisticas, f, indent=2, sort_keys=True)
+    os.replace(temporal, ruta)
+
+
+def portafolio_recomendado(n=3, ruta=ARCHIVO_ESTADISTICAS):
+    """Las n estrategias con mayor tasa de victorias; el portafolio por defecto si no hay datos."""
+    estadisticas = cargar_estadisticas(ruta)
+    if not estadisticas:
+        return list(PORTAFOLIO_POR_DEFECTO[:n])
+    orden = sorted(estadisticas, key=lambda a: estadisticas[a]['victorias'] / max(1, estadisticas[a]['carreras']),
+                   reverse=True)
+    return orden[:n]
+
+
+def resolver_en_carrera(tablero, presupuesto=None, estrategias=None, ruta_estadisticas=ARCHIVO_ESTADISTICAS):
+    """
+    Corre 'estrategias' en paralelo y devuelve el ResultadoBusqueda de la primera
+    solución verificada (con el tiempo total de la carrera). Si una estrategia de
+    ESTRATEGIAS_COMPLETAS demuestra 'agotado', la carrera termina con ese resultado;
+    si no, se espera al resto y se devuelve el primer límite recibido.
+    """
+    estrategias = list(estrategias or PORTAFOLIO_POR_DEFECTO)
+    presupuesto = presupuesto or Presupuesto()
+    # Las soluciones se verifican contra un TableroJuego, aunque llegue un EstadoBusqueda
+    referencia = tablero.a_tablero() if isinstance(tablero, EstadoBusqueda) else tablero
+    cola = multiprocessing.Queue()
+    procesos = {}
+    inicio = time.perf_counter()
+    for algoritmo in estrategias:
+        # No son daemon: dfs_paralelo y regiones lanzan sus propios procesos, y el 'finally' los termina
+        proceso = multiprocessing.Process(target=_corredor, args=(tablero, algoritmo, presupuesto, cola))
+        proceso.start()
+        procesos[algoritmo] = proceso
+
+    ganador = None
+    mejor = None
+    try:
+        restantes = len(procesos)
+        while restantes:
+            if presupuesto.cancelado():
+                mejor = ResultadoBusqueda('carrera', False, None, 'cancelado')
+                break
+            try:
+                algoritmo, resultado = cola.get(timeout=0.2)
+            except queue.Empty:
+                muertos = [a for a, p in procesos.items() if not p.is_alive() and p.exitcode not in (0, None)]
+                for a in muertos:
+                    # Un proceso que muere sin responder (p. ej. por falta de memoria) cuenta como terminado
+                    procesos.pop(a)
+                    restantes -= 1
+                continue
+            restantes -= 1
+            procesos.pop(algoritmo, None)
+            if resultado.resuelto and verificar_solucion(referencia, resultado.caminos):
+                ganador, mejor = algoritmo, resultado
+                break
+            if resultado.motivo == 'agotado':
+                if algoritmo in ESTRATEGIAS_COMPLETAS:
+                    mejor = resultado
+                    break
+                resultado.motivo = 'limite_incompleto' # No demuestra nada: pudo saltarse la solución
+            if mejor is None:
+                mejor = resultado
+    finally:
+        for proceso in procesos.values():
+            proceso.terminate()
+        for proceso in procesos.values():
+            proceso.join(timeout=1)
+
+    tiempo = time.perf_counter() - inicio
+    _registrar_carrera(ruta_estadisticas, estrategias, ganador, tiempo)
+    if mejor is None:
+        mejor = ResultadoBusqueda('carrera', False, None, 'error')
+    mejor.tiempo_segundos = tiempo
+    return mejor
@@ -0,0 +1,310 @@
+# FlowFree/descomposicion.py
+"""
+Descomposición del tablero en regiones independientes.
+
+Un camino sin terminar solo puede pasar por celdas vacías conectadas entre sí,
+así que va entero por una región vacía que toquen sus dos cabezas. Las paredes y
+los caminos ya trazados parten el tablero en regiones; agrupando las que comparte
+algún color quedan subproblemas que no tienen colores en común y se pueden
+resolver por separado: el espacio de búsqueda pasa del producto de los de cada
+subproblema a su suma.
+
+Cada subproblema es un TableroJuego recortado: sus regiones vacías, las cabezas
+de sus colores como extremos y paredes en todo lo demás. Sus soluciones se
+cosen a los caminos ya trazados con unir().
+
+- resolver_regiones(tablero, presupuesto): DFS que vuelve a descomponer en cada
+  nodo; en cuanto un estado se parte, resuelve cada parte por su lado (la más
+  pequeña primero) y si una no tiene solución descarta la rama entera. Está en
+  algoritmos_busqueda.MOTORES como 'regiones'.
+- resolver_por_regiones(tablero, algoritmo, presupuesto, procesos): descompone
+  solo el tablero de partida y resuelve los subproblemas con 'algoritmo', en un
+  multiprocessing.Pool si procesos > 1. Al primer subproblema sin solución se
+  terminan los demás.
+"""
+import multiprocessing
+import time
+
+from tablero_juego import TableroJuego, EstadoBusqueda
+from poda import Podador
+from propagacion import Propagador
+from algoritmos_busqueda import (ContextoBusqueda, LimiteAlcanzado, Presupuesto, ResultadoBusqueda, marcar_visto,
+                                 resolver)
+
+
+class Subproblema:
+    """
+    - tablero: TableroJuego recortado con las regiones y las cabezas de sus colores.
+    - desplazamiento: (fila, columna) de su esquina superior izquierda en el tablero original.
+    - colores: índices k de sus colores en el estado original.
+    - celdas: celdas vacías que tiene que llenar.
+    """
+    def __init__(self, tablero, desplazamiento, colores, celdas):
+        self.tablero = tablero
+        self.desplazamiento = desplazamiento
+        self.colores = colores
+        self.celdas = celdas
+
+    def __repr__(self):
+        return f"Subproblema(colores={len(self.colores)}, celdas={self.celdas}, desplazamiento={self.desplazamiento})"
+
+
+def _etiquetar_regiones(estado):
+    """(etiquetas, regiones): etiqueta 1..regiones de cada celda vacía, 0 en las demás."""
+    celdas = estado.celdas
+    vecinos = estado.nivel.vecinos
+    etiquetas = [0] * len(celdas)
+    regiones = 0
+    i = celdas.find(0)
+    while i != -1:
+        if not etiquetas[i]:
+            regiones += 1
+            etiquetas[i] = regiones
+            pila = [i]
+            while pila:
+                x = pila.pop()
+                for v in vecinos[x]:
+                    if celdas[v] == 0 and not etiquetas[v]:
+                        etiquetas[v] = regiones
+                        pila.append(v)
+        i = celdas.find(0, i + 1)
+    return etiquetas, regiones
+
+
+def descomponer(estado):
+    """
+    Lista de Subproblema independientes de 'estado' (EstadoBusqueda), o None si ya
+    se ve que no tiene solución: un color cuyas cabezas no comparten región ni son
+    vecinas, o una región que no puede llenar ningún color.
+    """
+    nivel = estado.nivel
+    vecinos = nivel.vecinos
+    celdas = estado.celdas
+    caminos = estado.caminos
+    n = len(nivel.colores)
+    etiquetas, regiones = _etiquetar_regiones(estado)
+
+    # Unión de regiones por los colores que pueden ir por más de una; el grupo de un
+    # color es el de cualquiera de sus regiones (o uno propio si sus cabezas se tocan y no comparten ninguna)
+    grupo = list(range(regiones + 1))
+    def raiz(r):
+        while grupo[r] != r:
+            grupo[r] = grupo[grupo[r]]
+            r = grupo[r]
+        return r
+
+    regiones_color = {}
+    for k in range(n):
+        cabeza, otra = caminos[k][-1], caminos[k + n][-1]
+        if cabeza == otra:
+            continue
+        comunes = ({etiquetas[v] for v in vecinos[cabeza] if celdas[v] == 0}
+                   & {etiquetas[v] for v in vecinos[otra] if celdas[v] == 0})
+        if not comunes and otra not in vecinos[cabeza]:
+            return None
+        regiones_color[k] = comunes
+        primera = min(comunes, default=None)
+        for r in comunes:
+            grupo[raiz(r)] = raiz(primera)
+
+    colores_grupo = {}
+    for k, comunes in regiones_color.items():
+        clave = raiz(min(comunes)) if comunes else -1 - k
+        colores_grupo.setdefault(clave, []).append(k)
+    celdas_grupo = {}
+    for i, etiqueta in enumerate(etiquetas):
+        if etiqueta:
+            celdas_grupo.setdefault(raiz(etiqueta), []).append(i)
+    if any(clave not in colores_grupo for clave in celdas_grupo):
+        return None
+    return [_recortar(estado, colores, celdas_grupo.get(clave, []))
+            for clave, colores in colores_grupo.items()]
+
+
+def _recortar(estado, colores, vacias):
+    nivel = estado.nivel
+    ancho = nivel.ancho
+    n = len(nivel.colores)
+    extremos = {}
+    for k in colores:
+        extremos[estado.caminos[k][-1]] = nivel.colores[k]
+        extremos[estado.caminos[k + n][-1]] = nivel.colores[k]
+    posiciones = [divmod(i, ancho) for i in list(extremos) + vacias]
+    f0 = min(f for f, _ in posiciones)
+    c0 = min(c for _, c in posiciones)
+    alto = max(f for f, _ in posiciones) - f0 + 1
+    ancho_sub = max(c for _, c in posiciones) - c0 + 1
+    filas = [[TableroJuego.CARACTER_PARED] * ancho_sub for _ in range(alto)]
+    for i in vacias:
+        f, c = divmod(i, ancho)
+        filas[f - f0][c - c0] = TableroJuego.CARACTER_VACIO
+    for i, color in extremos.items():
+        f, c = divmod(i, ancho)
+        filas[f - f0][c - c0] = color
+    return Subproblema(TableroJuego(["".join(fila) for fila in filas]), (f0, c0), colores, len(vacias))
+
+
+def unir(estado, subproblemas, soluciones):
+    """
+    Caminos completos ({color: [(f, c), ...]} de 'inicio' a 'fin') de 'estado' con la
+    solución de cada subproblema (sus caminos, en coordenadas del tablero recortado).
+    """
+    nivel = estado.nivel
+    ancho = nivel.ancho
+    n = len(nivel.colores)
+    caminos = estado.caminos_por_color()
+    for subproblema, solucion in zip(subproblemas, soluciones):
+        f0, c0 = subproblema.desplazamiento
+        for k in subproblema.colores:
+            color = nivel.colores[k]
+            tramo = [(f + f0) * ancho + c + c0 for f, c in solucion[color]]
+            desde_inicio, desde_fin = estado.caminos[k], estado.caminos[k + n]
+            if tramo[0] != desde_inicio[-1]:
+                tramo.reverse()
+            caminos[color] = [divmod(i, ancho) for i in desde_inicio + tramo[1:-1] + desde_fin[::-1]]
+    return caminos
+
+
+# --- Descomposición dinámica ---
+
+def _buscar(estado, ctx, vistos, descomponer_aqui=True):
+    """
+    DFS desde un estado ya podado y propagado; devuelve sus caminos completos o None.
+    'descomponer_aqui' es False si al llegar a 'estado' el Podador no volvió a
+    etiquetar regiones: entonces no cambiaron y se divide igual que su padre.
+    """
+    if estado.esta_resuelto():
+        return estado.caminos_por_color()
+    ctx.contar_expansion(estado)
+    subproblemas = descomponer(estado) if descomponer_aqui else None
+    if descomponer_aqui and subproblemas is None:
+        return None
+    if subproblemas is not None and len(subproblemas) > 1:
+        subproblemas.sort(key=lambda subproblema: subproblema.celdas)
+        soluciones = []
+        for subproblema in subproblemas:
+            solucion = _resolver_subproblema(subproblema, ctx)
+            if solucion is None:
+                return None # Sin esta parte no hay solución para ninguna combinación de las demás
+            soluciones.append(solucion)
+        return unir(estado, subproblemas, soluciones)
+
+    e, movimientos = ctx.elegir_color(estado)
+    cabeza = estado.cabeza(e) if movimientos else None
+    for destino in movimientos:
+        hijo = ctx.copiar(estado)
+        hijo.extender(e, destino)
+        ctx.nodos_generados += 1
+        completas = ctx.podador.comprobaciones_completas
+        if ctx.poda(hijo, e, cabeza) or not ctx.propagar(hijo)[0]:
+            continue
+        if marcar_visto(vistos, hijo.hash_zobrist):
+            caminos = _buscar(hijo, ctx, vistos, ctx.podador.comprobaciones_completas != completas)
+            if caminos is not None:
+                return caminos
+    return None
+
+
+def _resolver_subproblema(subproblema, ctx):
+    estado = EstadoBusqueda.desde_tablero(subproblema.tablero)
+    if ctx.podador.es_callejon(estado):
+        return None
+    if not ctx.propagar(estado)[0]:
+        return None
+    # Cada tablero recortado tiene sus propias claves Zobrist: sus vistos no se mezclan con los del padre
+    return _buscar(estado, ctx, {estado.hash_zobrist})
+
+
+def resolver_regiones(tablero, presupuesto=None):
+    """DFS que resuelve por separado las partes independientes en que se va dividiendo el tablero."""
+    estado = tablero if isinstance(tablero, EstadoBusqueda) else EstadoBusqueda.desde_tablero(tablero)
+    ctx = ContextoBusqueda('regiones', presupuesto, Podador(), propagador=Propagador())
+    if ctx.podador.es_callejon(estado):
+        return ctx.resultado(None, 'agotado')
+    estado = estado.copiar()
+    if not ctx.propagar(estado)[0]:
+        return ctx.resultado(None, 'agotado')
+    try:
+        caminos = _buscar(estado, ctx, {estado.hash_zobrist})
+    except LimiteAlcanzado as limite:
+        return ctx.resultado(None, limite.motivo)
+    except RecursionError:
+        return ctx.resultado(None, 'limite_recursion')
+    if caminos is None:
+        return ctx.resultado(None, 'agotado')
+    nivel = estado.nivel
+    final = EstadoBusqueda.desde_caminos(nivel, [[f * nivel.ancho + c for f, c in caminos[color]]
+                                                 for color in nivel.colores])
+    return ctx.resultado(final, 'solucion')
+
+
+# --- Descomposición estática ---
+
+def _resolver_en_proceso(argumentos):
+    indice, tablero, algoritmo, presupuesto, limite = argumentos
+    if limite is not None:
+        # time.time() y no perf_counter: el plazo se comparte entre procesos
+        presupuesto = Presupuesto(presupuesto.max_nodos, max(0.0, limite - time.time()),
+                                  presupuesto.max_memoria_mb, presupuesto.cancelacion)
+    return indice, resolver(tablero, algoritmo, presupuesto=presupuesto)
+
+
+def resolver_por_regiones(tablero, algoritmo='regiones', presupuesto=None, procesos=None):
+    """
+    Descompone 'tablero' y resuelve cada subproblema con 'algoritmo' (en 'procesos'
+    procesos si es más de uno). Los contadores del resultado son la suma de los de
+    los subproblemas; 'max_nodos' y 'max_segundos' valen para cada subproblema.
+    """
+    inicio = time.perf_counter()
+    presupuesto = presupuesto or Presupuesto()
+    estado = tablero if isinstance(tablero, EstadoBusqueda) else EstadoBusqueda.desde_tablero(tablero)
+    nombre = f'regiones:{algoritmo}'
+    subproblemas = descomponer(estado)
+    if subproblemas is None:
+        return ResultadoBusqueda(nombre, False, None, 'agotado', tiempo_segundos=time.perf_counter() - inicio)
+    limite = time.time() + presupuesto.max_segundos if presupuesto.max_segundos is not None else None
+    # Los más grandes primero: son los que más tardan y los que suelen fallar
+    orden = sorted(range(len(subproblemas)), key=lambda i: -subproblemas[i].celdas)
+    tareas = [(i, subproblemas[i].tablero, algoritmo, presupuesto, limite) for i in orden]
+
+    resultados = [None] * len(subproblemas)
+    fallo = None
+    pool = None
+    if procesos is not None and procesos > 1 and len(tareas) > 1:
+        pool = multiprocessing.Pool(min(procesos, len(tareas)))
+        pendientes = pool.imap_unordered(_resolver_en_proceso, tareas)
+    else:
+        pendientes = map(_resolver_en_proceso, tareas)
+    try:
+        for _ in tareas:
+            while True:
+                if presupuesto.cancelado():
+                    fallo = ResultadoBusqueda(nombre, False, None, 'cancelado')
+                    break
+                try:
+                    i, resultado = pendientes.next(timeout=0.2) if pool is not None else next(pendientes)
+                    break
+                except multiprocessing.TimeoutError:
+                    continue
+            if fallo is not None:
+                break
+            resultados[i] = resultado
+            if not resultado.resuelto:
+                fallo = resultado
+                break
+    finally:
+        if pool is not None:
+            pool.terminate() # Con un subproblema sin solución sobran los que sigan en marcha
+            pool.join()
+
+    hechos = [resultado for resultado in resultados if resultado is not None]
+    podas = {}
+    for resultado in hechos:
+        for regla, veces in resultado.podas.items():
+            podas[regla] = podas.get(regla, 0) + veces
+    caminos = unir(estado, subproblemas, [r.caminos for r in resultados]) if fallo is None else None
+    return ResultadoBusqueda(
+        nombre, fallo is None, caminos, 'solucion' if fallo is None else fallo.motivo,
+        sum(r.nodos_expandidos for r in hechos), sum(r.nodos_generados for r in hechos),
+        max((r.frontera_maxima for r in hechos), default=0), time.perf_counter() - inicio,
+        max((r.memoria_pico_mb for r in hechos if r.memoria_pico_mb is not None), default=None), podas)
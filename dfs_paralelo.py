@@ -0,0 +1,277 @@
+# FlowFree/dfs_paralelo.py
+"""
+DFS paralela con reparto de trabajo bajo demanda para un solo nivel difícil.
+
+1. El proceso principal expande los primeros niveles del árbol (con la misma
+   generación de sucesores y poda que algoritmos_busqueda) hasta tener varios
+   subproblemas por trabajador.
+2. Cada subproblema es la lista de pasos (extremo, celda) desde la raíz, codificada
+   en bytes: los trabajadores reconstruyen el tablero sobre su propia copia de la
+   raíz, que reciben una sola vez al arrancar.
+3. Cada trabajador hace DFS en el sitio (extender/deshacer) con una pila explícita,
+   aplicando los movimientos forzados de propagacion.py tras cada decisión.
+   Si hay trabajadores ociosos, el que está ocupado corta las alternativas sin
+   explorar de su marco más superficial y las publica como subproblemas nuevos.
+4. Un contador compartido de subproblemas pendientes detecta el final sin solución.
+   Si un trabajador falla o muere sin informar, su subproblema queda sin explorar
+   y el resultado es 'error', nunca 'agotado'.
+"""
+import multiprocessing
+import os
+import queue
+import time
+from array import array
+
+from tablero_juego import EstadoBusqueda
+from poda import Podador
+from propagacion import Propagador
+from algoritmos_busqueda import (ContextoBusqueda, LimiteAlcanzado, Presupuesto, elegir_color,
+                                 generar_sucesores)
+
+SUBPROBLEMAS_POR_TRABAJADOR = 4
+INTERVALO_REPARTO = 64 # Nodos entre comprobaciones de trabajadores ociosos
+
+
+def codificar_movimientos(movimientos):
+    datos = array('H')
+    for k, destino in movimientos:
+        datos.append(k)
+        datos.append(destino)
+    return datos.tobytes()
+
+
+def decodificar_movimientos(datos):
+    plano = array('H')
+    plano.frombytes(datos)
+    return list(zip(plano[0::2], plano[1::2]))
+
+
+def dividir_raiz(estado, ctx, minimo):
+    """
+    Expande en anchura desde la raíz hasta tener al menos 'minimo' subproblemas.
+    Devuelve (solucion, subproblemas): solucion es un estado resuelto o None;
+    subproblemas, listas de (e, destino) que incluyen los pasos forzados.
+    """
+    frontera = [(estado, [])]
+    while frontera and len(frontera) < minimo:
+        siguiente = []
+        for actual, movimientos in frontera:
+            if actual.esta_resuelto():
+                return actual, []
+            ctx.contar_expansion()
+            for hijo in generar_sucesores(actual, ctx):
+                if ctx.es_nuevo(hijo):
+                    siguiente.append((hijo, movimientos + hijo.pasos_desde(actual)))
+        if not siguiente:
+            break
+        frontera = siguiente
+    for actual, _ in frontera:
+        if actual.esta_resuelto():
+            return actual, []
+    return None, [movimientos for _, movimientos in frontera]
+
+
+class _Compartido:
+    """Objetos compartidos entre el proceso principal y los trabajadores."""
+    def __init__(self):
+        self.tareas = multiprocessing.Queue()
+        self.resultados = multiprocessing.Queue()
+        self.parar = multiprocessing.Event()
+        self.pendientes = multiprocessing.Value('i', 0)
+        self.ociosos = multiprocessing.Value('i', 0)
+
+    def publicar(self, movimientos):
+        with self.pendientes.get_lock():
+            self.pendientes.value += 1
+        self.tareas.put(codificar_movimientos(movimientos))
+
+    def terminar_tarea(self):
+        with self.pendientes.get_lock():
+            self.pendientes.value -= 1
+            return self.pendientes.value
+
+
+def _explorar(estado, ctx, movimientos_tarea, vistos, compartido):
+    """DFS en el sitio desde el estado de la tarea. True si deja 'estado' resuelto."""
+    if estado.esta_resuelto():
+        return True
+    ctx.contar_expansion()
+    k, opciones = elegir_color(estado)
+    pila = [[k, opciones, 0, estado.cabeza(k) if opciones else None]]
+    tomados = [] # Por marco, la decisión y sus pasos forzados: [(e, destino), ...]
+    while pila:
+        marco = pila[-1]
+        k, opciones, indice, cabeza = marco
+        if indice >= len(opciones):
+            pila.pop()
+            if tomados:
+                for k_paso, _ in reversed(tomados.pop()):
+                    estado.deshacer(k_paso)
+            continue
+        marco[2] = indice + 1
+        destino = opciones[indice]
+        estado.extender(k, destino)
+        ctx.nodos_generados += 1
+        if estado.hash_zobrist in vistos or ctx.poda(estado, k, cabeza):
+            estado.deshacer(k)
+            continue
+        ok, rastro = ctx.propagar(estado)
+        if not ok or estado.hash_zobrist in vistos:
+            Propagador.deshacer(estado, rastro)
+            estado.deshacer(k)
+            continue
+        vistos.add(estado.hash_zobrist)
+        tomados.append([(k, destino)] + Propagador.pasos(estado, rastro))
+        if estado.esta_resuelto():
+            return True
+        ctx.contar_expansion()
+        if ctx.nodos_expandidos % INTERVALO_REPARTO == 0:
+            if compartido.parar.is_set():
+                return False
+            if compartido.ociosos.value > 0:
+                _donar(pila, tomados, movimientos_tarea, compartido)
+        k, opciones = elegir_color(estado)
+        pila.append([k, opciones, 0, estado.cabeza(k) if opciones else None])
+    return False
+
+
+def _donar(pila, tomados, movimientos_tarea, compartido):
+    """Publica las alternativas sin explorar del marco más superficial que tenga alguna."""
+    for profundidad, marco in enumerate(pila):
+        k, opciones, indice, _ = marco
+        if indice < len(opciones):
+            prefijo = movimientos_tarea + [paso for grupo in tomados[:profundidad] for paso in grupo]
+            for destino in opciones[indice:]:
+                compartido.publicar(prefijo + [(k, destino)])
+            marco[1] = opciones[:indice]
+            return
+
+
+def _trabajador(tablero, presupuesto, compartido):
+    raiz = EstadoBusqueda.desde_tablero(tablero)
+    ctx = ContextoBusqueda('dfs_paralelo', presupuesto, Podador(), propagador=Propagador())
+    vistos = set()
+    ocioso = False
+    en_curso = False # Hay un subproblema contado en 'pendientes' que aún no se ha terminado
+    try:
+        while not compartido.parar.is_set():
+            try:
+                datos = compartido.tareas.get(timeout=0.05)
+            except queue.Empty:
+                if not ocioso:
+                    ocioso = True
+                    with compartido.ociosos.get_lock():
+                        compartido.ociosos.value += 1
+                if compartido.pendientes.value == 0:
+                    break
+                continue
+            if ocioso:
+                ocioso = False
+                with compartido.ociosos.get_lock():
+                    compartido.ociosos.value -= 1
+            en_curso = True
+            movimientos = decodificar_movimientos(datos)
+            estado = raiz.copiar()
+            for k, destino in movimientos:
+                estado.extender(k, destino)
+            if _explorar(estado, ctx, movimientos, vistos, compartido):
+                compartido.resultados.put(('solucion', estado.caminos, _estadisticas(ctx)))
+                compartido.parar.set()
+                return
+            en_curso = False
+            if compartido.terminar_tarea() == 0:
+                compartido.parar.set()
+    except LimiteAlcanzado as limite:
+        compartido.resultados.put(('limite', limite.motivo, _estadisticas(ctx)))
+        compartido.parar.set()
+        return
+    except BaseException as e:
+        # Sin esto el subproblema seguiría pendiente y los demás esperarían para siempre
+        if en_curso:
+            compartido.terminar_tarea()
+        compartido.resultados.put(('error', repr(e), _estadisticas(ctx)))
+        compartido.parar.set()
+        return
+    compartido.resultados.put(('fin', None, _estadisticas(ctx)))
+
+
+def _estadisticas(ctx):
+    return (ctx.nodos_expandidos, ctx.nodos_generados, dict(ctx.podador.contadores),
+            ctx.propagador.estadisticas())
+
+
+def resolver_dfs_paralelo(tablero, presupuesto=None, trabajadores=None):
+    """Resuelve un nivel repartiendo la DFS entre 'trabajadores' procesos (uno por núcleo por defecto)."""
+    trabajadores = trabajadores or os.cpu_count() or 1
+    presupuesto = presupuesto or Presupuesto()
+    estado = tablero if isinstance(tablero, EstadoBusqueda) else EstadoBusqueda.desde_tablero(tablero)
+    ctx = ContextoBusqueda('dfs_paralelo', presupuesto, Podador(), propagador=Propagador())
+    if ctx.podador.es_callejon(estado):
+        return ctx.resultado(None, 'agotado')
+    estado = estado.copiar()
+    if not ctx.propagar(estado)[0]:
+        return ctx.resultado(None, 'agotado')
+    tablero = estado.a_tablero() # Los trabajadores parten de la raíz ya propagada
+    try:
+        solucion, subproblemas = dividir_raiz(estado, ctx, SUBPROBLEMAS_POR_TRABAJADOR * trabajadores)
+    except LimiteAlcanzado as limite:
+        return ctx.resultado(None, limite.motivo)
+    if solucion is not None or not subproblemas:
+        return ctx.resultado(solucion, 'solucion' if solucion is not None else 'agotado')
+
+    compartido = _Compartido()
+    for movimientos in subproblemas:
+        compartido.publicar(movimientos)
+    procesos = [multiprocessing.Process(target=_trabajador, args=(tablero, presupuesto, compartido), daemon=True)
+                for _ in range(trabajadores)]
+    for proceso in procesos:
+        proceso.start()
+
+    final, motivo = None, 'agotado'
+    informes = 0
+    try:
+        while informes < trabajadores:
+            if presupuesto.max_segundos is not None and time.perf_counter() - ctx.inicio > presupuesto.max_segundos:
+                motivo = 'limite_tiempo'
+                break
+            if presupuesto.cancelado():
+                # Los trabajadores tienen una copia del token: se les para con 'parar'
+                motivo = 'cancelado'
+                break
+            try:
+                tipo, dato, (expandidos, generados, podas, propagacion) = compartido.resultados.get(timeout=0.1)
+            except queue.Empty:
+                # Uno que muere sin informar (p. ej. matado por falta de memoria) deja trabajo sin hacer
+                if (not any(p.is_alive() for p in procesos)
+                        or any(p.exitcode not in (0, None) for p in procesos)):
+                    motivo = 'error'
+                    break
+                continue
+            informes += 1
+            ctx.nodos_expandidos += expandidos
+            ctx.nodos_generados += generados
+            for regla, veces in podas.items():
+                ctx.podador.contadores[regla] += veces
+            ctx.propagador.decisiones_evitadas += propagacion['decisiones_evitadas']
+            ctx.propagador.conflictos += propagacion['conflictos']
+            for regla in ctx.propagador.contadores:
+                ctx.propagador.contadores[regla] += propagacion[regla]
+            if tipo == 'solucion':
+                final = EstadoBusqueda.desde_caminos(estado.nivel, dato)
+                motivo = 'solucion'
+                break
+            if tipo == 'limite':
+                motivo = dato
+                break
+            if tipo == 'error':
+                print(f"Aviso: un trabajador de dfs_paralelo falló: {dato}")
+                motivo = 'error'
+                break
+    finally:
+        compartido.parar.set()
+        for proceso in procesos:
+            proceso.join(timeout=0.5)
+            if proceso.is_alive():
+                proceso.terminate()
+    ctx.registrar_frontera(len(subproblemas))
+    return ctx.resultado(final, motivo)
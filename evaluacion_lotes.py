@@ -0,0 +1,248 @@
+# FlowFree/evaluacion_lotes.py
+"""
+Evaluación por lotes de capas enteras de la frontera, y búsqueda en haz que la usa.
+
+evaluar_lote(estados) empaqueta N estados del mismo nivel en un array de NumPy
+de códigos de celda con forma (N, alto, ancho) y calcula para todos a la vez,
+con operaciones vectorizadas:
+- celdas vacías;
+- distancia de cada color sin terminar entre sus dos cabezas (los campos de
+  heuristicas.campos_distancia, como distancia_paredes);
+- las cuatro reglas de poda.py (cabeza bloqueada, celda aislada, color
+  inalcanzable y región varada). Las regiones vacías se etiquetan propagando el
+  índice mínimo entre vecinas y saltando de cada etiqueta a la de su celda, hasta
+  que no cambia ninguna.
+Las puntuaciones salen en un array (infinito en los callejones) listo para la cola
+de prioridad.
+
+Sin NumPy se evalúa estado a estado con heuristicas y Podador.
+
+busqueda_haz (algoritmo 'haz' de algoritmos_busqueda) avanza por capas: expande
+todos los estados de la capa, evalúa a sus hijos en un solo lote y se queda con
+los ANCHO_HAZ mejores (BoundedPriorityQueue). Con NumPy los hijos se generan sin
+poda ni propagación, que se dejan para el lote y para los que entran en el haz.
+No es completa: si el haz se vacía después de haber descartado estados, termina
+con motivo 'limite_haz' en vez de 'agotado'.
+"""
+from structures.structures import BoundedPriorityQueue
+from algoritmos_busqueda import LimiteAlcanzado, generar_sucesores, pasos_dados
+from poda import Podador
+import heuristicas
+
+try:
+    import numpy as np
+    NUMPY_DISPONIBLE = True
+except ImportError:
+    NUMPY_DISPONIBLE = False
+
+ANCHO_HAZ = 256
+PESO_DISTANCIA = 2 # Como heuristicas.ponderada
+_SIN_ETIQUETA = 0x7FFFFFFF
+
+
+class EvaluacionLote:
+    """
+    Resultado de evaluar_lote, un valor por estado (arrays de NumPy, o listas sin NumPy):
+    - vacias: celdas vacías.
+    - distancias: suma de las distancias entre cabezas de los colores sin terminar.
+    - callejones: True si alguna regla de poda lo descarta.
+    - puntuaciones: vacias + PESO_DISTANCIA * distancias; infinito en los callejones.
+    """
+    def __init__(self, vacias, distancias, callejones, puntuaciones):
+        self.vacias = vacias
+        self.distancias = distancias
+        self.callejones = callejones
+        self.puntuaciones = puntuaciones
+
+
+def _tablas(nivel):
+    """Vecinos (celdas, 4) con la celda ficticia 'celdas' en los huecos, y campos de distancia (n, celdas)."""
+    tablas = nivel.derivados.get('tablas_lote')
+    if tablas is None:
+        total = nivel.alto * nivel.ancho
+        vecinos = np.full((total, 4), total, dtype=np.intp)
+        for i, lista in enumerate(nivel.vecinos):
+            vecinos[i, :len(lista)] = lista
+        campos = np.array(heuristicas.campos_distancia(nivel), dtype=np.int32).reshape(len(nivel.colores), total)
+        tablas = (vecinos, campos)
+        nivel.derivados['tablas_lote'] = tablas
+    return tablas
+
+
+def empaquetar(estados):
+    """Códigos de celda de 'estados' (mismo nivel) en un array uint8 de forma (N, alto, ancho)."""
+    nivel = estados[0].nivel
+    datos = np.frombuffer(b"".join(bytes(estado.celdas) for estado in estados), dtype=np.uint8)
+    return datos.reshape(len(estados), nivel.alto, nivel.ancho)
+
+
+def _etiquetar_regiones(vacias):
+    """
+    Etiquetas (N, celdas + 1) a partir de 'vacias' (N, alto, ancho): para cada celda
+    vacía, el índice más bajo de su región vacía; _SIN_ETIQUETA en las demás y en
+    la columna extra (fuera del tablero). Cada vuelta solo trabaja con los
+    tableros que aún cambian.
+    """
+    n_estados, alto, ancho = vacias.shape
+    total = alto * ancho
+    etiquetas = np.full((n_estados, total + 1), _SIN_ETIQUETA, dtype=np.int32)
+    # Borde de celdas sin etiqueta para tomar las cuatro vecinas con cortes en vez de índices
+    marco = np.full((n_estados, alto + 2, ancho + 2), _SIN_ETIQUETA, dtype=np.int32)
+    indices = np.arange(total, dtype=np.int32).reshape(alto, ancho)
+    techo = np.where(vacias, 0, _SIN_ETIQUETA).astype(np.int32) # max() con él devuelve las llenas a _SIN_ETIQUETA
+    marco[:, 1:-1, 1:-1] = np.maximum(indices, techo)
+    pendientes = np.arange(n_estados)
+    while len(pendientes):
+        interior = marco[:, 1:-1, 1:-1]
+        minimas = np.minimum(interior, marco[:, :-2, 1:-1])
+        np.minimum(minimas, marco[:, 2:, 1:-1], out=minimas)
+        np.minimum(minimas, marco[:, 1:-1, :-2], out=minimas)
+        np.minimum(minimas, marco[:, 1:-1, 2:], out=minimas)
+        np.maximum(minimas, techo, out=minimas)
+        # Salto: la etiqueta de la celda a la que apunta cada etiqueta, que ya es más baja o igual
+        planas = minimas.reshape(len(pendientes), total)
+        desplazamientos = (np.arange(len(pendientes)) * total)[:, None]
+        saltos = planas.ravel().take((np.minimum(planas, total - 1) + desplazamientos).ravel())
+        np.minimum(planas, saltos.reshape(planas.shape), out=planas)
+        np.maximum(minimas, techo, out=minimas)
+        cambian = (minimas != interior).any(axis=(1, 2))
+        if not cambian.all():
+            hechos = ~cambian
+            etiquetas[pendientes[hechos], :total] = planas[hechos]
+            pendientes, marco, techo, minimas = (pendientes[cambian], marco[cambian], techo[cambian],
+                                                 minimas[cambian])
+        marco[:, 1:-1, 1:-1] = minimas
+    return etiquetas
+
+
+def evaluar_lote(estados):
+    """EvaluacionLote de una lista de EstadoBusqueda del mismo nivel."""
+    if not NUMPY_DISPONIBLE:
+        return _evaluar_uno_a_uno(estados)
+    if not estados: # Arrays vacíos, no listas: quien llama puede usar .tolist() igual
+        return EvaluacionLote(np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp), np.zeros(0, dtype=bool),
+                              np.zeros(0, dtype=np.float64))
+    nivel = estados[0].nivel
+    n = len(nivel.colores)
+    ancho = nivel.ancho
+    vecinos, campos = _tablas(nivel)
+    n_estados = len(estados)
+    total = nivel.alto * ancho
+    filas = np.arange(n_estados)[:, None]
+
+    codigos = empaquetar(estados).reshape(n_estados, total)
+    cabezas = np.array([[camino[-1] for camino in estado.caminos] for estado in estados], dtype=np.intp)
+    cabeza, otra = cabezas[:, :n], cabezas[:, n:]
+    activos = cabeza != otra # (N, n): colores sin terminar
+
+    vacias = np.zeros((n_estados, total + 1), dtype=bool) # Columna extra: fuera del tablero
+    vacias[:, :total] = codigos == 0
+    libres = vacias.copy()
+    libres[filas, cabeza] |= activos
+    libres[filas, otra] |= activos
+    n_vacias = vacias.sum(axis=1)
+
+    # Distancias entre cabezas y colores que ya no llegan
+    d_cabeza = campos[np.arange(n), cabeza]
+    d_otra = campos[np.arange(n), otra]
+    sin_camino = (activos & ((d_cabeza == heuristicas.SIN_CAMINO) | (d_otra == heuristicas.SIN_CAMINO))).any(axis=1)
+    distancias = (np.abs(d_cabeza - d_otra) * activos).sum(axis=1)
+
+    # Celda aislada: vacía con menos de dos vecinas libres
+    aislada = (vacias[:, :total] & (libres[:, vecinos].sum(axis=2) < 2)).any(axis=1)
+
+    # Cabeza bloqueada: sin vecinas vacías y sin tocar la otra cabeza
+    vecinas_cabeza, vecinas_otra = vecinos[cabeza], vecinos[otra] # (N, n, 4)
+    adyacentes = (vecinas_cabeza == otra[:, :, None]).any(axis=2)
+    bloqueada = (activos & ~adyacentes & (~vacias[filas[:, :, None], vecinas_cabeza].any(axis=2)
+                                          | ~vacias[filas[:, :, None], vecinas_otra].any(axis=2))).any(axis=1)
+
+    # Regiones: cada color necesita una región común a sus dos cabezas y cada región un color
+    etiquetas = _etiquetar_regiones(vacias[:, :total].reshape(n_estados, nivel.alto, ancho))
+    junto_cabeza = etiquetas[filas[:, :, None], vecinas_cabeza] # (N, n, 4)
+    junto_otra = etiquetas[filas[:, :, None], vecinas_otra]
+    comunes = ((junto_cabeza[:, :, :, None] == junto_otra[:, :, None, :])
+               & (junto_cabeza[:, :, :, None] != _SIN_ETIQUETA) & activos[:, :, None, None])
+    inalcanzable = (activos & ~adyacentes & ~comunes.any(axis=(2, 3))).any(axis=1)
+    servidas = np.zeros((n_estados, total + 1), dtype=bool)
+    servida = comunes.any(axis=3) # (N, n, 4): vecinas de 'cabeza' en una región común
+    servidas[np.broadcast_to(filas[:, :, None], servida.shape)[servida], junto_cabeza[servida]] = True
+    raices = vacias[:, :total] & (etiquetas[:, :total] == np.arange(total))
+    varada = (raices & ~servidas[:, :total]).any(axis=1)
+
+    callejones = sin_camino | aislada | bloqueada | inalcanzable | varada
+    puntuaciones = np.where(callejones, np.inf, n_vacias + PESO_DISTANCIA * distancias).astype(np.float64)
+    return EvaluacionLote(n_vacias, distancias, callejones, puntuaciones)
+
+
+def _evaluar_uno_a_uno(estados):
+    podador = Podador(incremental=False)
+    vacias, distancias, callejones, puntuaciones = [], [], [], []
+    for estado in estados:
+        distancia = heuristicas.distancia_paredes(estado)
+        callejon = distancia == heuristicas.INFINITO or podador.es_callejon(estado)
+        vacias.append(estado.celdas.count(0))
+        distancias.append(distancia)
+        callejones.append(callejon)
+        puntuaciones.append(heuristicas.INFINITO if callejon else vacias[-1] + PESO_DISTANCIA * distancia)
+    return EvaluacionLote(vacias, distancias, callejones, puntuaciones)
+
+
+# --- Búsqueda en haz ---
+
+def _hijos_sin_podar(estado, ctx):
+    """Hijos del extremo más restringido, sin poda ni propagación (las hace el lote)."""
+    e, movimientos = ctx.elegir_color(estado)
+    hijos = []
+    for destino in movimientos:
+        hijo = ctx.copiar(estado)
+        hijo.extender(e, destino)
+        ctx.nodos_generados += 1
+        hijos.append(hijo)
+    return hijos
+
+
+def busqueda_haz(estado_inicial, ctx, heuristica=None, ancho=ANCHO_HAZ):
+    """
+    Búsqueda en haz de 'ancho' estados por capa. Con 'heuristica' (o sin NumPy) se
+    puntúa estado a estado; si no, con evaluar_lote.
+    """
+    vectorizar = heuristica is None and NUMPY_DISPONIBLE
+    puntuar = ctx.medir('heuristica', heuristica or heuristicas.ponderada)
+    evaluar = ctx.medir('lote', evaluar_lote)
+    if ctx.propagador is not None:
+        propagar = ctx.medir('propagacion', ctx.propagador.propagar)
+    ctx.es_nuevo(estado_inicial)
+    capa = [estado_inicial]
+    descartados = 0
+    while capa:
+        hijos = []
+        for estado in capa:
+            if estado.esta_resuelto():
+                return estado
+            ctx.contar_expansion(estado)
+            nuevos = _hijos_sin_podar(estado, ctx) if vectorizar else generar_sucesores(estado, ctx)
+            hijos.extend(hijo for hijo in nuevos if ctx.es_nuevo(hijo))
+        if vectorizar:
+            puntuaciones = evaluar(hijos).puntuaciones.tolist()
+        else:
+            puntuaciones = [puntuar(hijo) for hijo in hijos]
+
+        haz = BoundedPriorityQueue(ancho)
+        for hijo, puntuacion in zip(hijos, puntuaciones):
+            if puntuacion != heuristicas.INFINITO:
+                haz.add(hijo, (puntuacion, -pasos_dados(hijo)))
+        capa = []
+        while not haz.is_empty():
+            capa.append(haz.remove())
+        descartados += haz.dropped
+        if vectorizar and ctx.propagador is not None:
+            # Con NumPy la propagación solo se paga en los que entran en el haz, y sin la
+            # poda de cada paso forzado: los callejones se quitan con un segundo lote
+            capa = [hijo for hijo in capa if propagar(hijo)[0]]
+            callejones = evaluar(capa).callejones
+            capa = [hijo for hijo, callejon in zip(capa, callejones) if not callejon]
+        ctx.registrar_frontera(len(capa))
+    if descartados:
+        raise LimiteAlcanzado('limite_haz')
+    return None
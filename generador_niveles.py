@@ -0,0 +1,397 @@
+# FlowFree/generador_niveles.py
+"""
+Generador de niveles aleatorios para pruebas de escala y de carga.
+
+1. Coloca paredes ('#') al azar con la densidad pedida y se queda con la mayor
+   región conexa de celdas libres (el resto también pasa a ser pared).
+2. Empieza con un camino de una celda en cada celda libre y va uniendo caminos
+   cuyos extremos son vecinos, siempre el más corto primero, hasta que quedan
+   tantos como colores. Si se atasca, mueve extremos de caminos cortos al interior
+   de un camino vecino (partiéndolo) y vuelve a intentar uniones. Por defecto nunca
+   se crea un camino que se toque a sí mismo de lado, así la solución generada es
+   del tipo que esperan los niveles bien diseñados; para eso se reparte primero
+   con autocontacto, se trocean los caminos donde se tocan y se vuelven a unir.
+   Sin autocontacto no siempre se llega a los colores por defecto (sobre todo con
+   paredes): entonces se aceptan los que queden al atascarse, hasta len(LETRAS).
+   Eso da para unos 50x50 sin paredes; más grande hace falta 'autocontacto'.
+3. Escribe los dos extremos de cada camino con su letra (A-Z, a-z y 0-9) en el
+   mismo formato de texto que lee cargar_nivel_desde_archivo.
+Con 'unica' se comprueba con el motor SAT que no hay otra solución y si la hay (o
+si se agota el presupuesto de la comprobación, SEGUNDOS_UNICIDAD por defecto desde
+la línea de órdenes) se vuelve a generar. Cada nivel depende solo de su semilla,
+así que un lote es reproducible con cualquier número de procesos.
+
+    python generador_niveles.py --alto 30 --ancho 30 --colores 40 --cantidad 1000 --salida Levels/generados
+"""
+import argparse
+import heapq
+import math
+import os
+import random
+import string
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+LETRAS = string.ascii_uppercase + string.ascii_lowercase + string.digits
+LONGITUD_MINIMA = 3 # Caminos más cortos dejan los dos extremos pegados
+RONDAS = 60 # Rondas seguidas de uniones + mordiscos sin bajar el número de caminos antes de rendirse
+SEGUNDOS_UNICIDAD = 30.0 # Presupuesto por defecto de cada comprobación de unicidad en main
+
+
+def _paredes(alto, ancho, densidad, rng):
+    """Conjunto de celdas libres: las que no son pared y están en la mayor región conexa."""
+    libres = {i for i in range(alto * ancho) if rng.random() >= densidad}
+    mayor = set()
+    pendientes = set(libres)
+    while pendientes:
+        inicio = pendientes.pop()
+        region = {inicio}
+        pila = [inicio]
+        while pila:
+            x = pila.pop()
+            for v in _vecinos(x, alto, ancho):
+                if v in pendientes:
+                    pendientes.discard(v)
+                    region.add(v)
+                    pila.append(v)
+        if len(region) > len(mayor):
+            mayor = region
+    return mayor
+
+
+def _vecinos(i, alto, ancho):
+    f, c = divmod(i, ancho)
+    if f > 0: yield i - ancho
+    if f < alto - 1: yield i + ancho
+    if c > 0: yield i - 1
+    if c < ancho - 1: yield i + 1
+
+
+def _unir_caminos(libres, alto, ancho, colores, rng, autocontacto=False, colores_maximos=None):
+    """
+    Reparte las celdas libres en 'colores' caminos de al menos LONGITUD_MINIMA
+    celdas (sin autocontacto salvo que se permita); si se atasca con no más de
+    'colores_maximos', se queda con esos. Devuelve la lista de caminos (listas de
+    índices) o None si se atasca.
+    Sin autocontacto, unir desde celdas sueltas se atasca en tableros grandes: se
+    parte de un reparto con autocontacto, se trocea cada camino donde se toca a
+    sí mismo y se vuelven a unir los trozos, que ya son pocos.
+    """
+    if autocontacto:
+        return _repartir([[i] for i in libres], alto, ancho, colores, rng, _nunca)
+    caminos = _unir_caminos(libres, alto, ancho, colores, rng, True)
+    if caminos is None:
+        return None
+    trozos = [trozo for camino in caminos for trozo in _trocear_autocontactos(camino, alto, ancho)]
+    return _repartir(trozos, alto, ancho, colores, rng, _se_toca, colores_maximos)
+
+
+def _trocear_autocontactos(camino, alto, ancho):
+    """Parte 'camino' en trozos consecutivos que no se tocan a sí mismos de lado."""
+    trozos = [[camino[0]]]
+    actual = {camino[0]}
+    for x in camino[1:]:
+        anterior = trozos[-1][-1]
+        if any(y in actual and y != anterior for y in _vecinos(x, alto, ancho)):
+            trozos.append([x])
+            actual = {x}
+        else:
+            trozos[-1].append(x)
+            actual.add(x)
+    return trozos
+
+
+def _repartir(iniciales, alto, ancho, colores, rng, se_toca, colores_maximos=None):
+    """
+    Une los caminos 'iniciales' hasta dejar 'colores' (o, si se atasca, no más de
+    'colores_maximos'), todos de LONGITUD_MINIMA o más.
+    """
+    dueno = {} # celda -> id de su camino (el id de un camino siempre es una celda suya)
+    caminos = {}
+    for camino in iniciales:
+        caminos[camino[0]] = camino
+        for i in camino:
+            dueno[i] = camino[0]
+    mejor, sin_mejora = len(caminos), 0
+    while True:
+        _fase_uniones(dueno, caminos, alto, ancho, colores, rng, se_toca)
+        if len(caminos) <= colores:
+            break
+        if len(caminos) < mejor:
+            mejor, sin_mejora = len(caminos), 0
+        else:
+            sin_mejora += 1
+            if sin_mejora >= RONDAS:
+                if len(caminos) > (colores_maximos or colores):
+                    return None
+                break
+        # Atascado: mover extremos de los caminos más cortos abre uniones nuevas
+        for id_camino in sorted(caminos, key=lambda i: (len(caminos[i]), rng.random())):
+            if id_camino in caminos:
+                _mordisco(caminos[id_camino], dueno, caminos, alto, ancho, rng, se_toca)
+    # Alargar los caminos demasiado cortos quitándole celdas a un vecino largo
+    for _ in range(RONDAS):
+        cortos = [i for i, camino in caminos.items() if len(camino) < LONGITUD_MINIMA]
+        if not cortos:
+            return list(caminos.values())
+        for id_camino in cortos:
+            if id_camino in caminos:
+                _mordisco(caminos[id_camino], dueno, caminos, alto, ancho, rng, se_toca, LONGITUD_MINIMA)
+    return None
+
+
+def _fase_uniones(dueno, caminos, alto, ancho, colores, rng, se_toca):
+    """Une caminos por sus extremos, el más corto primero, hasta 'colores' o hasta no poder más."""
+    monticulo = [(len(camino), rng.random(), i) for i, camino in caminos.items()]
+    heapq.heapify(monticulo)
+    while monticulo and len(caminos) > colores:
+        longitud, _, id_camino = heapq.heappop(monticulo)
+        camino = caminos.get(id_camino)
+        if camino is None or len(camino) != longitud:
+            continue # Entrada obsoleta
+        union = _buscar_union(camino, dueno, caminos, alto, ancho, rng, se_toca)
+        if union is None:
+            continue
+        nuevo = _unir(union, dueno, caminos)
+        heapq.heappush(monticulo, (len(caminos[nuevo]), rng.random(), nuevo))
+
+
+def _mordisco(camino, dueno, caminos, alto, ancho, rng, se_toca, resto_minimo=1):
+    """
+    Movimiento 'backbite' entre caminos: un extremo de 'camino' se engancha a una
+    celda x de un camino vecino, que se parte en x; 'camino' se queda con uno de
+    los trozos y el otro (de al menos 'resto_minimo' celdas) sigue solo. El número
+    de caminos no cambia. Devuelve True si hizo el movimiento.
+    """
+    id_a = dueno[camino[0]]
+    opciones = []
+    for e in {camino[0], camino[-1]}:
+        for x in _vecinos(e, alto, ancho):
+            id_b = dueno.get(x)
+            if id_b is not None and id_b != id_a:
+                j = caminos[id_b].index(x)
+                opciones.append((e, x, id_b, j, True))
+                opciones.append((e, x, id_b, j, False))
+    rng.shuffle(opciones)
+    for e, x, id_b, j, hacia_atras in opciones:
+        b = caminos[id_b]
+        trozo, resto = (b[j::-1], b[j + 1:]) if hacia_atras else (b[j:], b[:j])
+        if len(resto) < resto_minimo:
+            continue
+        marca = object()
+        for y in trozo:
+            dueno[y] = marca
+        if se_toca(camino, trozo, dueno, marca, e, x, alto, ancho):
+            for y in trozo:
+                dueno[y] = id_b
+            continue
+        if camino[-1] != e:
+            camino.reverse()
+        camino.extend(trozo)
+        for y in trozo:
+            dueno[y] = id_a
+        # El resto se renombra con una de sus celdas: el id de un camino siempre es una celda suya
+        del caminos[id_b]
+        for y in resto:
+            dueno[y] = resto[0]
+        caminos[resto[0]] = resto
+        return True
+    return False
+
+
+def _buscar_union(camino, dueno, caminos, alto, ancho, rng, se_toca):
+    """(extremo, id del otro camino, su extremo) elegido al azar entre las uniones válidas."""
+    extremos = {camino[0], camino[-1]}
+    opciones = []
+    for e in extremos:
+        for n in _vecinos(e, alto, ancho):
+            otro = dueno.get(n)
+            if otro is None or otro == dueno[e]:
+                continue
+            destino = caminos[otro]
+            if n != destino[0] and n != destino[-1]:
+                continue
+            if not se_toca(camino, destino, dueno, otro, e, n, alto, ancho):
+                opciones.append((e, otro, n))
+    return rng.choice(opciones) if opciones else None
+
+
+def _se_toca(a, b, dueno, id_b, e, n, alto, ancho):
+    """True si al unir a (por e) y b (por n) alguna celda de a queda al lado de b fuera de ese enlace."""
+    for x in a:
+        for y in _vecinos(x, alto, ancho):
+            if dueno.get(y) == id_b and not (x == e and y == n):
+                return True
+    return False
+
+
+def _nunca(*args):
+    return False
+
+
+def _unir(union, dueno, caminos):
+    """Une los dos caminos; el más corto se reetiqueta con el id del más largo."""
+    e, id_b, n = union
+    id_a = dueno[e]
+    a, b = caminos[id_a], caminos[id_b]
+    if a[-1] != e:
+        a.reverse()
+    if b[0] != n:
+        b.reverse()
+    unido = a + b
+    largo, corto = (id_a, id_b) if len(a) >= len(b) else (id_b, id_a)
+    for x in caminos[corto]:
+        dueno[x] = largo
+    del caminos[corto]
+    caminos[largo] = unido
+    return largo
+
+
+def colores_por_defecto(alto, ancho, densidad=0.0):
+    """Tantos colores como el lado de un cuadrado con las mismas celdas libres (7 en 7x7, 15 en 15x15)."""
+    return max(2, min(len(LETRAS), round(math.sqrt(alto * ancho * (1 - densidad)))))
+
+
+def generar_nivel(alto, ancho, colores=None, densidad_paredes=0.0, semilla=None, unica=False,
+                  autocontacto=False, intentos=200, presupuesto_unicidad=None):
+    """
+    Devuelve (filas, caminos) con las filas del nivel en el formato de los archivos
+    de Levels/ y la solución generada ({letra: [(f, c), ...]}), o None si no se
+    consigue en 'intentos'.
+    """
+    # Sin autocontacto, los colores por defecto son un objetivo: se admiten más si no se llega
+    colores_maximos = len(LETRAS) if colores is None and not autocontacto else None
+    colores = colores or colores_por_defecto(alto, ancho, densidad_paredes)
+    if colores > len(LETRAS):
+        raise ValueError(f"Como mucho {len(LETRAS)} colores (una letra o dígito por color).")
+    rng = random.Random(semilla)
+    for _ in range(intentos):
+        libres = _paredes(alto, ancho, densidad_paredes, rng)
+        if len(libres) < colores * LONGITUD_MINIMA:
+            continue
+        caminos = _unir_caminos(libres, alto, ancho, colores, rng, autocontacto, colores_maximos)
+        if caminos is None:
+            continue
+        rng.shuffle(caminos)
+        for camino in caminos:
+            if camino[0] > camino[-1]:
+                camino.reverse() # Como TableroJuego: 'inicio' es el extremo menor
+        cuadricula = [['#'] * ancho for _ in range(alto)]
+        for i in libres:
+            f, c = divmod(i, ancho)
+            cuadricula[f][c] = '.'
+        solucion = {}
+        for letra, camino in zip(LETRAS, caminos):
+            for i in (camino[0], camino[-1]):
+                f, c = divmod(i, ancho)
+                cuadricula[f][c] = letra
+            solucion[letra] = [divmod(i, ancho) for i in camino]
+        filas = [''.join(fila) for fila in cuadricula]
+        if unica and not es_unica(filas, solucion, presupuesto_unicidad):
+            continue
+        return filas, solucion
+    return None
+
+
+def es_unica(filas, solucion, presupuesto=None):
+    """
+    True si 'solucion' es la única solución del nivel (motor SAT con una cláusula
+    que prohíbe sus aristas). False si hay otra o si se agota el presupuesto, así
+    que un False no demuestra que haya otra.
+    """
+    from tablero_juego import TableroJuego, EstadoBusqueda
+    from solucionador_sat import SolucionadorCDCL, CodificacionFlow
+    from algoritmos_busqueda import ContextoBusqueda, LimiteAlcanzado
+
+    ctx = ContextoBusqueda('unicidad', presupuesto) # El presupuesto también cuenta la codificación
+    tablero = TableroJuego(filas)
+    nivel = EstadoBusqueda.desde_tablero(tablero).nivel
+    sat = SolucionadorCDCL()
+    codificacion = CodificacionFlow(nivel, sat)
+    codificacion.prohibir_caminos([[f * nivel.ancho + c for f, c in camino] for camino in solucion.values()])
+    try:
+        while sat.resolver(ctx.comprobar_limites):
+            _, ciclos = codificacion.decodificar()
+            if not ciclos:
+                return False
+            for ciclo in ciclos:
+                sat.agregar_clausula([-variable for variable in ciclo])
+    except LimiteAlcanzado:
+        return False
+    return True
+
+
+def _presupuesto_unicidad(segundos):
+    from algoritmos_busqueda import Presupuesto
+    return Presupuesto(max_segundos=segundos) if segundos else None
+
+
+def _generar_en_archivo(argumentos):
+    ruta, alto, ancho, colores, densidad, semilla, unica, autocontacto, segundos_unicidad = argumentos
+    generado = generar_nivel(alto, ancho, colores, densidad, semilla, unica, autocontacto,
+                             presupuesto_unicidad=_presupuesto_unicidad(segundos_unicidad))
+    if generado is None:
+        return ruta, False
+    with open(ruta, 'w') as f:
+        f.write('\n'.join(generado[0]) + '\n')
+    return ruta, True
+
+
+def generar_lote(directorio, cantidad, alto, ancho, colores=None, densidad_paredes=0.0, semilla=0,
+                 unica=False, autocontacto=False, trabajadores=None, segundos_unicidad=None):
+    """
+    Genera 'cantidad' niveles en 'directorio' (nivel_00000.txt...) repartidos en
+    todos los núcleos. El nivel i usa la semilla semilla + i. Devuelve las rutas creadas.
+    'segundos_unicidad' limita cada comprobación de 'unica' (None, sin límite).
+    """
+    os.makedirs(directorio, exist_ok=True)
+    trabajos = [(os.path.join(directorio, f"nivel_{i:05d}.txt"), alto, ancho, colores, densidad_paredes,
+                 semilla + i, unica, autocontacto, segundos_unicidad) for i in range(cantidad)]
+    creadas = []
+    with ProcessPoolExecutor(max_workers=trabajadores or os.cpu_count() or 1) as pool:
+        for ruta, ok in pool.map(_generar_en_archivo, trabajos, chunksize=max(1, cantidad // 64)):
+            if ok:
+                creadas.append(ruta)
+            else:
+                print(f"Aviso: no se pudo generar '{ruta}'.")
+    return creadas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera niveles de Flow Free aleatorios.")
+    parser.add_argument('--alto', type=int, default=20)
+    parser.add_argument('--ancho', type=int, default=None, help="por defecto, igual que --alto")
+    parser.add_argument('--colores', type=int, default=None, help="por defecto, la raíz de las celdas libres")
+    parser.add_argument('--densidad-paredes', type=float, default=0.0)
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--unica', action='store_true',
+                        help="descartar los niveles en los que SAT encuentra otra solución o no termina a tiempo")
+    parser.add_argument('--segundos-unicidad', type=float, default=SEGUNDOS_UNICIDAD,
+                        help="tiempo máximo de cada comprobación de --unica (0, sin límite)")
+    parser.add_argument('--autocontacto', action='store_true',
+                        help="permitir caminos que se tocan a sí mismos; sin esto, hasta unos 50x50 sin paredes "
+                             "(con paredes pueden salir más colores de los pedidos por defecto)")
+    parser.add_argument('--cantidad', type=int, default=1)
+    parser.add_argument('--trabajadores', type=int, default=None)
+    parser.add_argument('--salida', default=None, help="directorio de salida; sin él se imprime un nivel")
+    args = parser.parse_args(argv)
+    ancho = args.ancho or args.alto
+
+    if args.salida is None:
+        generado = generar_nivel(args.alto, ancho, args.colores, args.densidad_paredes, args.semilla, args.unica,
+                                 args.autocontacto, presupuesto_unicidad=_presupuesto_unicidad(args.segundos_unicidad))
+        if generado is None:
+            print("No se pudo generar el nivel con esos parámetros.")
+            return 1
+        print('\n'.join(generado[0]))
+        return 0
+    inicio = time.perf_counter()
+    creadas = generar_lote(args.salida, args.cantidad, args.alto, ancho, args.colores, args.densidad_paredes,
+                           args.semilla, args.unica, args.autocontacto, args.trabajadores, args.segundos_unicidad)
+    print(f"{len(creadas)}/{args.cantidad} niveles en '{args.salida}' ({time.perf_counter() - inicio:.1f}s)")
+    return 0 if len(creadas) == args.cantidad else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
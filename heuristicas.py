@@ -0,0 +1,155 @@
+# FlowFree/heuristicas.py
+"""
+Heurísticas para la búsqueda informada (voraz, A*, IDA*) sobre EstadoBusqueda.
+El coste de un camino de búsqueda es el número de pasos dados (una celda por paso),
+así que una heurística es admisible si nunca sobreestima los pasos que faltan.
+Cada heurística es una función estado -> número con el atributo 'admisible'.
+Devuelven float('inf') cuando el estado ya no tiene solución.
+
+Las paredes y los extremos no cambian después de _encontrar_pares_colores, así que
+los campos de distancia se calculan una vez por nivel y se guardan en
+nivel.derivados['distancias'] (ver campos_distancia).
+"""
+from collections import deque
+
+INFINITO = float('inf')
+SIN_CAMINO = 0xFFFF # Distancia de una celda desde la que no se llega al 'fin'
+
+
+def _admisible(valor):
+    def decorador(funcion):
+        funcion.admisible = valor
+        return funcion
+    return decorador
+
+
+def es_admisible(heuristica):
+    return getattr(heuristica, 'admisible', False)
+
+
+def campos_distancia(nivel):
+    """
+    Para cada color k, distancia (en pasos) de cada celda a su 'fin' respetando
+    las paredes y los extremos de otros colores, que nunca se pueden atravesar.
+    Se calcula con un BFS por color la primera vez y queda en caché en el nivel.
+    """
+    campos = nivel.derivados.get('distancias')
+    if campos is None:
+        campos = tuple(_bfs_desde_fin(nivel, k) for k in range(len(nivel.colores)))
+        nivel.derivados['distancias'] = campos
+    return campos
+
+
+def _bfs_desde_fin(nivel, k):
+    distancias = [SIN_CAMINO] * (nivel.alto * nivel.ancho)
+    base = nivel.celdas_base
+    propio = k + 1
+    fin = nivel.fines[k]
+    distancias[fin] = 0
+    cola = deque([fin])
+    while cola:
+        x = cola.popleft()
+        siguiente = distancias[x] + 1
+        for v in nivel.vecinos[x]:
+            if distancias[v] == SIN_CAMINO and (base[v] == 0 or base[v] == propio):
+                distancias[v] = siguiente
+                cola.append(v)
+    return tuple(distancias)
+
+
+@_admisible(True)
+def celdas_vacias(estado):
+    """Celdas vacías que quedan por rellenar; cada una cuesta al menos un paso."""
+    return estado.celdas.count(0)
+
+
+@_admisible(True)
+def colores_pendientes(estado):
+    """Colores sin terminar; cada uno necesita al menos el paso final hacia su 'fin'."""
+    return estado.pendientes
+
+
+@_admisible(True)
+def pasos_restantes(estado):
+    """
+    Celdas vacías más colores sin terminar (cada color necesita un último paso
+    hacia su 'fin'). En un tablero resoluble es exactamente el número de pasos que faltan.
+    """
+    return estado.celdas.count(0) + estado.pendientes
+
+
+@_admisible(True)
+def distancia_manhattan(estado):
+    """Suma, por color sin terminar, de la distancia Manhattan entre sus dos cabezas."""
+    caminos = estado.caminos
+    ancho = estado.nivel.ancho
+    n = len(estado.nivel.colores)
+    total = 0
+    for k in range(n):
+        cabeza = caminos[k][-1]
+        otra = caminos[k + n][-1]
+        if cabeza != otra:
+            fc, cc = divmod(cabeza, ancho)
+            fo, co = divmod(otra, ancho)
+            total += abs(fc - fo) + abs(cc - co)
+    return total
+
+
+@_admisible(True)
+def distancia_paredes(estado):
+    """
+    Como distancia_manhattan pero con distancias BFS que rodean paredes y extremos
+    ajenos. Usa los campos en caché, así que cuesta O(colores) por nodo. Con las dos
+    cabezas fuera de 'fin' se usa |d(cabeza) - d(otra)|, que sigue siendo una cota
+    inferior del camino entre ambas (desigualdad triangular).
+    """
+    campos = campos_distancia(estado.nivel)
+    caminos = estado.caminos
+    n = len(estado.nivel.colores)
+    total = 0
+    for k in range(n):
+        cabeza = caminos[k][-1]
+        otra = caminos[k + n][-1]
+        if cabeza != otra:
+            d, d_otra = campos[k][cabeza], campos[k][otra]
+            if d == SIN_CAMINO or d_otra == SIN_CAMINO:
+                return INFINITO
+            total += abs(d - d_otra)
+    return total
+
+
+@_admisible(False)
+def color_mas_restringido(estado):
+    """
+    Movimientos legales de la cabeza sin terminar que menos tiene (0 = callejón, infinito).
+    Valores bajos significan menos ramificación: sirve para ordenar la búsqueda voraz,
+    no estima pasos.
+    """
+    minimo = None
+    for e in range(len(estado.caminos)):
+        if estado.esta_completo(e):
+            continue
+        opciones = len(estado.movimientos(e))
+        if opciones == 0:
+            return INFINITO
+        if minimo is None or opciones < minimo:
+            minimo = opciones
+    return minimo or 0
+
+
+@_admisible(False)
+def ponderada(estado):
+    """Celdas vacías más el doble de la distancia con paredes: prioriza cerrar colores."""
+    d = distancia_paredes(estado)
+    return estado.celdas.count(0) + 2 * d
+
+
+HEURISTICAS = {
+    'celdas_vacias': celdas_vacias,
+    'colores_pendientes': colores_pendientes,
+    'pasos_restantes': pasos_restantes,
+    'manhattan': distancia_manhattan,
+    'distancia_paredes': distancia_paredes,
+    'color_mas_restringido': color_mas_restringido,
+    'ponderada': ponderada,
+}
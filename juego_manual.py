@@ -11,6 +11,10 @@ except ImportError:
     print("Se usará input() estándar (requiere presionar Enter y mostrará la tecla).")
 
 from tablero_juego import cargar_nivel_desde_archivo 
+from pistas import MotorPistas
+from renderizador import Renderizador
+
+TECLAS_DIRECCION = {'arriba': 'W', 'izquierda': 'A', 'abajo': 'S', 'derecha': 'D'}
 
 def limpiar_pantalla():
     """Limpia la pantalla de la consola."""
@@ -96,9 +100,24 @@ def seleccionar_color_activo_manual(tablero_actual, estado_partida_manual):
             # Si es -1, fue una tecla no numérica con readchar, ya se manejó con 'continue'
 
 
+def pedir_pista(motor_pistas, color):
+    """Texto con la pista para 'color'. No bloquea: si el motor aún está buscando, lo dice."""
+    resoluble = motor_pistas.es_resoluble()
+    if resoluble is None:
+        if motor_pistas.calculando():
+            return "Pista no disponible aún: se está resolviendo el tablero. Prueba en un momento."
+        return "No se pudo comprobar a tiempo si el tablero tiene solución."
+    if not resoluble:
+        return "Con los caminos actuales el nivel no tiene solución. Deshaz algún paso."
+    movimiento = motor_pistas.siguiente_movimiento(color)
+    if movimiento is None:
+        return f"No hay pista para el color {color}."
+    direccion, destino = movimiento
+    return f"Pista: mueve {color} hacia {direccion} [{TECLAS_DIRECCION[direccion]}], a {destino}."
+
 def obtener_entrada_accion_manual_directa():
     """
-    Obtiene una sola tecla de acción W,A,S,D,C,Z,Q directamente.
+    Obtiene una sola tecla de acción W,A,S,D,C,Z,H,Q directamente.
     No imprime la tecla ni espera Enter si readchar está disponible.
     """
     # El prompt de acción se muestra en el bucle principal
@@ -112,7 +131,7 @@ def obtener_entrada_accion_manual_directa():
             else: # Otras teclas especiales de readchar (flechas, etc.) no mapeadas
                 accion = None 
             
-            if accion in ['W', 'A', 'S', 'D', 'C', 'Z', 'Q']:
+            if accion in ['W', 'A', 'S', 'D', 'C', 'Z', 'H', 'Q']:
                 return accion
             return None # Tecla no reconocida o no mapeada
         except KeyboardInterrupt:
@@ -120,8 +139,8 @@ def obtener_entrada_accion_manual_directa():
         except Exception: # Cualquier otro error con readchar
             return None
     else: # Fallback a input() estándar
-        entrada = input("Tu acción (W,A,S,D,C,Z,Q) + Enter: ").upper()
-        if entrada in ['W', 'A', 'S', 'D', 'C', 'Z', 'Q']:
+        entrada = input("Tu acción (W,A,S,D,C,Z,H,Q) + Enter: ").upper()
+        if entrada in ['W', 'A', 'S', 'D', 'C', 'Z', 'H', 'Q']:
             return entrada
         else:
             print("Acción no válida.")
@@ -142,13 +161,14 @@ def iniciar_partida_manual():
         return 
 
     estado_partida_manual = {'color_activo': None}
+    motor_pistas = MotorPistas(tablero_actual)
+    motor_pistas.iniciar_en_segundo_plano() # La primera pista ya no tiene que esperar a resolver el nivel
     partida_en_curso = True
     mensaje_interfaz = "¡Nivel cargado! Comienza el juego." 
+    # Solo redibuja las celdas que cambian; nada de limpiar la pantalla en cada tecla
+    renderizador = Renderizador(tablero_actual.cuadricula_base_con_paredes)
 
     while partida_en_curso:
-        limpiar_pantalla()
-        print(f"--- Flow Free --- Nivel: {os.path.basename(ruta_archivo_a_cargar)} ---")
-        
         info_color_str = "Ninguno"
         if estado_partida_manual['color_activo']:
             ca = estado_partida_manual['color_activo']
@@ -157,13 +177,18 @@ def iniciar_partida_manual():
                 info_color_str = f"{ca} (Cabeza en: {cabeza})"
             else:
                 info_color_str = f"{ca} (Error: sin camino)"
-        print(f"Color Activo: {info_color_str}")
-        
-        tablero_actual.mostrar_tablero_consola()
-        print(f"\n{mensaje_interfaz}") # Mensaje de la última acción/estado
-        print("Mov: [W]Arriba [A]Izq [S]Abajo [D]Der | Acc: [C]Color [Z]Deshacer [Q]Salir")
+        renderizador.dibujar(
+            tablero_actual.cuadricula,
+            [f"--- Flow Free --- Nivel: {os.path.basename(ruta_archivo_a_cargar)} ---",
+             f"Color Activo: {info_color_str}"],
+            ["", mensaje_interfaz, # Mensaje de la última acción/estado
+             "Mov: [W]Arriba [A]Izq [S]Abajo [D]Der | Acc: [C]Color [Z]Deshacer [H]Pista [Q]Salir"])
+        if not READCHAR_DISPONIBLE:
+            # input() hace eco y salto de línea; si la terminal se desplaza, las posiciones dejan de valer
+            renderizador.forzar_redibujo()
 
         if not estado_partida_manual['color_activo']:
+            renderizador.forzar_redibujo() # El menú de colores puede desplazar la pantalla
             # print("\nDebes seleccionar un color para dibujar.") # Ya se infiere por "Color Activo: Ninguno"
             resultado_seleccion = seleccionar_color_activo_manual(tablero_actual, estado_partida_manual)
             if resultado_seleccion == True: # Color seleccionado
@@ -195,7 +220,7 @@ def iniciar_partida_manual():
         accion = obtener_entrada_accion_manual_directa()
 
         if accion is None: # Tecla no reconocida
-            mensaje_interfaz = "Tecla no válida. Usa W,A,S,D,C,Z,Q."
+            mensaje_interfaz = "Tecla no válida. Usa W,A,S,D,C,Z,H,Q."
             continue
 
         if accion == 'Q':
@@ -207,6 +232,8 @@ def iniciar_partida_manual():
         elif accion == 'Z': 
             exito_deshacer, msg_deshacer = tablero_actual.deshacer_ultimo_paso(color_actual)
             mensaje_interfaz = msg_deshacer 
+        elif accion == 'H':
+            mensaje_interfaz = pedir_pista(motor_pistas, color_actual)
         
         elif accion in ['W', 'A', 'S', 'D']: 
             direccion_map = {'W': 'arriba', 'A': 'izquierda', 'S': 'abajo', 'D': 'derecha'}
@@ -216,18 +243,19 @@ def iniciar_partida_manual():
 
             if exito_movimiento: 
                 if tablero_actual.todos_los_caminos_completos():
-                    limpiar_pantalla() # Limpiar antes del mensaje final de victoria
-                    print(f"--- Flow Free --- Nivel: {os.path.basename(ruta_archivo_a_cargar)} ---")
-                    print(f"Color Activo: {info_color_str}") # Mostrar el último estado
-                    tablero_actual.mostrar_tablero_consola()
                     if tablero_actual.tablero_esta_lleno():
                         mensaje_interfaz = "¡FELICIDADES! ¡Has resuelto el rompecabezas perfectamente!"
                     else:
                         mensaje_interfaz = "¡Todos los flujos conectados! Pero el tablero no está completamente lleno."
-                    print(f"\n{mensaje_interfaz}")
+                    renderizador.dibujar( # Mostrar el último estado con el mensaje final
+                        tablero_actual.cuadricula,
+                        [f"--- Flow Free --- Nivel: {os.path.basename(ruta_archivo_a_cargar)} ---",
+                         f"Color Activo: {info_color_str}"],
+                        ["", mensaje_interfaz])
                     partida_en_curso = False 
     
     # --- Fin del bucle while partida_en_curso ---
+    motor_pistas.detener()
     if READCHAR_DISPONIBLE and partida_en_curso == False : # Si salió por victoria y readchar está activo
         pass # El mensaje ya se imprimió, solo esperar el input de abajo
     else: # Si salió por 'Q' o si readchar no está activo, limpiar e imprimir mensaje final
@@ -0,0 +1,243 @@
+# FlowFree/lote_niveles.py
+"""
+Ejecución por lotes: resuelve todos los niveles de uno o varios directorios con
+uno o varios algoritmos, repartiendo los trabajos (nivel, algoritmo) en un
+ProcessPoolExecutor. Cada resultado se escribe en JSONL en cuanto termina e
+incluye el comando exacto para repetir ese trabajo por separado.
+
+    python lote_niveles.py --niveles Levels --algoritmos dfs,sat --timeout 30 --salida lote.jsonl
+
+Límites por trabajo:
+- Tiempo: el presupuesto del motor (max_segundos) corta la búsqueda. Cada
+  trabajador avisa cuando empieza un trabajo; si no responde pasado el timeout
+  más el margen desde ese aviso, se matan los procesos del pool (un
+  ProcessPoolExecutor se rompe si muere uno solo) y se relanzan los demás
+  trabajos. Los que ya estaban corriendo en otro proceso vuelven a empezar de
+  cero: se cuentan en LoteNiveles.relanzados.
+- Memoria: límite RLIMIT_AS en el proceso trabajador (donde exista 'resource')
+  más el presupuesto max_memoria_mb del motor.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import re
+import shlex
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from niveles_compilados import cargar_nivel
+from algoritmos_busqueda import resolver, verificar_solucion, nombres_algoritmos, Presupuesto
+
+try:
+    import resource
+    RESOURCE_DISPONIBLE = True
+except ImportError: # Windows
+    RESOURCE_DISPONIBLE = False
+
+ARCHIVOS_QUE_NO_SON_NIVELES = {'Color_Legend.txt'}
+MARGEN_TIMEOUT_DURO = 5.0 # Segundos extra antes de matar un trabajo que no responde
+
+_avisos_inicio = None # En cada trabajador del pool: cola donde avisa de que empieza un trabajo
+
+
+def descubrir_niveles(rutas):
+    """Lista ordenada de archivos de nivel (.txt) dentro de las rutas dadas."""
+    niveles = []
+    for ruta in rutas:
+        if os.path.isfile(ruta):
+            niveles.append(ruta)
+            continue
+        for directorio, _, archivos in os.walk(ruta):
+            for nombre in archivos:
+                if nombre.endswith('.txt') and nombre not in ARCHIVOS_QUE_NO_SON_NIVELES:
+                    niveles.append(os.path.join(directorio, nombre))
+    return sorted(set(niveles))
+
+
+def comando_reproducible(ruta, algoritmo, timeout, memoria_mb):
+    # Con su propio archivo de salida: repetirlo no debe pisar los resultados del lote
+    nombre = re.sub(r'[^\w.-]+', '_', os.path.splitext(ruta)[0]).strip('_')
+    partes = ['python', 'lote_niveles.py', '--niveles', ruta, '--algoritmos', algoritmo,
+              '--timeout', str(timeout), '--trabajadores', '1', '--salida', f"repeticion_{nombre}_{algoritmo}.jsonl"]
+    if memoria_mb:
+        partes += ['--memoria-mb', str(memoria_mb)]
+    return ' '.join(shlex.quote(p) for p in partes)
+
+
+def _limitar_memoria(memoria_mb):
+    """Limita el espacio de direcciones del proceso actual a lo que ya usa + memoria_mb."""
+    if not RESOURCE_DISPONIBLE or not memoria_mb:
+        return
+    try:
+        with open('/proc/self/statm') as f:
+            actual = int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        actual = 0
+    _, duro = resource.getrlimit(resource.RLIMIT_AS)
+    blando = actual + memoria_mb * 1024 * 1024
+    if duro != resource.RLIM_INFINITY:
+        blando = min(blando, duro)
+    resource.setrlimit(resource.RLIMIT_AS, (blando, duro))
+
+
+def _iniciar_trabajador(avisos):
+    global _avisos_inicio
+    _avisos_inicio = avisos
+
+
+def ejecutar_trabajo(ruta, algoritmo, timeout, memoria_mb=None, id_trabajo=None):
+    """
+    Resuelve un nivel con un algoritmo. Se ejecuta en un proceso del pool, que
+    avisa de que empieza mandando 'id_trabajo' a la cola del lote.
+    """
+    if _avisos_inicio is not None and id_trabajo is not None:
+        _avisos_inicio.put(id_trabajo)
+    registro = {
+        'nivel': ruta,
+        'algoritmo': algoritmo,
+        'comando': comando_reproducible(ruta, algoritmo, timeout, memoria_mb),
+    }
+    _limitar_memoria(memoria_mb)
+    tablero = cargar_nivel(ruta) # Desde la caché compilada si el .txt no ha cambiado
+    if tablero is None:
+        registro.update(resuelto=False, motivo='nivel_invalido')
+        return registro
+    try:
+        resultado = resolver(tablero, algoritmo,
+                             presupuesto=Presupuesto(max_segundos=timeout, max_memoria_mb=memoria_mb))
+    except MemoryError:
+        registro.update(resuelto=False, motivo='limite_memoria')
+        return registro
+    registro.update(resultado.a_diccionario())
+    registro['verificado'] = resultado.resuelto and verificar_solucion(tablero, resultado.caminos)
+    return registro
+
+
+class LoteNiveles:
+    """Reparte los trabajos en un pool y va entregando los registros al terminar."""
+    def __init__(self, trabajos, timeout, memoria_mb=None, trabajadores=None):
+        self.pendientes = list(trabajos) # (ruta, algoritmo)
+        self.timeout = timeout
+        self.memoria_mb = memoria_mb
+        self.trabajadores = trabajadores or os.cpu_count() or 1
+        self.pool = None
+        self.avisos = None
+        self.en_curso = {} # futuro -> (trabajo, id del trabajo)
+        self.inicios = {} # id del trabajo -> instante en que su trabajador avisó de que empezaba
+        self.ultimo_id = 0
+        self.relanzados = 0 # Trabajos que ya corrían y se repitieron al matar el pool por otro colgado
+
+    def _lanzar(self):
+        # Cola nueva en cada pool: la del anterior puede quedar a medias al matar sus procesos
+        self.avisos = multiprocessing.Queue()
+        self.inicios = {}
+        self.pool = ProcessPoolExecutor(max_workers=self.trabajadores, initializer=_iniciar_trabajador,
+                                        initargs=(self.avisos,))
+        for trabajo in self.pendientes:
+            self.ultimo_id += 1
+            futuro = self.pool.submit(ejecutar_trabajo, trabajo[0], trabajo[1], self.timeout, self.memoria_mb,
+                                      self.ultimo_id)
+            self.en_curso[futuro] = (trabajo, self.ultimo_id)
+        self.pendientes = []
+
+    def _matar_pool(self):
+        procesos = list(getattr(self.pool, '_processes', {}).values())
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        for proceso in procesos:
+            proceso.terminate()
+        for proceso in procesos:
+            proceso.join(timeout=1)
+
+    def ejecutar(self):
+        """Generador de registros (diccionarios) en orden de finalización."""
+        self._lanzar()
+        try:
+            while self.en_curso:
+                hechos, _ = wait(list(self.en_curso), timeout=0.5, return_when=FIRST_COMPLETED)
+                for futuro in hechos:
+                    (ruta, algoritmo), _ = self.en_curso.pop(futuro)
+                    try:
+                        yield futuro.result()
+                    except Exception as e:
+                        yield {'nivel': ruta, 'algoritmo': algoritmo, 'resuelto': False,
+                               'motivo': 'error', 'error': repr(e),
+                               'comando': comando_reproducible(ruta, algoritmo, self.timeout, self.memoria_mb)}
+                yield from self._vigilar_colgados()
+        finally:
+            if self.en_curso:
+                self._matar_pool()
+            else:
+                self.pool.shutdown(wait=True)
+
+    def _vigilar_colgados(self):
+        # futuro.running() no sirve: también es True mientras espera en la cola de llamadas del pool
+        ahora = time.monotonic()
+        while True:
+            try:
+                self.inicios[self.avisos.get_nowait()] = ahora
+            except queue.Empty:
+                break
+        limite = self.timeout + MARGEN_TIMEOUT_DURO
+        colgados = [futuro for futuro, (_, id_trabajo) in self.en_curso.items()
+                    if id_trabajo in self.inicios and ahora - self.inicios[id_trabajo] > limite]
+        if not colgados:
+            return
+        # Matar el pool es la única forma de parar un proceso concreto: los demás
+        # trabajos en curso o en espera se vuelven a encolar en un pool nuevo.
+        self._matar_pool()
+        for futuro, (trabajo, id_trabajo) in list(self.en_curso.items()):
+            if futuro in colgados:
+                ruta, algoritmo = trabajo
+                yield {'nivel': ruta, 'algoritmo': algoritmo, 'resuelto': False, 'motivo': 'limite_tiempo',
+                       'comando': comando_reproducible(ruta, algoritmo, self.timeout, self.memoria_mb)}
+            else:
+                if id_trabajo in self.inicios:
+                    self.relanzados += 1
+                self.pendientes.append(trabajo)
+        self.en_curso.clear()
+        self._lanzar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resuelve niveles de Flow Free por lotes en paralelo.")
+    parser.add_argument('--niveles', nargs='+', default=['Levels'], help="archivos o directorios de niveles")
+    parser.add_argument('--algoritmos', default='dfs,sat', help=f"lista separada por comas de: {', '.join(nombres_algoritmos())}")
+    parser.add_argument('--timeout', type=float, default=60.0, help="segundos por trabajo")
+    parser.add_argument('--memoria-mb', type=int, default=None, help="memoria máxima por trabajo")
+    parser.add_argument('--trabajadores', type=int, default=None, help="procesos (por defecto, uno por núcleo)")
+    parser.add_argument('--salida', default='resultados_lote.jsonl', help="archivo JSONL de resultados")
+    args = parser.parse_args(argv)
+
+    algoritmos = [a.strip() for a in args.algoritmos.split(',') if a.strip()]
+    desconocidos = [a for a in algoritmos if a not in nombres_algoritmos()]
+    if desconocidos:
+        parser.error(f"algoritmos desconocidos: {', '.join(desconocidos)}")
+    niveles = descubrir_niveles(args.niveles)
+    trabajos = [(ruta, algoritmo) for ruta in niveles for algoritmo in algoritmos]
+    print(f"{len(trabajos)} trabajos ({len(niveles)} niveles x {len(algoritmos)} algoritmos) -> {args.salida}")
+
+    lote = LoteNiveles(trabajos, args.timeout, args.memoria_mb, args.trabajadores)
+    inicio = time.perf_counter()
+    resueltos = 0
+    try:
+        with open(args.salida, 'w') as salida:
+            for registro in lote.ejecutar():
+                salida.write(json.dumps(registro, ensure_ascii=False) + '\n')
+                salida.flush()
+                resueltos += bool(registro.get('resuelto'))
+                print(f"[{registro.get('motivo')}] {registro['nivel']} ({registro['algoritmo']})"
+                      f" {registro.get('tiempo_segundos', 0) or 0:.2f}s")
+    except KeyboardInterrupt:
+        print("\nLote cancelado; los trabajos pendientes se descartaron.")
+        return 130
+    print(f"\n{resueltos}/{len(trabajos)} resueltos en {time.perf_counter() - inicio:.1f}s")
+    if lote.relanzados:
+        print(f"{lote.relanzados} trabajos se repitieron al matar el pool por otro que no respondía.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+# FlowFree/niveles_compilados.py
+"""
+Caché de niveles compilados: un archivo binario por nivel con todo lo que la
+búsqueda calcula al cargarlo (extremos, celdas base, tabla de vecinos, tablas
+Zobrist y campos de distancia de heuristicas.campos_distancia).
+
+El archivo se llama como el sha256 del .txt de origen, así que editar el nivel
+cambia la clave y la entrada vieja deja de usarse sin más. Se lee con mmap: las
+tablas grandes (Zobrist y distancias) se quedan como memoryview sobre el archivo
+y el sistema solo carga las páginas que se usan. Un memoryview no se puede
+serializar, así que esos DatosNivel (DatosNivelCompilado) viajan a otros procesos
+como la ruta y la huella del archivo, y el receptor lo vuelve a abrir.
+
+Formato (little-endian, cada sección alineada a 8 bytes):
+    cabecera   '<4sHHHH32s': MAGIA, VERSION, alto, ancho, colores, sha256 del origen
+    filas      alto*ancho bytes ASCII (la cuadrícula base con paredes)
+    colores    un byte ASCII por color, en el orden de DatosNivel.colores
+    extremos   'I' * 2*colores: inicios y luego fines, como índices planos
+    celdas     alto*ancho bytes: DatosNivel.celdas_base
+    vecinos    'i' * 4*celdas: hasta 4 vecinos por celda, -1 si no hay
+    zobrist    'Q' * 3*colores*celdas: zobrist_celda y luego zobrist_cabeza (una por extremo)
+    distancias 'H' * colores*celdas: heuristicas.campos_distancia
+
+    python niveles_compilados.py Levels      # compila por adelantado
+"""
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from tablero_juego import TableroJuego, DatosNivel, cargar_nivel_desde_archivo
+import heuristicas
+
+DIRECTORIO_CACHE = '.niveles_compilados'
+EXTENSION = '.flc'
+MAGIA = b'FFNC'
+VERSION = 2
+CABECERA = struct.Struct('<4sHHHH32s')
+SIN_VECINO = -1
+
+
+def huella_archivo(ruta):
+    with open(ruta, 'rb') as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def ruta_compilada(huella, directorio=DIRECTORIO_CACHE):
+    return os.path.join(directorio, huella.hex() + EXTENSION)
+
+
+def _alinear(datos):
+    datos += bytes(-len(datos) % 8)
+
+
+def compilar(tablero, huella):
+    """Serializa los datos del nivel de 'tablero' (sus caminos actuales no se guardan)."""
+    if sys.byteorder != 'little':
+        raise ValueError("el formato compilado es little-endian")
+    nivel = DatosNivel.desde_tablero(tablero)
+    campos = heuristicas.campos_distancia(nivel)
+    n = len(nivel.colores)
+    celdas = nivel.alto * nivel.ancho
+
+    datos = bytearray(CABECERA.pack(MAGIA, VERSION, nivel.alto, nivel.ancho, n, huella))
+    _alinear(datos)
+    datos += ''.join(nivel.filas_base).encode('ascii')
+    _alinear(datos)
+    datos += ''.join(nivel.colores).encode('ascii')
+    _alinear(datos)
+    datos += array('I', nivel.inicios + nivel.fines).tobytes()
+    _alinear(datos)
+    datos += nivel.celdas_base
+    _alinear(datos)
+    vecinos = array('i')
+    for lista in nivel.vecinos:
+        vecinos.extend(lista)
+        vecinos.extend([SIN_VECINO] * (4 - len(lista)))
+    datos += vecinos.tobytes()
+    _alinear(datos)
+    zobrist = array('Q')
+    for tabla in nivel.zobrist_celda + nivel.zobrist_cabeza:
+        zobrist.extend(tabla)
+    datos += zobrist.tobytes()
+    _alinear(datos)
+    distancias = array('H')
+    for campo in campos:
+        distancias.extend(campo)
+    datos += distancias.tobytes()
+    return bytes(datos)
+
+
+class DatosNivelCompilado(DatosNivel):
+    """
+    DatosNivel con las tablas Zobrist y de distancias sobre el mmap del archivo
+    compilado. Al serializarse solo guarda (ruta, huella) y los datos del .txt:
+    si el archivo ya no está al deserializar, el nivel se recalcula desde cero.
+    """
+    __slots__ = ('origen',)
+
+    def __reduce__(self):
+        ruta, huella = self.origen
+        return _recargar_nivel, (ruta, huella, self.filas_base, self.pares_colores)
+
+
+def _recargar_nivel(ruta, huella, filas_base, pares_colores):
+    tablero = cargar_compilado(ruta, huella)
+    if tablero is not None:
+        return tablero._datos_nivel
+    return DatosNivel(filas_base, pares_colores)
+
+
+def _trocear(vista, tamano, partes):
+    return tuple(vista[j * tamano:(j + 1) * tamano] for j in range(partes))
+
+
+def cargar_compilado(ruta, huella=None):
+    """
+    Carga un nivel compilado y devuelve un TableroJuego con sus DatosNivel y
+    campos de distancia ya puestos. None si el archivo no existe, está dañado o
+    no corresponde a 'huella'.
+    """
+    try:
+        with open(ruta, 'rb') as f:
+            memoria = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    vista = memoryview(memoria)
+    if len(vista) < CABECERA.size:
+        return None
+    magia, version, alto, ancho, n, huella_guardada = CABECERA.unpack_from(vista)
+    if magia != MAGIA or version != VERSION or (huella is not None and huella_guardada != huella):
+        return None
+    celdas = alto * ancho
+    secciones = [('filas', celdas, 1), ('colores', n, 1), ('extremos', 2 * n, 4), ('celdas', celdas, 1),
+                 ('vecinos', 4 * celdas, 4), ('zobrist', 3 * n * celdas, 8), ('distancias', n * celdas, 2)]
+    posicion = CABECERA.size
+    trozos = {}
+    for nombre, cantidad, tamano in secciones:
+        posicion += -posicion % 8
+        trozos[nombre] = vista[posicion:posicion + cantidad * tamano]
+        posicion += cantidad * tamano
+    if posicion > len(vista):
+        return None
+
+    texto = bytes(trozos['filas']).decode('ascii')
+    filas = [texto[f * ancho:(f + 1) * ancho] for f in range(alto)]
+    colores = bytes(trozos['colores']).decode('ascii')
+    extremos = trozos['extremos'].cast('I')
+    inicios, fines = tuple(extremos[:n]), tuple(extremos[n:])
+    pares_colores = {color: {'inicio': divmod(inicios[k], ancho), 'fin': divmod(fines[k], ancho)}
+                     for k, color in enumerate(colores)}
+    plano = trozos['vecinos'].cast('i').tolist()
+    vecinos = tuple(tuple(v for v in plano[4 * i:4 * i + 4] if v != SIN_VECINO) for i in range(celdas))
+    zobrist = _trocear(trozos['zobrist'].cast('Q'), celdas, 3 * n)
+
+    nivel = DatosNivelCompilado.desde_tablas(filas, pares_colores, bytes(trozos['celdas']), inicios, fines,
+                                             vecinos, zobrist[:n], zobrist[n:])
+    nivel.origen = (ruta, huella_guardada)
+    nivel.derivados['distancias'] = _trocear(trozos['distancias'].cast('H'), celdas, n)
+    tablero = TableroJuego(filas, pares_colores)
+    tablero._datos_nivel = nivel
+    return tablero
+
+
+def cargar_nivel(ruta_archivo, directorio=DIRECTORIO_CACHE):
+    """
+    Como cargar_nivel_desde_archivo, pero usando la caché compilada: si no hay
+    versión compilada del contenido actual del archivo, lo carga del .txt y la crea.
+    """
+    try:
+        huella = huella_archivo(ruta_archivo)
+    except OSError:
+        return cargar_nivel_desde_archivo(ruta_archivo) # Que informe del error como siempre
+    destino = ruta_compilada(huella, directorio)
+    tablero = cargar_compilado(destino, huella)
+    if tablero is not None:
+        return tablero
+    tablero = cargar_nivel_desde_archivo(ruta_archivo)
+    if tablero is None:
+        return None
+    try:
+        guardar_compilado(tablero, huella, destino)
+    except (OSError, ValueError) as e:
+        print(f"Aviso: no se pudo guardar '{ruta_archivo}' compilado en '{destino}': {e}")
+    return tablero
+
+
+def guardar_compilado(tablero, huella, destino):
+    os.makedirs(os.path.dirname(destino) or '.', exist_ok=True)
+    temporal = f"{destino}.{os.getpid()}.tmp"
+    with open(temporal, 'wb') as f:
+        f.write(compilar(tablero, huella))
+    os.replace(temporal, destino) # Atómico: otros procesos del lote nunca ven un archivo a medias
+
+
+def main(argv=None):
+    from lote_niveles import descubrir_niveles
+    rutas = descubrir_niveles((argv if argv is not None else sys.argv[1:]) or ['Levels'])
+    compilados = sum(cargar_nivel(ruta) is not None for ruta in rutas)
+    print(f"{compilados}/{len(rutas)} niveles compilados en '{DIRECTORIO_CACHE}'")
+    return 0 if compilados == len(rutas) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
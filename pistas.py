@@ -0,0 +1,220 @@
+# FlowFree/pistas.py
+"""
+Pistas para la partida manual.
+
+MotorPistas resuelve el nivel una vez y guarda las soluciones que va encontrando.
+Mientras cada camino del jugador sea un prefijo del mismo color en alguna de ellas,
+las respuestas salen de esa solución sin buscar nada (O(celdas) por consulta).
+Cuando el jugador se sale de todas, se busca una solución que respete su tablero:
+1. Reparación: con la solución conocida más parecida, los colores cuyo camino sigue
+   siendo prefijo (y no choca con los caminos desviados) se dan por terminados con
+   su ruta de esa solución, y solo se buscan los demás. El subproblema es pequeño.
+2. Si la reparación no tiene salida, búsqueda completa desde el tablero del jugador.
+El resultado de cada estado (por su hash Zobrist) se memoriza, así que deshacer y
+volver a un estado ya visto no repite la búsqueda. Si la reparación falla, la
+búsqueda completa se deja para la siguiente consulta: una sola pulsación nunca
+paga las dos.
+
+Con iniciar_en_segundo_plano() (lo que hace juego_manual al cargar el nivel) las
+búsquedas completas corren en un hilo con resolucion_progresiva y un plazo más
+largo; mientras tanto las consultas devuelven "desconocido" sin bloquear y
+calculando() es True.
+
+El motor lee tablero.caminos en cada consulta, así que sigue siendo coherente con
+intentar_extender_camino y deshacer_ultimo_paso sin avisarle de cada cambio.
+"""
+import threading
+
+from algoritmos_busqueda import resolver, Presupuesto, TokenCancelacion
+from resolucion_progresiva import resolver_progresivo
+from tablero_juego import TableroJuego, EstadoBusqueda
+
+DIRECCIONES = {desplazamiento: direccion for direccion, desplazamiento in EstadoBusqueda.DESPLAZAMIENTOS.items()}
+PLAZO_SEGUNDO_PLANO = 60.0 # Segundos por búsqueda en segundo plano: no bloquea la partida
+
+
+class MotorPistas:
+    """
+    Pistas sobre 'tablero' (el TableroJuego de la partida). 'presupuesto' limita
+    cada búsqueda; si se agota sin respuesta, el estado queda como desconocido.
+    """
+    def __init__(self, tablero, algoritmo='dfs', presupuesto=None, cache=None):
+        self.tablero = tablero
+        self.algoritmo = algoritmo
+        self.presupuesto = presupuesto or Presupuesto(max_segundos=5)
+        self.cache = cache # CacheSoluciones opcional para la primera resolución
+        self.soluciones = [] # Soluciones conocidas, en el formato de TableroJuego.caminos
+        self.memo = {} # hash Zobrist -> (solución o None, True si la respuesta es segura)
+        self.reparados = set() # hashes en los que ya se intentó (y falló) la reparación
+        self.iniciado = False
+        self.plazo_fondo = None # Con plazo, las búsquedas completas van en segundo plano
+        self.hilo = None
+        self.cancelacion = None
+        self.consultas_directas = 0
+        self.reparaciones = 0
+        self.busquedas = 0
+
+    def _compatibles(self, solucion):
+        """Colores cuyo camino actual es un prefijo del de 'solucion' (y lo dibujado desde 'fin', un sufijo)."""
+        caminos_fin = self.tablero.caminos_fin
+        return {color for color, ruta in self.tablero.caminos.items()
+                if solucion[color][:len(ruta)] == list(ruta)
+                and solucion[color][::-1][:len(caminos_fin[color])] == list(caminos_fin[color])}
+
+    def _tablero_vacio(self):
+        vacio = TableroJuego(["".join(fila) for fila in self.tablero.cuadricula_base_con_paredes],
+                             pares_colores_originales=self.tablero.pares_colores)
+        vacio._datos_nivel = self.tablero._datos_nivel
+        return vacio
+
+    def _guardar(self, clave, resultado):
+        """Memoriza la respuesta de una búsqueda completa (resultado None si el motor falló)."""
+        if resultado is None:
+            respuesta = (None, False)
+        else:
+            respuesta = (resultado.caminos, resultado.resuelto or resultado.motivo == 'agotado')
+        if respuesta[0] is not None:
+            self.soluciones.append(respuesta[0])
+        self.memo[clave] = respuesta
+        return respuesta
+
+    def _resolver_inicial(self):
+        vacio = self._tablero_vacio()
+        self.busquedas += 1
+        resultado = resolver(vacio, self.algoritmo, presupuesto=self.presupuesto, cache=self.cache)
+        # También vale como respuesta del tablero vacío: no se repite si se pide pista sin haber movido
+        self._guardar(EstadoBusqueda.desde_tablero(vacio).hash_zobrist, resultado)
+        self.iniciado = True
+
+    def iniciar_en_segundo_plano(self, plazo=PLAZO_SEGUNDO_PLANO):
+        """Resuelve el nivel en un hilo desde ya; desde aquí las búsquedas completas tampoco bloquean."""
+        self.plazo_fondo = plazo
+        if not self.iniciado and not self.calculando():
+            vacio = self._tablero_vacio()
+            self._en_segundo_plano(vacio, EstadoBusqueda.desde_tablero(vacio).hash_zobrist, inicial=True)
+
+    def _en_segundo_plano(self, objetivo, clave, inicial=False):
+        self.busquedas += 1
+        self.cancelacion = TokenCancelacion()
+
+        def trabajo():
+            resultado = None
+            try:
+                for evento in resolver_progresivo(objetivo, self.algoritmo, plazo=self.plazo_fondo,
+                                                  cancelacion=self.cancelacion,
+                                                  cache=self.cache if inicial else None):
+                    pass
+                resultado = evento.resultado
+            except Exception: # Un fallo del motor deja el estado como desconocido, no rompe la partida
+                pass
+            self._guardar(clave, resultado)
+            if inicial:
+                self.iniciado = True
+
+        self.hilo = threading.Thread(target=trabajo, name="pistas", daemon=True)
+        self.hilo.start()
+
+    def calculando(self):
+        """True mientras hay una búsqueda en segundo plano."""
+        return self.hilo is not None and self.hilo.is_alive()
+
+    def detener(self):
+        """Cancela la búsqueda en segundo plano, si la hay (p. ej. al salir del nivel)."""
+        if self.calculando():
+            self.cancelacion.cancelar()
+
+    def solucion_actual(self):
+        """
+        (solución, segura): una solución que respeta los caminos actuales, o None.
+        'segura' es False si la búsqueda agotó el presupuesto sin decidir, o si
+        todavía no ha terminado (ver calculando()).
+        """
+        if not self.iniciado:
+            if self.calculando():
+                return None, False
+            self._resolver_inicial()
+        colores = len(self.tablero.pares_colores)
+        for solucion in self.soluciones:
+            if len(self._compatibles(solucion)) == colores:
+                self.consultas_directas += 1
+                return solucion, True
+        estado = EstadoBusqueda.desde_tablero(self.tablero)
+        clave = estado.hash_zobrist
+        respuesta = self.memo.get(clave)
+        if respuesta is not None:
+            return respuesta
+        if self.calculando():
+            return None, False # Una búsqueda por vez; esta consulta se repetirá
+        if clave not in self.reparados:
+            self.reparados.add(clave)
+            respuesta = self._reparar(estado)
+            if respuesta is not None:
+                if respuesta[0] is not None:
+                    self.memo[clave] = respuesta
+                    self.soluciones.append(respuesta[0])
+                    return respuesta
+                if self.plazo_fondo is None:
+                    return respuesta # La búsqueda completa, en la siguiente consulta
+        if self.plazo_fondo is not None:
+            self._en_segundo_plano(estado, clave)
+            return None, False
+        return self._buscar(estado, clave)
+
+    def _reparar(self, estado):
+        """
+        Busca solo los colores desviados, con el resto fijado a la solución más
+        parecida. None si no hay nada que fijar; (None, False) si no encuentra nada.
+        """
+        if not self.soluciones:
+            return None
+        solucion = max(self.soluciones, key=lambda s: len(self._compatibles(s)))
+        fijos = self._compatibles(solucion)
+        nivel = estado.nivel
+        # Un color fijo cuya ruta pase por una celda de un camino desviado tampoco puede fijarse
+        while True:
+            ocupadas = {p for rutas in (self.tablero.caminos, self.tablero.caminos_fin)
+                        for color, ruta in rutas.items() if color not in fijos for p in ruta}
+            chocan = {color for color in fijos if any(p in ocupadas for p in solucion[color])}
+            if not chocan:
+                break
+            fijos -= chocan
+        if not fijos:
+            return None
+        caminos = []
+        for color in nivel.colores:
+            ruta = solucion[color] if color in fijos else self.tablero.caminos[color]
+            caminos.append([f * nivel.ancho + c for f, c in ruta])
+        for k, color in enumerate(nivel.colores):
+            ruta = self.tablero.caminos_fin[color] if color not in fijos else [divmod(nivel.fines[k], nivel.ancho)]
+            caminos.append([f * nivel.ancho + c for f, c in ruta])
+        self.reparaciones += 1
+        resultado = resolver(EstadoBusqueda.desde_caminos(nivel, caminos), self.algoritmo,
+                             presupuesto=self.presupuesto)
+        return (resultado.caminos, True) if resultado.resuelto else (None, False)
+
+    def _buscar(self, estado, clave):
+        self.busquedas += 1
+        return self._guardar(clave, resolver(estado, self.algoritmo, presupuesto=self.presupuesto))
+
+    def es_resoluble(self):
+        """True o False si se sabe; None si la búsqueda no terminó dentro del presupuesto."""
+        solucion, segura = self.solucion_actual()
+        if solucion is not None:
+            return True
+        return False if segura else None
+
+    def siguiente_movimiento(self, color):
+        """(dirección, (f, c)) del siguiente paso correcto de 'color', o None si no hay."""
+        ruta = self.tablero.caminos.get(color)
+        if not ruta or self.tablero.camino_esta_completo(color):
+            return None
+        solucion, _ = self.solucion_actual()
+        if solucion is None:
+            return None
+        f, c = ruta[-1]
+        nf, nc = solucion[color][len(ruta)]
+        return DIRECCIONES[(nf - f, nc - c)], (nf, nc)
+
+    def estadisticas(self):
+        return {'consultas_directas': self.consultas_directas, 'reparaciones': self.reparaciones,
+                'busquedas': self.busquedas, 'soluciones': len(self.soluciones), 'estados_memorizados': len(self.memo)}
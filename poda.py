@@ -0,0 +1,187 @@
+# FlowFree/poda.py
+"""
+Detección de callejones sin salida para la búsqueda.
+
+Después de cada paso aplicado a un EstadoBusqueda, Podador.es_callejon() dice si
+el estado ya no puede llevar a una solución. Reglas:
+- 'cabeza_bloqueada': un extremo activo (una de las dos cabezas de un color sin
+  terminar, la que crece desde 'inicio' o la que crece desde 'fin') no tiene
+  celdas vacías al lado y no toca la otra.
+- 'celda_aislada': una celda vacía tiene menos de dos vecinos libres (vacíos o
+  extremos activos), así que ningún camino puede atravesarla.
+- 'color_inalcanzable': las dos cabezas de un color no tocan ninguna región
+  vacía en común (ni son vecinas).
+- 'region_varada': una región vacía no la toca ningún color por sus dos extremos.
+
+Las dos primeras reglas se comprueban solo alrededor de la celda que cambió. Las
+dos últimas necesitan etiquetar las regiones vacías, y solo se recalculan cuando
+el paso puede haber cambiado las regiones o los contactos de algún color; si no,
+el veredicto del estado padre (que ya pasó la poda) sigue siendo válido.
+"""
+
+REGLAS = ('cabeza_bloqueada', 'celda_aislada', 'color_inalcanzable', 'region_varada')
+
+
+def _anillos(nivel):
+    """Para cada celda, sus 8 vecinas en orden circular (N, NE, E, SE, S, SO, O, NO); -1 si se sale."""
+    tabla = nivel.derivados.get('anillos')
+    if tabla is None:
+        alto, ancho = nivel.alto, nivel.ancho
+        orden = ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))
+        tabla = []
+        for i in range(alto * ancho):
+            f, c = divmod(i, ancho)
+            tabla.append(tuple((f + df) * ancho + (c + dc) if 0 <= f + df < alto and 0 <= c + dc < ancho else -1
+                               for df, dc in orden))
+        tabla = tuple(tabla)
+        nivel.derivados['anillos'] = tabla
+    return tabla
+
+
+class Podador:
+    """
+    Aplica las reglas de poda y cuenta cuántas veces corta cada una.
+    Con incremental=False siempre recorre el tablero entero (útil para comparar).
+    """
+    def __init__(self, incremental=True):
+        self.incremental = incremental
+        self.contadores = dict.fromkeys(REGLAS, 0)
+        self.comprobaciones_completas = 0
+        self.comprobaciones_locales = 0
+
+    def total_podas(self):
+        return sum(self.contadores.values())
+
+    def _podar(self, regla):
+        self.contadores[regla] += 1
+        return True
+
+    def es_callejon(self, estado, e=None, celda_anterior=None):
+        """
+        True si 'estado' no puede completarse. 'e' es el extremo que acaba de moverse
+        y 'celda_anterior' su cabeza antes del paso; sin ellos se revisa todo el tablero.
+        """
+        extremos = self._extremos_activos(estado)
+        if e is None or not self.incremental:
+            self.comprobaciones_completas += 1
+            zona = range(len(estado.celdas))
+            if self._comprobar_celdas(estado, zona, extremos):
+                return True
+            return self._comprobar_regiones(estado, extremos)
+
+        self.comprobaciones_locales += 1
+        vecinos = estado.nivel.vecinos
+        celda = estado.cabeza(e)
+        zona = set(vecinos[celda])
+        zona.update(vecinos[celda_anterior])
+        zona.add(celda)
+        if self._comprobar_celdas(estado, zona, extremos):
+            return True
+        if self._puede_cambiar_regiones(estado, e, celda, celda_anterior, extremos):
+            self.comprobaciones_completas += 1
+            return self._comprobar_regiones(estado, extremos)
+        return False
+
+    def _extremos_activos(self, estado):
+        """{celda: (color, otra_cabeza)} para las dos cabezas de los colores sin terminar."""
+        extremos = {}
+        caminos = estado.caminos
+        n = len(estado.nivel.colores)
+        for j in range(n):
+            cabeza = caminos[j][-1]
+            otra = caminos[j + n][-1]
+            if cabeza != otra:
+                extremos[cabeza] = (j, otra)
+                extremos[otra] = (j, cabeza)
+        return extremos
+
+    def _comprobar_celdas(self, estado, zona, extremos):
+        celdas = estado.celdas
+        vecinos = estado.nivel.vecinos
+        for x in zona:
+            codigo = celdas[x]
+            if codigo == 0:
+                libres = 0
+                for v in vecinos[x]:
+                    if celdas[v] == 0 or v in extremos:
+                        libres += 1
+                if libres < 2:
+                    return self._podar('celda_aislada')
+            elif x in extremos:
+                otro = extremos[x][1]
+                for v in vecinos[x]:
+                    if celdas[v] == 0 or v == otro:
+                        break
+                else:
+                    return self._podar('cabeza_bloqueada')
+        return False
+
+    def _puede_cambiar_regiones(self, estado, e, celda, anterior, extremos):
+        """
+        Decide si el paso anterior -> celda del extremo e puede haber partido una región
+        vacía o cambiado qué colores tocan cada región.
+        """
+        if estado.esta_completo(e):
+            return True # El color se completó: deja de servir a sus regiones
+        celdas = estado.celdas
+        vecinos = estado.nivel.vecinos
+        for v in vecinos[celda]:
+            if v in extremos:
+                return True # Un extremo (de otro color o la otra cabeza) tocaba su región a través de 'celda'
+        # ¿Siguen conectadas entre sí las vecinas vacías de 'celda' rodeándola?
+        anillo = _anillos(estado.nivel)[celda]
+        vacias = [x != -1 and celdas[x] == 0 for x in anillo]
+        tramos_con_vecina = 0
+        for i in range(0, 8, 2):
+            # Un tramo empieza en una vecina ortogonal vacía cuya anterior en el anillo
+            # (diagonal y, si esta está ocupada, la ortogonal previa) no la conecta.
+            if vacias[i] and not (vacias[i - 1] and vacias[i - 2]):
+                tramos_con_vecina += 1
+        if tramos_con_vecina > 1:
+            return True
+        # La cabeza antigua deja de tocar sus regiones: deben ser la misma que la de 'celda'
+        for v in vecinos[anterior]:
+            if v != celda and celdas[v] == 0:
+                if v + celda == 2 * anterior:
+                    return True # Opuesta a 'celda': no hay esquina común
+                if celdas[v + celda - anterior] != 0:
+                    return True # La esquina común está ocupada
+        return False
+
+    def _comprobar_regiones(self, estado, extremos):
+        celdas = estado.celdas
+        nivel = estado.nivel
+        vecinos = nivel.vecinos
+        etiquetas = [0] * len(celdas)
+        regiones = 0
+        i = celdas.find(0)
+        while i != -1:
+            if not etiquetas[i]:
+                regiones += 1
+                etiquetas[i] = regiones
+                pila = [i]
+                while pila:
+                    x = pila.pop()
+                    for v in vecinos[x]:
+                        if celdas[v] == 0 and not etiquetas[v]:
+                            etiquetas[v] = regiones
+                            pila.append(v)
+            i = celdas.find(0, i + 1)
+
+        servidas = set()
+        caminos = estado.caminos
+        n = len(nivel.colores)
+        for j in range(n):
+            cabeza = caminos[j][-1]
+            otra = caminos[j + n][-1]
+            if cabeza == otra:
+                continue
+            junto_cabeza = {etiquetas[v] for v in vecinos[cabeza] if celdas[v] == 0}
+            junto_otra = {etiquetas[v] for v in vecinos[otra] if celdas[v] == 0}
+            comunes = junto_cabeza & junto_otra
+            if not comunes and otra not in vecinos[cabeza]:
+                return self._podar('color_inalcanzable')
+            servidas |= comunes
+        if len(servidas) < regiones:
+            return self._podar('region_varada')
+        return False
@@ -0,0 +1,100 @@
+# FlowFree/propagacion.py
+"""
+Inferencia de movimientos forzados.
+
+Tras cada decisión de la búsqueda, Propagador.propagar() aplica hasta el punto
+fijo los pasos que cualquier solución tiene que dar desde ese estado:
+- 'cabeza_unica': una de las dos cabezas de un color sin terminar (la que crece
+  desde 'inicio' o la que crece desde 'fin') tiene un solo movimiento.
+- 'celda_forzada': una celda vacía junto a una cabeza solo tiene dos vecinos
+  libres (vacíos o cabezas activas) y uno es esa cabeza. Como la celda tendrá
+  que enlazar con sus dos vecinos libres, la cabeza tiene que avanzar a ella.
+Los pasos se aplican con EstadoBusqueda.extender (la versión en el sitio de
+intentar_extender_camino) y se anotan en un rastro; deshacer() los retira todos
+de una vez al volver atrás. Cada paso forzado es un nodo en el que la búsqueda ya
+no tiene que ramificar: se cuentan en 'decisiones_evitadas'.
+"""
+
+REGLAS = ('cabeza_unica', 'celda_forzada')
+_SIN_FORZADOS = (None, None, None)
+
+
+class Propagador:
+    def __init__(self):
+        self.decisiones_evitadas = 0
+        self.conflictos = 0
+        self.contadores = dict.fromkeys(REGLAS, 0)
+
+    def propagar(self, estado, ctx=None):
+        """
+        Aplica movimientos forzados a 'estado' hasta el punto fijo. Devuelve
+        (ok, rastro): rastro es la lista de extremos extendidos, en orden, y hay que
+        pasarla a deshacer() aunque ok sea False. ok es False si se llega a una
+        cabeza sin salida o la poda de 'ctx' corta alguno de los pasos.
+        """
+        rastro = []
+        while True:
+            e, destino, regla = self._buscar_forzado(estado)
+            if regla is None:
+                if e is None:
+                    return True, rastro
+                self.conflictos += 1
+                return False, rastro
+            cabeza = estado.cabeza(e)
+            estado.extender(e, destino)
+            rastro.append(e)
+            self.contadores[regla] += 1
+            self.decisiones_evitadas += 1
+            if ctx is not None and ctx.poda(estado, e, cabeza):
+                self.conflictos += 1
+                return False, rastro
+
+    @staticmethod
+    def deshacer(estado, rastro):
+        for e in reversed(rastro):
+            estado.deshacer(e)
+
+    @staticmethod
+    def pasos(estado, rastro):
+        """Los pasos (e, destino) de 'rastro', con el rastro todavía aplicado a 'estado'."""
+        vistos = {}
+        pasos = []
+        for e in reversed(rastro):
+            vistos[e] = vistos.get(e, 0) + 1
+            pasos.append((e, estado.caminos[e][-vistos[e]]))
+        pasos.reverse()
+        return pasos
+
+    def _buscar_forzado(self, estado):
+        """
+        (e, destino, regla) del primer paso forzado; (None, None, None) si no hay
+        ninguno y (e, None, None) si el extremo e ya no tiene salida.
+        """
+        celdas = estado.celdas
+        vecinos = estado.nivel.vecinos
+        activos = [e for e in range(len(estado.caminos)) if not estado.esta_completo(e)]
+        extremos = {estado.caminos[e][-1] for e in activos}
+        for e in activos:
+            movimientos = estado.movimientos(e)
+            if not movimientos:
+                return e, None, None
+            if len(movimientos) == 1:
+                return e, movimientos[0], 'cabeza_unica'
+        for e in activos:
+            cabeza = estado.caminos[e][-1]
+            for x in vecinos[cabeza]:
+                if celdas[x] != 0:
+                    continue
+                libres = 0
+                for v in vecinos[x]:
+                    if celdas[v] == 0 or v in extremos:
+                        libres += 1
+                if libres < 2:
+                    return e, None, None # La celda ya no puede rellenarse
+                if libres == 2:
+                    return e, x, 'celda_forzada'
+        return _SIN_FORZADOS
+
+    def estadisticas(self):
+        return {'decisiones_evitadas': self.decisiones_evitadas, 'conflictos': self.conflictos,
+                **self.contadores}
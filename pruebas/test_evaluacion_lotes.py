@@ -0,0 +1,12 @@
+import pytest
+
+from evaluacion_lotes import evaluar_lote
+
+np = pytest.importorskip('numpy')
+
+
+def test_lote_vacio():
+    evaluacion = evaluar_lote([])
+    for valores in (evaluacion.vacias, evaluacion.distancias, evaluacion.callejones, evaluacion.puntuaciones):
+        assert isinstance(valores, np.ndarray)
+        assert valores.tolist() == []
@@ -0,0 +1,38 @@
+import glob
+import os
+
+import pytest
+
+from algoritmos_busqueda import Presupuesto, resolver, verificar_solucion
+from tablero_juego import TableroJuego, cargar_nivel_desde_archivo
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Tableros pequeños cuya única solución obliga a un camino a tocarse a sí mismo,
+# uno sin solución y uno con pared
+CASOS_REGRESION = (
+    ["A.", "A."],
+    ["A..", "...", "..A"],
+    ["A.B", "...", "A.B"],
+    ["AB", "BA"],
+    ["AB.", ".#.", "AB."],
+)
+
+
+def _comprobar_contra_dfs(tablero):
+    dlx = resolver(tablero, 'dlx', presupuesto=Presupuesto(max_segundos=30))
+    dfs = resolver(tablero, 'dfs', presupuesto=Presupuesto(max_segundos=30))
+    assert dlx.resuelto == dfs.resuelto, (dlx.motivo, dfs.motivo)
+    if dlx.resuelto:
+        assert verificar_solucion(tablero, dlx.caminos)
+
+
+@pytest.mark.parametrize('filas', CASOS_REGRESION)
+def test_casos_regresion(filas):
+    _comprobar_contra_dfs(TableroJuego(filas))
+
+
+@pytest.mark.parametrize('ruta', sorted(glob.glob(os.path.join(RAIZ, 'Levels', '5x5', '*.txt'))
+                                        + glob.glob(os.path.join(RAIZ, 'Levels', '7x7', '*.txt'))))
+def test_niveles(ruta):
+    _comprobar_contra_dfs(cargar_nivel_desde_archivo(ruta))
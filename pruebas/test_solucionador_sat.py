@@ -0,0 +1,28 @@
+from algoritmos_busqueda import resolver, verificar_solucion
+from generador_niveles import generar_nivel
+from tablero_juego import TableroJuego
+
+
+def test_pared_interior_sin_solucion():
+    assert resolver(TableroJuego(['A.A', '.#.', '...']), 'sat').motivo == 'agotado'
+
+
+def test_pared_interior_con_solucion():
+    tablero = TableroJuego(['AB.', '.#.', 'AB.'])
+    resultado = resolver(tablero, 'sat')
+    assert resultado.resuelto
+    assert verificar_solucion(tablero, resultado.caminos)
+
+
+def test_niveles_generados_con_paredes():
+    for semilla in range(10):
+        filas, _ = generar_nivel(6, 6, densidad_paredes=0.15, semilla=semilla)
+        tablero = TableroJuego(filas)
+        resultado = resolver(tablero, 'sat')
+        assert resultado.resuelto, semilla
+        assert verificar_solucion(tablero, resultado.caminos)
+
+
+def test_unica_con_paredes():
+    filas, _ = generar_nivel(5, 5, densidad_paredes=0.15, semilla=3, unica=True)
+    assert any('#' in fila for fila in filas)
@@ -0,0 +1,413 @@
+# FlowFree/puntos_control.py
+"""
+Puntos de control para reanudar búsquedas largas (bfs, dfs, voraz y a_estrella).
+
+Cada 'cada_segundos' la búsqueda entrega una instantánea de su estado (frontera,
+cerrados o tabla de transposición, contadores, contadores de poda y propagación y
+el estado de random) y un hilo escritor la serializa y la añade al final del
+archivo. El hilo de la búsqueda solo copia listas de referencias; si el escritor
+aún no ha terminado con la anterior, ese punto se salta.
+
+El archivo solo crece: un registro 'CABE' con los datos de la búsqueda y luego un
+registro 'PUNT' por punto de control, cada uno con tipo, CRC32 y longitud. Los
+registros guardan solo lo que cambió desde el anterior:
+- cerrados: las huellas añadidas desde el punto anterior.
+- frontera: tramos que conservan de la frontera anterior y los nodos nuevos.
+  Cada nodo se guarda como sus pasos (e, celda) desde la raíz, sin el tablero.
+- tabla de transposición: los huecos que cambiaron (índice, huella, profundidad).
+  El escritor guarda la copia del punto anterior y compara por bloques de
+  BLOQUE_TABLA huecos, así que un punto ocupa lo que la tabla cambió, no su tamaño.
+Al reanudar, el archivo se lee registro a registro, sin cargarlo entero.
+
+    puntos = PuntosControl('partida.ckpt', cada_segundos=60)
+    resultado = resolver(tablero, 'a_estrella', puntos_control=puntos)
+    # Si se corta, la misma llamada sigue desde el último punto guardado.
+
+Si el proceso muere mientras escribe, al reanudar se descarta el registro
+incompleto del final. Reanudar con otro tablero, algoritmo, heurística o
+configuración de poda, propagación o tabla lanza ValueError.
+"""
+import json
+import os
+import queue
+import random
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+
+VERSION = 2
+ALGORITMOS_REANUDABLES = ('bfs', 'dfs', 'voraz', 'a_estrella')
+CABECERA_REGISTRO = struct.Struct('<4sII') # tipo, crc32 del contenido, longitud del contenido
+LONGITUD_META = struct.Struct('<I')
+INTERVALO_NODOS = 256 # Cada cuántas expansiones se mira el reloj
+BLOQUE_TABLA = 512 # Huecos de la tabla de transposición que se comparan de una vez
+
+
+class _CerradosRegistrados(set):
+    """set de cerrados que anota las huellas añadidas desde el último punto."""
+    def __init__(self, huellas=()):
+        super().__init__(huellas)
+        self.nuevas = array('Q', self)
+
+    def add(self, huella):
+        super().add(huella)
+        self.nuevas.append(huella)
+
+
+def _codificar_registro(tipo, meta, bloques=()):
+    """Contenido: longitud del JSON, JSON (con el tamaño de cada bloque) y los bloques."""
+    bloques = [(nombre, datos.tobytes() if isinstance(datos, array) else datos) for nombre, datos in bloques]
+    meta = dict(meta, bloques=[[nombre, len(datos)] for nombre, datos in bloques])
+    texto = json.dumps(meta).encode('utf-8')
+    contenido = LONGITUD_META.pack(len(texto)) + texto + b''.join(datos for _, datos in bloques)
+    return CABECERA_REGISTRO.pack(tipo, zlib.crc32(contenido), len(contenido)) + contenido
+
+
+def _decodificar_contenido(contenido):
+    (longitud,) = LONGITUD_META.unpack_from(contenido)
+    posicion = LONGITUD_META.size + longitud
+    meta = json.loads(contenido[LONGITUD_META.size:posicion].decode('utf-8'))
+    bloques = {}
+    for nombre, tamano in meta['bloques']:
+        bloques[nombre] = contenido[posicion:posicion + tamano]
+        posicion += tamano
+    return meta, bloques
+
+
+def recorrer_registros(f):
+    """
+    Genera (tipo, contenido, bytes válidos hasta aquí) por cada registro entero
+    del archivo abierto 'f'; se detiene en el primero truncado o con el CRC equivocado.
+    """
+    validos = 0
+    while True:
+        cabecera = f.read(CABECERA_REGISTRO.size)
+        if len(cabecera) < CABECERA_REGISTRO.size:
+            return
+        tipo, crc, longitud = CABECERA_REGISTRO.unpack(cabecera)
+        contenido = f.read(longitud)
+        if len(contenido) < longitud or zlib.crc32(contenido) != crc:
+            return
+        validos += CABECERA_REGISTRO.size + longitud
+        yield tipo, contenido, validos
+
+
+def _array(tipo, datos, cambiar_orden):
+    valores = array(tipo)
+    valores.frombytes(datos)
+    if cambiar_orden:
+        valores.byteswap()
+    return valores
+
+
+def _codificar_nodo(salida, estado, g, raiz):
+    pasos = estado.pasos_desde(raiz)
+    salida.append(g)
+    salida.append(len(pasos))
+    for e, celda in pasos:
+        salida.append(e)
+        salida.append(celda)
+
+
+def _decodificar_nodos(valores):
+    """Nodos (g, pasos) de un array [g, m, e1, c1, ..., em, cm, g, m, ...]."""
+    nodos = []
+    i = 0
+    while i < len(valores):
+        g, m = valores[i], valores[i + 1]
+        nodos.append((g, tuple(valores[i + 2:i + 2 + 2 * m])))
+        i += 2 + 2 * m
+    return nodos
+
+
+def _reconstruir(raiz, pasos):
+    estado = raiz.copiar()
+    for i in range(0, len(pasos), 2):
+        estado.extender(pasos[i], pasos[i + 1])
+    return estado
+
+
+def _contadores(objeto):
+    """Contadores (enteros y diccionarios) de un Podador o Propagador."""
+    if objeto is None:
+        return None
+    return {nombre: dict(valor) if isinstance(valor, dict) else valor
+            for nombre, valor in vars(objeto).items() if isinstance(valor, (int, dict))}
+
+
+class PuntosControl:
+    """
+    - ruta: archivo de puntos de control; si ya existe se reanuda desde él.
+    - cada_segundos: tiempo mínimo entre dos puntos.
+    - cada_nodos: si se indica, cada cuántos nodos expandidos como mucho (útil para
+      búsquedas cortas y pruebas).
+    """
+    def __init__(self, ruta, cada_segundos=60.0, cada_nodos=None):
+        self.ruta = ruta
+        self.cada_segundos = cada_segundos
+        self.cada_nodos = cada_nodos
+        self.proxima_comprobacion = 0 # Nodos expandidos en que se vuelve a mirar el reloj
+        self.puntos_guardados = 0
+        self.puntos_saltados = 0 # El escritor aún estaba con el anterior
+        self.reanudado = False
+        self.error = None
+        self.algoritmo = None
+        self.heuristica = None
+        self._raiz = None
+        self._archivo = None
+        self._hilo = None
+        self._cola = None
+        self._libre = threading.Event()
+        self._anterior = [] # Frontera (entradas ordenadas) del último punto escrito
+        self._tabla_anterior = None # (huellas, profundidades) tal como quedan en el archivo
+        self._ultimo_punto = 0.0
+        self._ultimos_nodos = 0
+
+    def preparar(self, algoritmo, heuristica):
+        if algoritmo not in ALGORITMOS_REANUDABLES:
+            raise ValueError(f"Los puntos de control solo funcionan con {', '.join(ALGORITMOS_REANUDABLES)}")
+        self.algoritmo = algoritmo
+        self.reanudado = False
+        self.heuristica = getattr(heuristica, '__name__', None)
+
+    def _cabecera(self, raiz, ctx):
+        return {
+            'version': VERSION, 'orden_bytes': sys.byteorder, 'algoritmo': self.algoritmo,
+            'heuristica': self.heuristica, 'filas': list(raiz.nivel.filas_base), 'caminos': raiz.caminos,
+            'hash': raiz.hash_zobrist, 'podar': ctx.podador is not None, 'propagar': ctx.propagador is not None,
+            'tabla': [ctx.tabla.tamano, ctx.tabla.politica] if ctx.tabla is not None else None,
+        }
+
+    # --- Reanudar ---
+
+    def reanudar(self, raiz, ctx, frontera):
+        """
+        Si el archivo tiene puntos de esta búsqueda, restaura en 'ctx' y 'frontera' el
+        último y devuelve True. Devuelve False si no hay nada que reanudar.
+        """
+        if not os.path.exists(self.ruta):
+            return False
+        with open(self.ruta, 'rb') as f:
+            registros = recorrer_registros(f)
+            primero = next(registros, None)
+            if primero is None or primero[0] != b'CABE':
+                return False
+            cabecera, _ = _decodificar_contenido(primero[1])
+            validos = primero[2]
+            esperada = self._cabecera(raiz, ctx)
+            for clave in ('version', 'algoritmo', 'heuristica', 'filas', 'caminos', 'hash', 'podar', 'propagar',
+                          'tabla'):
+                if cabecera.get(clave) != esperada[clave]:
+                    raise ValueError(f"El punto de control de '{self.ruta}' es de otra búsqueda ({clave} distinto)")
+
+            cambiar_orden = cabecera['orden_bytes'] != sys.byteorder
+            cerrados = set()
+            nodos = []
+            meta = bloques = None
+            if ctx.tabla is not None: # La tabla vacía más los cambios de cada punto
+                huellas = array('Q', bytes(8 * ctx.tabla.tamano))
+                profundidades = array('H', bytes(2 * ctx.tabla.tamano))
+            for _, contenido, validos in registros:
+                meta, bloques = _decodificar_contenido(contenido)
+                cerrados.update(_array('Q', bloques['cerrados'], cambiar_orden))
+                nuevos = iter(_decodificar_nodos(_array('I', bloques['nuevos'], cambiar_orden)))
+                tramos = _array('q', bloques['tramos'], cambiar_orden)
+                siguiente = []
+                for i in range(0, len(tramos), 2):
+                    desde, cuantos = tramos[i], tramos[i + 1]
+                    if desde < 0:
+                        siguiente.extend(next(nuevos) for _ in range(cuantos))
+                    else:
+                        siguiente.extend(nodos[desde:desde + cuantos])
+                nodos = siguiente
+                if ctx.tabla is not None:
+                    for i, huella, profundidad in zip(_array('I', bloques['tabla_indices'], cambiar_orden),
+                                                      _array('Q', bloques['huellas'], cambiar_orden),
+                                                      _array('H', bloques['profundidades'], cambiar_orden)):
+                        huellas[i] = huella
+                        profundidades[i] = profundidad
+        if os.path.getsize(self.ruta) > validos:
+            print(f"Aviso: se descarta un punto de control incompleto al final de '{self.ruta}'.")
+            with open(self.ruta, 'r+b') as f:
+                f.truncate(validos)
+        if meta is None:
+            return False
+
+        # Estado del último punto
+        for g, pasos in nodos:
+            frontera.meter(_reconstruir(raiz, pasos), g)
+        if ctx.tabla is not None:
+            tabla = ctx.tabla
+            tabla.huellas = huellas
+            tabla.profundidades = profundidades
+            for nombre, valor in meta['tabla'].items():
+                setattr(tabla, nombre, valor)
+            self._tabla_anterior = (array('Q', huellas), array('H', profundidades))
+        else:
+            ctx.cerrados = cerrados
+        for nombre in ('nodos_expandidos', 'nodos_generados', 'frontera_maxima'):
+            setattr(ctx, nombre, meta[nombre])
+        ctx.inicio = time.perf_counter() - meta['tiempo']
+        for objeto, guardado in ((ctx.podador, meta['podador']), (ctx.propagador, meta['propagador'])):
+            for nombre, valor in (guardado or {}).items():
+                setattr(objeto, nombre, valor)
+        if 'parcial' in bloques:
+            ctx.mejor_avance = meta['mejor_avance']
+            ctx.mejor_parcial = _reconstruir(raiz, _decodificar_nodos(_array('I', bloques['parcial'],
+                                                                             cambiar_orden))[0][1])
+        version, interno, gauss = meta['random']
+        random.setstate((version, tuple(interno), gauss))
+        self._anterior = self._ordenar(frontera.instantanea())
+        self.reanudado = True
+        return True
+
+    # --- Guardar ---
+
+    def empezar(self, raiz, ctx):
+        """Abre el archivo (escribiendo la cabecera si es nuevo) y arranca el escritor."""
+        self._raiz = raiz
+        if ctx.tabla is None and not isinstance(ctx.cerrados, _CerradosRegistrados):
+            # Tras reanudar, los cerrados ya están en el archivo: solo se anotan los nuevos
+            cerrados = _CerradosRegistrados(ctx.cerrados)
+            if self.reanudado:
+                cerrados.nuevas = array('Q')
+            ctx.cerrados = cerrados
+        if ctx.tabla is not None and self._tabla_anterior is None:
+            # En el archivo aún no hay nada de la tabla: el primer punto la compara con una vacía
+            self._tabla_anterior = (array('Q', bytes(8 * ctx.tabla.tamano)), array('H', bytes(2 * ctx.tabla.tamano)))
+        self._archivo = open(self.ruta, 'ab')
+        if not self.reanudado:
+            self._archivo.truncate(0)
+            self._archivo.write(_codificar_registro(b'CABE', self._cabecera(raiz, ctx)))
+            self._archivo.flush()
+        self._cola = queue.Queue()
+        self._libre.set()
+        self._hilo = threading.Thread(target=self._escritor, daemon=True)
+        self._hilo.start()
+        self._ultimo_punto = time.perf_counter()
+        self._ultimos_nodos = ctx.nodos_expandidos
+        self.proxima_comprobacion = ctx.nodos_expandidos + self._intervalo_nodos()
+
+    def _intervalo_nodos(self):
+        return min(self.cada_nodos or INTERVALO_NODOS, INTERVALO_NODOS)
+
+    def tal_vez_guardar(self, ctx, frontera):
+        """Llamada en el hilo de la búsqueda entre dos expansiones."""
+        self.proxima_comprobacion = ctx.nodos_expandidos + self._intervalo_nodos()
+        if self._cola is None or self.error is not None:
+            return
+        if self.cada_nodos is not None:
+            toca = ctx.nodos_expandidos - self._ultimos_nodos >= self.cada_nodos
+        else:
+            toca = time.perf_counter() - self._ultimo_punto >= self.cada_segundos
+        if not toca:
+            return
+        if not self._libre.is_set():
+            self.puntos_saltados += 1
+            return
+        self._libre.clear()
+        self._ultimo_punto = time.perf_counter()
+        self._ultimos_nodos = ctx.nodos_expandidos
+        self._cola.put(self._instantanea(ctx, frontera))
+
+    def _instantanea(self, ctx, frontera):
+        """Copia barata del estado de la búsqueda: el trabajo de serializarlo lo hace el escritor."""
+        meta = {
+            'nodos_expandidos': ctx.nodos_expandidos, 'nodos_generados': ctx.nodos_generados,
+            'frontera_maxima': ctx.frontera_maxima, 'tiempo': time.perf_counter() - ctx.inicio,
+            'podador': _contadores(ctx.podador), 'propagador': _contadores(ctx.propagador),
+            'random': random.getstate(), 'mejor_avance': ctx.mejor_avance,
+        }
+        tabla = None
+        if ctx.tabla is not None:
+            t = ctx.tabla
+            tabla = (array('Q', t.huellas), array('H', t.profundidades))
+            meta['tabla'] = {'aciertos': t.aciertos, 'fallos': t.fallos, 'colisiones': t.colisiones,
+                             'ocupadas': t.ocupadas}
+            cerrados = array('Q')
+        else:
+            cerrados = ctx.cerrados.nuevas
+            ctx.cerrados.nuevas = array('Q')
+        return meta, frontera.instantanea(), cerrados, tabla, ctx.mejor_parcial
+
+    @staticmethod
+    def _ordenar(entradas):
+        """Entradas de la frontera en el orden en que hay que volver a meterlas."""
+        if entradas and isinstance(entradas[0], list): # Montículo de FronteraPrioridad: [prioridad, orden, nodo]
+            return sorted(entradas, key=lambda entrada: (entrada[0], entrada[1]))
+        return entradas
+
+    def _escritor(self):
+        while True:
+            instantanea = self._cola.get()
+            if instantanea is None:
+                return
+            try:
+                self._escribir(*instantanea)
+                self.puntos_guardados += 1
+            except Exception as error: # Un fallo al guardar no debe parar la búsqueda
+                self.error = error
+                print(f"Error guardando el punto de control en '{self.ruta}': {error}")
+            finally:
+                self._libre.set()
+
+    def _escribir(self, meta, entradas, cerrados, tabla, parcial):
+        entradas = self._ordenar(entradas)
+        # Tramos (desde, cuántos) de la frontera anterior; desde = -1 son nodos nuevos
+        posiciones = {id(entrada): i for i, entrada in enumerate(self._anterior)}
+        tramos = array('q')
+        nuevos = array('I')
+        raiz = self._raiz
+        for entrada in entradas:
+            i = posiciones.get(id(entrada), -1)
+            if i < 0:
+                estado, g = entrada[2] if isinstance(entrada, list) else entrada
+                _codificar_nodo(nuevos, estado, g, raiz)
+            if tramos and (tramos[-2] < 0) == (i < 0) and (i < 0 or tramos[-2] + tramos[-1] == i):
+                tramos[-1] += 1
+            else:
+                tramos.extend((i, 1))
+        bloques = [('cerrados', cerrados), ('tramos', tramos), ('nuevos', nuevos)]
+        if tabla is not None:
+            bloques += self._cambios_tabla(*tabla)
+        if parcial is not None:
+            codificado = array('I')
+            _codificar_nodo(codificado, parcial, 0, raiz)
+            bloques.append(('parcial', codificado))
+        self._archivo.write(_codificar_registro(b'PUNT', meta, bloques))
+        self._archivo.flush()
+        os.fsync(self._archivo.fileno())
+        self._anterior = entradas
+
+    def _cambios_tabla(self, huellas, profundidades):
+        """Bloques con los huecos de la tabla que cambiaron desde el punto anterior."""
+        anteriores, profundidades_anteriores = self._tabla_anterior
+        vistas = [(memoryview(huellas), memoryview(anteriores)),
+                  (memoryview(profundidades), memoryview(profundidades_anteriores))]
+        indices = array('I')
+        for inicio in range(0, len(huellas), BLOQUE_TABLA):
+            fin = min(inicio + BLOQUE_TABLA, len(huellas))
+            # Comparar los bytes del bloque es mucho más barato que hueco a hueco
+            if all(nueva[inicio:fin].tobytes() == vieja[inicio:fin].tobytes() for nueva, vieja in vistas):
+                continue
+            indices.extend(i for i in range(inicio, fin)
+                           if huellas[i] != anteriores[i] or profundidades[i] != profundidades_anteriores[i])
+        self._tabla_anterior = (huellas, profundidades)
+        return [('tabla_indices', indices), ('huellas', array('Q', (huellas[i] for i in indices))),
+                ('profundidades', array('H', (profundidades[i] for i in indices)))]
+
+    def cerrar(self):
+        """Espera a que el escritor termine y cierra el archivo. Se puede llamar varias veces."""
+        if self._hilo is not None:
+            self._cola.put(None)
+            self._hilo.join()
+            self._hilo = None
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+        self._cola = None
+        self._anterior = []
+        self._tabla_anterior = None
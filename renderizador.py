@@ -0,0 +1,196 @@
+# FlowFree/renderizador.py
+"""
+Dibujo del tablero en la terminal por diferencias.
+
+Renderizador guarda el último fotograma dibujado y en el siguiente solo emite los
+movimientos de cursor ANSI y las celdas (o líneas de texto) que cambiaron, todo
+en una sola escritura. No hace falta limpiar la pantalla entre fotogramas, así
+que no hay parpadeo ni se lanza ningún subproceso. Las celdas se colorean según
+Levels/Color_Legend.txt ('R = Red'); las letras sin entrada en la leyenda toman
+un color fijo de PALETA.
+
+Si la salida no es una terminal (o TERM=dumb) se escribe cada fotograma entero en
+texto plano, como mostrar_tablero_consola.
+
+mostrar_progreso() dibuja los eventos de resolucion_progresiva: el motor sigue en
+su hilo y aquí solo se pinta, a la frecuencia de los eventos, lo que cambió.
+"""
+import os
+import sys
+
+from tablero_juego import TableroJuego
+
+RUTA_LEYENDA = os.path.join('Levels', 'Color_Legend.txt')
+
+# Nombre de color (en minúsculas) -> RGB
+COLORES_RGB = {
+    'red': (230, 25, 25), 'green': (0, 160, 0), 'blue': (30, 80, 255), 'yellow': (235, 225, 0),
+    'orange': (255, 140, 0), 'cyan': (0, 220, 220), 'magenta': (220, 0, 220), 'pink': (255, 130, 200),
+    'purple': (140, 40, 180), 'brown': (150, 80, 30), 'white': (235, 235, 235), 'gray': (128, 128, 128),
+    'grey': (128, 128, 128), 'silver': (190, 190, 190), 'golden': (218, 165, 32), 'gold': (218, 165, 32),
+    'teal': (0, 128, 128), 'lime': (150, 255, 0), 'maroon': (128, 0, 0), 'navy': (0, 0, 128),
+    'dark blue': (0, 0, 160), 'light blue': (120, 190, 255), 'dark green': (0, 100, 0),
+    'light olive green': (170, 190, 90), 'olive': (128, 128, 0), 'fucsia': (255, 0, 160),
+    'fuchsia': (255, 0, 160), 'violet': (160, 100, 255), 'beige': (225, 210, 170),
+}
+PALETA = [(230, 25, 25), (0, 160, 0), (30, 80, 255), (235, 225, 0), (255, 140, 0), (0, 220, 220),
+          (220, 0, 220), (150, 80, 30), (255, 130, 200), (140, 40, 180), (0, 128, 128), (150, 255, 0),
+          (190, 190, 190), (128, 0, 0), (170, 190, 90), (120, 190, 255)]
+
+ESC = '\x1b['
+REINICIO = ESC + '0m'
+
+
+def cargar_leyenda(ruta=RUTA_LEYENDA):
+    """{letra: RGB} a partir de las líneas 'X = Nombre' de la leyenda. Vacío si no se puede leer."""
+    leyenda = {}
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            for linea in f:
+                letra, separador, nombre = linea.partition('=')
+                letra, nombre = letra.strip(), nombre.strip().lower()
+                if separador and len(letra) == 1 and nombre in COLORES_RGB:
+                    leyenda[letra] = COLORES_RGB[nombre]
+    except OSError:
+        pass
+    return leyenda
+
+
+def terminal_con_ansi(salida):
+    if not hasattr(salida, 'isatty') or not salida.isatty() or os.environ.get('TERM') == 'dumb':
+        return False
+    if os.name == 'nt':
+        os.system('') # Activa las secuencias VT en la consola de Windows 10+
+    return True
+
+
+def cuadricula_con_caminos(tablero, caminos, caminos_fin=None):
+    """Cuadrícula (lista de filas de caracteres) de 'tablero' con 'caminos' (y 'caminos_fin') dibujados encima."""
+    cuadricula = [list(fila) for fila in tablero.cuadricula_base_con_paredes]
+    for rutas in (caminos, caminos_fin):
+        for color, ruta in (rutas or {}).items():
+            for f, c in ruta:
+                cuadricula[f][c] = color
+    return cuadricula
+
+
+class Renderizador:
+    """
+    Dibuja fotogramas formados por líneas de 'encabezado', el tablero y líneas de
+    'pie'. Las posiciones son absolutas desde la esquina superior izquierda: lo que
+    otros escriban debajo del fotograma (menús, input()) se borra en el siguiente.
+    """
+    def __init__(self, base, salida=None, ansi=None, leyenda=None):
+        self.base = base # cuadricula_base_con_paredes: distingue extremos de caminos
+        self.alto, self.ancho = len(base), len(base[0])
+        self.salida = salida or sys.stdout
+        self.ansi = terminal_con_ansi(self.salida) if ansi is None else ansi
+        self.leyenda = cargar_leyenda() if leyenda is None else leyenda
+        self.estilos = {} # caracter de la base + caracter actual -> celda ya formateada
+        self.anterior = None # (encabezado, celdas, pie) del último fotograma
+        self.fotogramas = 0
+        self.bytes_escritos = 0
+
+    def _color(self, letra):
+        return self.leyenda.get(letra) or PALETA[ord(letra) % len(PALETA)]
+
+    def _celda(self, base, actual):
+        clave = base + actual
+        texto = self.estilos.get(clave)
+        if texto is None:
+            if not self.ansi:
+                texto = actual + ' '
+            elif actual == TableroJuego.CARACTER_PARED:
+                texto = f"{ESC}90m#{REINICIO} "
+            elif actual == TableroJuego.CARACTER_VACIO:
+                texto = f"{ESC}2m.{REINICIO} "
+            else:
+                r, g, b = self._color(actual)
+                if base == actual: # Extremo: letra en negrita sobre su color
+                    texto = f"{ESC}1;30;48;2;{r};{g};{b}m{actual}{REINICIO} "
+                else:
+                    texto = f"{ESC}1;38;2;{r};{g};{b}m{actual}{REINICIO} "
+            self.estilos[clave] = texto
+        return texto
+
+    def forzar_redibujo(self):
+        """El próximo fotograma se dibuja entero (p. ej. tras cambiar el tamaño de la terminal)."""
+        self.anterior = None
+
+    def dibujar(self, cuadricula, encabezado=(), pie=()):
+        encabezado, pie = list(encabezado), list(pie)
+        celdas = [fila[c] for fila in cuadricula for c in range(self.ancho)]
+        if not self.ansi:
+            texto = self._completo_plano(celdas, encabezado, pie)
+        elif (self.anterior is None or len(self.anterior[0]) != len(encabezado)
+              or len(self.anterior[2]) != len(pie)):
+            texto = self._completo(celdas, encabezado, pie)
+        else:
+            texto = self._diferencias(celdas, encabezado, pie)
+        self.anterior = (encabezado, celdas, pie)
+        self._escribir(texto)
+
+    def dibujar_caminos(self, tablero, caminos, encabezado=(), pie=(), caminos_fin=None):
+        self.dibujar(cuadricula_con_caminos(tablero, caminos, caminos_fin), encabezado, pie)
+
+    def _escribir(self, texto):
+        self.salida.write(texto)
+        self.salida.flush()
+        self.fotogramas += 1
+        self.bytes_escritos += len(texto)
+
+    def _borde(self):
+        return "-" * (self.ancho * 2 + 3)
+
+    def _fila(self, celdas, f):
+        base = self.base[f]
+        inicio = f * self.ancho
+        return "| " + "".join(self._celda(base[c], celdas[inicio + c]) for c in range(self.ancho)) + "|"
+
+    def _lineas(self, celdas, encabezado, pie):
+        return (encabezado + [self._borde()] + [self._fila(celdas, f) for f in range(self.alto)]
+                + [self._borde()] + pie)
+
+    def _completo_plano(self, celdas, encabezado, pie):
+        return "\n".join(self._lineas(celdas, encabezado, pie)) + "\n"
+
+    def _completo(self, celdas, encabezado, pie):
+        lineas = self._lineas(celdas, encabezado, pie)
+        # Cursor al principio, cada línea borrando lo que quedara a su derecha y el resto de la pantalla limpio
+        return ESC + "H" + "".join(linea + ESC + "K\n" for linea in lineas) + ESC + "J"
+
+    def _diferencias(self, celdas, encabezado, pie):
+        anterior_encabezado, anteriores, anterior_pie = self.anterior
+        partes = []
+        for i, linea in enumerate(encabezado):
+            if linea != anterior_encabezado[i]:
+                partes.append(f"{ESC}{i + 1};1H{linea}{ESC}K")
+        primera_fila = len(encabezado) + 2 # Filas de la terminal empiezan en 1 y hay un borde encima
+        ancho = self.ancho
+        for i, actual in enumerate(celdas):
+            if actual != anteriores[i]:
+                f, c = divmod(i, ancho)
+                partes.append(f"{ESC}{primera_fila + f};{3 + 2 * c}H{self._celda(self.base[f][c], actual)}")
+        linea_pie = primera_fila + self.alto + 1
+        for i, linea in enumerate(pie):
+            if linea != anterior_pie[i]:
+                partes.append(f"{ESC}{linea_pie + i};1H{linea}{ESC}K")
+        # El cursor queda debajo del fotograma y se limpia lo que otros escribieron ahí
+        partes.append(f"{ESC}{linea_pie + len(pie)};1H{ESC}J")
+        return "".join(partes)
+
+
+def mostrar_progreso(tablero, eventos, renderizador=None, titulo=""):
+    """
+    Dibuja la mejor asignación parcial de cada evento de 'eventos' (un generador de
+    resolucion_progresiva) y devuelve el evento final.
+    """
+    renderizador = renderizador or Renderizador(tablero.cuadricula_base_con_paredes)
+    evento = None
+    for evento in eventos:
+        if evento.tipo == 'progreso' and not renderizador.ansi:
+            continue # Sin ANSI cada fotograma es el tablero entero: solo se dibuja el final
+        estado = (f"{evento.nodos_expandidos} nodos | profundidad {evento.profundidad} | "
+                  f"{evento.tiempo_segundos:.1f}s" if evento.tipo == 'progreso' else evento.resultado.motivo)
+        renderizador.dibujar_caminos(tablero, evento.caminos, [titulo], [estado], evento.caminos_fin)
+    return evento
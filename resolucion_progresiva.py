@@ -0,0 +1,203 @@
+# FlowFree/resolucion_progresiva.py
+"""
+Resolución progresiva (anytime) con eventos de progreso y cancelación.
+
+El motor corre en un hilo aparte y, cada 'intervalo' segundos como mucho, publica
+un EventoProgreso con los contadores y el mejor estado parcial visto (el de más
+pasos dados). Los eventos pasan por una cola: si quien los consume va más lento,
+los de progreso se descartan cuando hay 'max_pendientes' esperando, así el motor
+nunca se bloquea. El último evento es siempre de tipo 'fin' y trae el
+ResultadoBusqueda; si se acabó el plazo o se canceló, su 'parcial' (y el 'caminos'
+del evento) tiene la mejor asignación parcial.
+
+    for evento in resolver_progresivo(tablero, 'dfs', plazo=5):
+        print(evento)
+    resultado = evento.resultado
+
+    resultado = await resolver_async(tablero, 'a_estrella', plazo=2, al_progresar=print)
+
+La cancelación es cooperativa (TokenCancelacion en el Presupuesto): el motor la ve
+en su siguiente comprobación de límites y termina con motivo 'cancelado'. Cerrar
+el generador o cancelar la tarea de asyncio también cancela el motor; un Ctrl+C
+mientras resolver_progresivo espera eventos lo cancela y deja llegar el resultado. Los motores
+externos (sat, carrera, dfs_paralelo) respetan plazo y cancelación, pero solo
+emiten el evento final.
+"""
+import asyncio
+import queue
+import threading
+import time
+
+from algoritmos_busqueda import (resolver, pasos_dados, Presupuesto, ResultadoBusqueda, TokenCancelacion)
+
+INTERVALO_POR_DEFECTO = 0.25 # Segundos mínimos entre eventos de progreso
+MAX_PENDIENTES = 16
+
+
+class EventoProgreso:
+    """
+    - tipo: 'progreso' o 'fin'.
+    - nodos_expandidos, nodos_generados, frontera: contadores del motor.
+    - profundidad: pasos dados en el nodo que se estaba expandiendo.
+    - tiempo_segundos: desde que empezó la búsqueda.
+    - caminos: mejor asignación parcial ({color: [(f, c), ...]}); en 'fin', la
+      solución si la hay.
+    - caminos_fin: en la asignación parcial, lo que creció desde cada 'fin'.
+    - resultado: ResultadoBusqueda, solo en 'fin'.
+    - error: excepción que lanzó el motor, si lo hizo (solo en 'fin').
+    """
+    def __init__(self, tipo, nodos_expandidos=0, nodos_generados=0, frontera=0, profundidad=0,
+                 tiempo_segundos=0.0, caminos=None, resultado=None, error=None, caminos_fin=None):
+        self.tipo = tipo
+        self.nodos_expandidos = nodos_expandidos
+        self.nodos_generados = nodos_generados
+        self.frontera = frontera
+        self.profundidad = profundidad
+        self.tiempo_segundos = tiempo_segundos
+        self.caminos = caminos
+        self.caminos_fin = caminos_fin
+        self.resultado = resultado
+        self.error = error
+
+    @classmethod
+    def final(cls, resultado):
+        return cls('fin', resultado.nodos_expandidos, resultado.nodos_generados, resultado.frontera_maxima,
+                   0, resultado.tiempo_segundos, resultado.caminos or resultado.parcial, resultado,
+                   caminos_fin=None if resultado.caminos else resultado.parcial_fin)
+
+    def __repr__(self):
+        if self.tipo == 'fin':
+            return f"EventoProgreso(fin: {self.resultado!r})"
+        return (f"EventoProgreso(expandidos={self.nodos_expandidos}, frontera={self.frontera}, "
+                f"profundidad={self.profundidad}, tiempo={self.tiempo_segundos:.2f}s)")
+
+
+class _Observador:
+    """Observador de ContextoBusqueda que publica un evento cada 'intervalo' segundos como mucho."""
+    def __init__(self, intervalo, publicar):
+        self.intervalo = intervalo
+        self.publicar = publicar
+        self.ultimo = time.perf_counter()
+
+    def __call__(self, ctx, estado):
+        ahora = time.perf_counter()
+        if ahora - self.ultimo < self.intervalo:
+            return
+        self.ultimo = ahora
+        parcial = ctx.mejor_parcial
+        self.publicar(EventoProgreso(
+            'progreso', ctx.nodos_expandidos, ctx.nodos_generados, ctx.frontera_actual,
+            pasos_dados(estado) if estado is not None else 0, ahora - ctx.inicio,
+            parcial.caminos_por_color() if parcial is not None else None,
+            caminos_fin=parcial.caminos_fin_por_color() if parcial is not None else None))
+
+
+def _presupuesto_con_plazo(presupuesto, plazo, cancelacion):
+    """Copia de 'presupuesto' con el plazo (el menor de los dos) y el token de cancelación."""
+    presupuesto = presupuesto or Presupuesto()
+    max_segundos = presupuesto.max_segundos
+    if plazo is not None:
+        max_segundos = plazo if max_segundos is None else min(max_segundos, plazo)
+    return Presupuesto(presupuesto.max_nodos, max_segundos, presupuesto.max_memoria_mb, cancelacion)
+
+
+def _lanzar(tablero, algoritmo, intervalo, plazo, cancelacion, opciones, publicar):
+    """Arranca el motor en un hilo; publicar(evento) recibe los eventos, el 'fin' el último."""
+    presupuesto = _presupuesto_con_plazo(opciones.pop('presupuesto', None), plazo, cancelacion)
+
+    def trabajo():
+        try:
+            resultado = resolver(tablero, algoritmo, presupuesto=presupuesto,
+                                 observador=_Observador(intervalo, publicar), **opciones)
+        except Exception as e: # Se entrega a quien consume los eventos en vez de perderse en el hilo
+            publicar(EventoProgreso('fin', resultado=ResultadoBusqueda(algoritmo, False, None, 'error'), error=e))
+            return
+        publicar(EventoProgreso.final(resultado))
+
+    hilo = threading.Thread(target=trabajo, name=f"resolver-{algoritmo}", daemon=True)
+    hilo.start()
+    return hilo
+
+
+def _evento_final(evento):
+    if evento.error is not None:
+        raise evento.error
+    return evento
+
+
+def resolver_progresivo(tablero, algoritmo='dfs', intervalo=INTERVALO_POR_DEFECTO, plazo=None,
+                        cancelacion=None, max_pendientes=MAX_PENDIENTES, **opciones):
+    """
+    Generador de EventoProgreso para resolver(tablero, algoritmo, **opciones). 'plazo'
+    en segundos se suma al presupuesto; 'cancelacion' (TokenCancelacion) permite
+    pararlo desde otro hilo sin perder el resultado parcial.
+    """
+    cancelacion = cancelacion or TokenCancelacion()
+    cola = queue.Queue()
+
+    def publicar(evento):
+        if evento.tipo == 'fin' or cola.qsize() < max_pendientes:
+            cola.put(evento)
+
+    _lanzar(tablero, algoritmo, intervalo, plazo, cancelacion, opciones, publicar)
+    terminado = False
+    try:
+        while True:
+            try:
+                evento = cola.get()
+            except KeyboardInterrupt: # Parar el motor y esperar su resultado parcial
+                cancelacion.cancelar()
+                continue
+            if evento.tipo == 'fin':
+                terminado = True
+                yield _evento_final(evento)
+                return
+            yield evento
+    finally:
+        if not terminado:
+            cancelacion.cancelar() # Se cerró el generador antes del final: parar el motor
+
+
+async def eventos_async(tablero, algoritmo='dfs', intervalo=INTERVALO_POR_DEFECTO, plazo=None,
+                        cancelacion=None, max_pendientes=MAX_PENDIENTES, **opciones):
+    """Como resolver_progresivo, pero como generador asíncrono para el bucle de asyncio."""
+    cancelacion = cancelacion or TokenCancelacion()
+    bucle = asyncio.get_running_loop()
+    cola = asyncio.Queue()
+
+    def meter(evento):
+        if evento.tipo == 'fin' or cola.qsize() < max_pendientes:
+            cola.put_nowait(evento)
+
+    def publicar(evento): # Desde el hilo del motor
+        bucle.call_soon_threadsafe(meter, evento)
+
+    _lanzar(tablero, algoritmo, intervalo, plazo, cancelacion, opciones, publicar)
+    terminado = False
+    try:
+        while True:
+            evento = await cola.get()
+            if evento.tipo == 'fin':
+                terminado = True
+                yield _evento_final(evento)
+                return
+            yield evento
+    finally:
+        if not terminado:
+            cancelacion.cancelar()
+
+
+async def resolver_async(tablero, algoritmo='dfs', al_progresar=None, **opciones):
+    """
+    Corrutina que devuelve el ResultadoBusqueda; al_progresar(evento) recibe los
+    eventos de progreso. Cancelar la tarea cancela también el motor.
+    """
+    eventos = eventos_async(tablero, algoritmo, **opciones)
+    try:
+        async for evento in eventos:
+            if evento.tipo == 'fin':
+                return evento.resultado
+            if al_progresar is not None:
+                al_progresar(evento)
+    finally:
+        await eventos.aclose()
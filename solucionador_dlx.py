@@ -0,0 +1,347 @@
+# FlowFree/solucionador_dlx.py
+"""
+Motor alternativo: enumera caminos candidatos por color y resuelve el nivel como
+un problema de cobertura exacta con el Algoritmo X de Knuth sobre enlaces
+danzantes (dancing links).
+
+Matriz de cobertura:
+- Una columna por cada color sin terminar (cada color elige exactamente un camino)
+  y una por cada celda vacía (cada celda la cubre exactamente un camino).
+- Una fila por camino candidato: cubre su color y las celdas vacías que atraviesa.
+Los caminos van de la cabeza que crece desde 'inicio' a la que crece desde 'fin'
+(en un tablero sin empezar, de 'inicio' a 'fin'), solo por celdas vacías.
+Se resuelve en dos pasadas: primero con caminos que no se tocan a sí mismos de
+lado (como en los niveles bien diseñados; son muchos menos y la matriz sale
+pequeña) y, si así no hay solución, con todos los caminos simples. Por eso
+'agotado' significa que el nivel no tiene solución.
+
+La enumeración es una DFS por color acotada en longitud: un color no puede usar
+más celdas de las que dejan libres los caminos mínimos de los demás, y una rama
+se corta cuando la distancia con paredes hasta la otra cabeza
+(heuristicas.campos_distancia) ya no cabe en lo que queda. Los caminos se generan
+uno a uno y se insertan directamente como filas de la matriz, sin listas
+intermedias; MAX_CAMINOS acota la memoria.
+
+Con pocos colores y pasillos largos hay pocos caminos posibles y esto es mucho más
+rápido que la búsqueda celda a celda; con tableros abiertos la enumeración crece
+muy deprisa y conviene más sat o dfs.
+
+Punto de entrada: resolver_dlx(tablero, presupuesto) -> ResultadoBusqueda, el mismo
+resultado que el resto de algoritmos (ver algoritmos_busqueda.resolver).
+"""
+from tablero_juego import EstadoBusqueda
+import heuristicas
+
+MAX_CAMINOS = 500_000 # Filas de la matriz antes de rendirse con 'limite_memoria'
+INTERVALO_COMPROBACION = 4096 # Pasos de enumeración entre comprobaciones del presupuesto
+
+
+class MatrizDLX:
+    """
+    Matriz dispersa de cobertura exacta con enlaces danzantes en listas paralelas:
+    el nodo 0 es la raíz, 1..columnas las cabeceras y el resto los unos de las filas.
+    """
+    def __init__(self, columnas):
+        total = columnas + 1
+        self.izquierda = [total - 1] + list(range(columnas))
+        self.derecha = list(range(1, total)) + [0]
+        self.arriba = list(range(total))
+        self.abajo = list(range(total))
+        self.columna = list(range(total))
+        self.fila = [-1] * total
+        self.tamano = [0] * total
+        self.filas = 0
+
+    def agregar_fila(self, columnas):
+        """Añade una fila con unos en 'columnas' (índices desde 1). Devuelve su número."""
+        izquierda, derecha, arriba, abajo = self.izquierda, self.derecha, self.arriba, self.abajo
+        fila = self.filas
+        primero = None
+        for c in columnas:
+            nodo = len(self.columna)
+            self.columna.append(c)
+            self.fila.append(fila)
+            arriba.append(arriba[c])
+            abajo.append(c)
+            abajo[arriba[c]] = nodo
+            arriba[c] = nodo
+            self.tamano[c] += 1
+            if primero is None:
+                primero = nodo
+                izquierda.append(nodo)
+                derecha.append(nodo)
+            else:
+                izquierda.append(izquierda[primero])
+                derecha.append(primero)
+                derecha[izquierda[primero]] = nodo
+                izquierda[primero] = nodo
+        self.filas += 1
+        return fila
+
+    def _cubrir(self, c):
+        izquierda, derecha, arriba, abajo = self.izquierda, self.derecha, self.arriba, self.abajo
+        derecha[izquierda[c]] = derecha[c]
+        izquierda[derecha[c]] = izquierda[c]
+        i = abajo[c]
+        while i != c:
+            j = derecha[i]
+            while j != i:
+                abajo[arriba[j]] = abajo[j]
+                arriba[abajo[j]] = arriba[j]
+                self.tamano[self.columna[j]] -= 1
+                j = derecha[j]
+            i = abajo[i]
+
+    def _descubrir(self, c):
+        izquierda, derecha, arriba, abajo = self.izquierda, self.derecha, self.arriba, self.abajo
+        i = arriba[c]
+        while i != c:
+            j = izquierda[i]
+            while j != i:
+                self.tamano[self.columna[j]] += 1
+                abajo[arriba[j]] = j
+                arriba[abajo[j]] = j
+                j = izquierda[j]
+            i = arriba[i]
+        derecha[izquierda[c]] = c
+        izquierda[derecha[c]] = c
+
+    def resolver(self, al_elegir=None):
+        """
+        Algoritmo X: lista de filas que cubren cada columna exactamente una vez, o
+        None. al_elegir() se llama en cada fila que se prueba (para contar y cortar).
+        """
+        elegidas = []
+        return elegidas if self._buscar(elegidas, al_elegir) else None
+
+    def _buscar(self, elegidas, al_elegir):
+        derecha, abajo = self.derecha, self.abajo
+        if derecha[0] == 0:
+            return True
+        # Columna con menos unos (heurística S de Knuth)
+        c, menor = 0, None
+        j = derecha[0]
+        while j != 0:
+            if menor is None or self.tamano[j] < menor:
+                c, menor = j, self.tamano[j]
+                if menor <= 1:
+                    break
+            j = derecha[j]
+        if menor == 0:
+            return False
+        self._cubrir(c)
+        r = abajo[c]
+        while r != c:
+            if al_elegir is not None:
+                al_elegir()
+            elegidas.append(self.fila[r])
+            j = derecha[r]
+            while j != r:
+                self._cubrir(self.columna[j])
+                j = derecha[j]
+            if self._buscar(elegidas, al_elegir):
+                return True
+            j = self.izquierda[r]
+            while j != r:
+                self._descubrir(self.columna[j])
+                j = self.izquierda[j]
+            elegidas.pop()
+            r = abajo[r]
+        self._descubrir(c)
+        return False
+
+
+def _longitud_minima(campo, a, b):
+    """Celdas vacías que necesita como mínimo el camino entre las cabezas a y b."""
+    return max(0, abs(campo[a] - campo[b]) - 1)
+
+
+def _aisla_celda(celda, anterior, vecinos, celdas, en_camino, cabezas_ajenas, propias=()):
+    """
+    True si al pasar de 'anterior' a 'celda' alguna vecina vacía de 'anterior' se
+    queda con menos de dos vecinos libres. 'propias' son las celdas del camino que
+    aún pueden enlazar con ella (la cabeza nueva y el destino).
+    """
+    for w in vecinos[anterior]:
+        if w == celda or celdas[w] != 0 or en_camino[w]:
+            continue
+        libres = 0
+        for x in vecinos[w]:
+            if (celdas[x] == 0 and not en_camino[x]) or cabezas_ajenas[x] or x in propias:
+                libres += 1
+        if libres < 2:
+            return True
+    return False
+
+
+def _contacto_propio(v, actual, destino, vecinos, celdas, en_camino, propio):
+    """
+    Sin autocontacto: None si 'v' toca de lado una celda del camino que no sea
+    'actual'; si no, True si está junto al destino (y el siguiente paso es ese).
+    """
+    junto_destino = False
+    for u in vecinos[v]:
+        if u == actual:
+            continue
+        if u == destino:
+            junto_destino = True
+        elif en_camino[u] or celdas[u] == propio:
+            return None
+    return junto_destino
+
+
+def enumerar_caminos(estado, k, longitud_maxima, al_avanzar=None, autocontacto=True):
+    """
+    Genera, uno a uno, los caminos del color k entre sus dos cabezas como tuplas
+    de las celdas vacías que atraviesan (en orden desde la cabeza de 'inicio'),
+    con a lo sumo 'longitud_maxima' celdas. al_avanzar() se llama en cada paso.
+    Con autocontacto=False solo salen los que no se tocan a sí mismos de lado.
+    Se descartan en cuanto dejan junto a ellos una celda vacía con menos de dos
+    vecinos libres: nadie podría atravesarla (la regla 'celda_aislada' de poda.py).
+    """
+    nivel = estado.nivel
+    n = len(nivel.colores)
+    celdas = estado.celdas
+    vecinos = nivel.vecinos
+    campo = heuristicas.campos_distancia(nivel)[k]
+    origen = estado.caminos[k][-1]
+    destino = estado.caminos[k + n][-1]
+    # Cabezas de los demás colores sin terminar: una celda vacía puede enlazar con ellas
+    cabezas_ajenas = bytearray(len(celdas))
+    for e in range(2 * n):
+        if e % n != k and not estado.esta_completo(e):
+            cabezas_ajenas[estado.caminos[e][-1]] = 1
+    d_destino = campo[destino]
+    propio = k + 1
+    en_camino = bytearray(len(celdas))
+    camino = []
+    pila = [iter(vecinos[origen])]
+    actual = origen
+    while pila:
+        if al_avanzar is not None:
+            al_avanzar()
+        v = next(pila[-1], None)
+        if v is None:
+            pila.pop()
+            if camino:
+                en_camino[camino.pop()] = 0
+            actual = camino[-1] if camino else origen
+            continue
+        if v == destino:
+            # Camino cerrado: sus celdas ya no enlazan con nadie
+            if not _aisla_celda(destino, actual, vecinos, celdas, en_camino, cabezas_ajenas):
+                yield tuple(camino)
+            continue
+        if celdas[v] != 0 or en_camino[v] or campo[v] == heuristicas.SIN_CAMINO:
+            continue
+        if len(camino) + 1 + max(0, abs(campo[v] - d_destino) - 1) > longitud_maxima:
+            continue
+        junto_destino = False
+        if not autocontacto:
+            junto_destino = _contacto_propio(v, actual, destino, vecinos, celdas, en_camino, propio)
+            if junto_destino is None:
+                continue
+        en_camino[v] = 1
+        if _aisla_celda(v, actual, vecinos, celdas, en_camino, cabezas_ajenas, (v, destino) if autocontacto else ()):
+            en_camino[v] = 0
+            continue
+        if junto_destino:
+            if not _aisla_celda(destino, v, vecinos, celdas, en_camino, cabezas_ajenas):
+                yield tuple(camino) + (v,)
+            en_camino[v] = 0
+            continue
+        camino.append(v)
+        actual = v
+        pila.append(iter(vecinos[v]))
+
+
+def _llenar_matriz(estado, activos, al_avanzar, autocontacto):
+    """
+    (matriz, caminos_fila) con una fila por camino candidato de cada color de
+    'activos'; caminos_fila[fila] es (k, celdas). None si algún color no tiene
+    ningún camino posible. Lanza LimiteAlcanzado si se pasa de MAX_CAMINOS.
+    """
+    from algoritmos_busqueda import LimiteAlcanzado
+
+    n = len(estado.nivel.colores)
+    campos = heuristicas.campos_distancia(estado.nivel)
+    vacias = [i for i, codigo in enumerate(estado.celdas) if codigo == 0]
+    columna_celda = {i: len(activos) + 1 + j for j, i in enumerate(vacias)}
+    minimos = {}
+    for k in activos:
+        a, b = estado.caminos[k][-1], estado.caminos[k + n][-1]
+        if campos[k][a] == heuristicas.SIN_CAMINO or campos[k][b] == heuristicas.SIN_CAMINO:
+            return None
+        minimos[k] = _longitud_minima(campos[k], a, b)
+    total_minimo = sum(minimos.values())
+
+    matriz = MatrizDLX(len(activos) + len(vacias))
+    caminos_fila = []
+    # Los colores más cortos primero: si alguno no tiene caminos se sabe antes
+    for j, k in sorted(enumerate(activos), key=lambda par: minimos[par[1]]):
+        longitud_maxima = len(vacias) - (total_minimo - minimos[k])
+        filas_antes = matriz.filas
+        for camino in enumerar_caminos(estado, k, longitud_maxima, al_avanzar, autocontacto):
+            if matriz.filas >= MAX_CAMINOS:
+                raise LimiteAlcanzado('limite_memoria')
+            matriz.agregar_fila([j + 1] + [columna_celda[i] for i in camino])
+            caminos_fila.append((k, camino))
+        if matriz.filas == filas_antes:
+            return None
+    return matriz, caminos_fila
+
+
+def resolver_dlx(tablero, presupuesto=None):
+    """
+    Resuelve un TableroJuego (o EstadoBusqueda) con caminos enumerados y cobertura
+    exacta. En el resultado, nodos_expandidos son las filas probadas por el
+    Algoritmo X, nodos_generados los caminos enumerados y frontera_maxima el
+    número de filas de la matriz.
+    """
+    # Importación diferida: algoritmos_busqueda importa este módulo bajo demanda
+    from algoritmos_busqueda import ContextoBusqueda, LimiteAlcanzado
+
+    ctx = ContextoBusqueda('dlx', presupuesto)
+    estado = tablero if isinstance(tablero, EstadoBusqueda) else EstadoBusqueda.desde_tablero(tablero)
+    nivel = estado.nivel
+    n = len(nivel.colores)
+    activos = [k for k in range(n) if not estado.esta_completo(k)]
+    pasos = 0
+
+    def al_avanzar():
+        nonlocal pasos
+        pasos += 1
+        if pasos % INTERVALO_COMPROBACION == 0:
+            ctx.comprobar_limites()
+
+    def al_elegir():
+        ctx.contar_expansion()
+        ctx.comprobar_limites() # Cada fila puede costar mucho en una matriz grande
+
+    solucion = None
+    motivo = 'agotado'
+    try:
+        for autocontacto in (False, True):
+            llena = _llenar_matriz(estado, activos, al_avanzar, autocontacto)
+            if llena is None:
+                continue
+            matriz, caminos_fila = llena
+            ctx.nodos_generados += matriz.filas
+            ctx.registrar_frontera(matriz.filas)
+            filas = matriz.resolver(al_elegir)
+            if filas is not None:
+                elegidos = dict(caminos_fila[f] for f in filas)
+                solucion = []
+                for k in range(n):
+                    inicio, fin = estado.caminos[k], estado.caminos[k + n]
+                    if k in elegidos:
+                        solucion.append(inicio + list(elegidos[k]) + fin[::-1])
+                    else:
+                        solucion.append(inicio + fin[-2::-1])
+                motivo = 'solucion'
+                break
+    except LimiteAlcanzado as limite:
+        motivo = limite.motivo
+
+    final = EstadoBusqueda.desde_caminos(nivel, solucion) if solucion is not None else None
+    return ctx.resultado(final, motivo)
@@ -0,0 +1,469 @@
+# FlowFree/solucionador_sat.py
+"""
+Motor alternativo: codifica el nivel como un problema SAT (CNF) y lo resuelve con
+un solucionador CDCL escrito en Python puro, sin dependencias externas.
+
+Codificación (una variable booleana por cada hecho):
+- color[celda][k]: la celda pertenece al color k. Cada celda tiene exactamente un color.
+- arista[a, b]: el camino pasa de la celda a a su vecina b. Une celdas del mismo color.
+- Los extremos tienen fijado su color y exactamente una arista (grado 1); las celdas
+  de paso, exactamente dos (grado 2).
+- Las paredes no tienen variables.
+Dos vecinas del mismo color no tienen por qué estar unidas, así que se admiten
+caminos que se tocan a sí mismos. La codificación permite ciclos aislados; si la
+solución decodificada tiene alguno, se añade una cláusula que lo prohíbe y se
+vuelve a resolver. Con eso 'agotado' significa que el nivel no tiene solución.
+
+Punto de entrada: resolver_sat(tablero, presupuesto) -> ResultadoBusqueda, el mismo
+resultado que el resto de algoritmos (ver algoritmos_busqueda.resolver).
+"""
+import heapq
+import itertools
+
+from tablero_juego import EstadoBusqueda, DatosNivel
+
+
+class SolucionadorCDCL:
+    """
+    Solucionador SAT CDCL: propagación unitaria con dos literales vigilados (y listas
+    de implicación aparte para cláusulas binarias), aprendizaje por primer UIP,
+    salto atrás no cronológico, actividad VSIDS, guardado de fase y reinicios Luby.
+    Los literales se pasan como en DIMACS: v o -v, con v >= 1.
+    """
+    def __init__(self, num_variables=0):
+        self.num_variables = 0
+        self.valor = [0, 0] # Por código de literal: 1 verdadero, -1 falso, 0 sin asignar
+        self.nivel = [0]
+        self.razon = [None]
+        self.actividad = [0.0]
+        self.fase = [False]
+        self.vigilados = [[], []] # Por código de literal: cláusulas largas que lo vigilan
+        self.binarias = [[], []] # Por código de literal: (otro literal, cláusula)
+        self.clausulas = []
+        self.aprendidas = 0
+        self.traza = []
+        self.limites_nivel = []
+        self.cabeza_propagacion = 0
+        self.incremento = 1.0
+        self.monticulo = []
+        self.inconsistente = False
+        self.decisiones = 0
+        self.conflictos = 0
+        self.propagaciones = 0
+        for _ in range(num_variables):
+            self.nueva_variable()
+
+    # --- Construcción ---
+
+    def nueva_variable(self):
+        self.num_variables += 1
+        self.valor += [0, 0]
+        self.nivel.append(0)
+        self.razon.append(None)
+        self.actividad.append(0.0)
+        self.fase.append(False)
+        self.vigilados += [[], []]
+        self.binarias += [[], []]
+        heapq.heappush(self.monticulo, (0.0, self.num_variables))
+        return self.num_variables
+
+    @staticmethod
+    def _codigo(literal):
+        return 2 * literal if literal > 0 else -2 * literal + 1
+
+    def agregar_clausula(self, literales):
+        """Añade una cláusula (lista de enteros DIMACS). Solo en el nivel de decisión 0."""
+        if self.inconsistente:
+            return False
+        self._retroceder(0)
+        codigos = []
+        for literal in set(literales):
+            codigo = self._codigo(literal)
+            if codigo ^ 1 in codigos:
+                return True # Tautología
+            codigos.append(codigo)
+        codigos = [c for c in codigos if self.valor[c] != -1]
+        if any(self.valor[c] == 1 for c in codigos):
+            return True
+        if not codigos:
+            self.inconsistente = True
+            return False
+        if len(codigos) == 1:
+            self._asignar(codigos[0], None)
+            if self._propagar() is not None:
+                self.inconsistente = True
+                return False
+            return True
+        self._vigilar(codigos)
+        return True
+
+    def _vigilar(self, clausula):
+        if len(clausula) == 2:
+            a, b = clausula
+            self.binarias[a ^ 1].append((b, clausula))
+            self.binarias[b ^ 1].append((a, clausula))
+        else:
+            self.vigilados[clausula[0] ^ 1].append(clausula)
+            self.vigilados[clausula[1] ^ 1].append(clausula)
+        self.clausulas.append(clausula)
+
+    # --- Núcleo ---
+
+    def _asignar(self, codigo, razon):
+        self.valor[codigo] = 1
+        self.valor[codigo ^ 1] = -1
+        variable = codigo >> 1
+        self.nivel[variable] = len(self.limites_nivel)
+        self.razon[variable] = razon
+        self.traza.append(codigo)
+
+    def _propagar(self):
+        """Propaga hasta el punto fijo. Devuelve la cláusula en conflicto o None."""
+        valor = self.valor
+        traza = self.traza
+        while self.cabeza_propagacion < len(traza):
+            codigo = traza[self.cabeza_propagacion] # Acaba de hacerse verdadero
+            self.cabeza_propagacion += 1
+            self.propagaciones += 1
+            falso = codigo ^ 1
+
+            for otro, clausula in self.binarias[codigo]:
+                v = valor[otro]
+                if v == -1:
+                    return clausula
+                if v == 0:
+                    self._asignar(otro, clausula)
+
+            lista = self.vigilados[codigo]
+            i = 0
+            j = 0
+            n = len(lista)
+            while i < n:
+                clausula = lista[i]
+                i += 1
+                if clausula[0] == falso:
+                    clausula[0], clausula[1] = clausula[1], falso
+                primero = clausula[0]
+                if valor[primero] == 1:
+                    lista[j] = clausula
+                    j += 1
+                    continue
+                for posicion in range(2, len(clausula)):
+                    candidato = clausula[posicion]
+                    if valor[candidato] != -1:
+                        clausula[1], clausula[posicion] = candidato, falso
+                        self.vigilados[candidato ^ 1].append(clausula)
+                        break
+                else:
+                    lista[j] = clausula
+                    j += 1
+                    if valor[primero] == -1:
+                        while i < n:
+                            lista[j] = lista[i]
+                            j += 1
+                            i += 1
+                        del lista[j:]
+                        return clausula
+                    self._asignar(primero, clausula)
+            del lista[j:]
+        return None
+
+    def _analizar(self, conflicto):
+        """Aprendizaje por primer UIP. Devuelve (cláusula aprendida, nivel de salto)."""
+        nivel_actual = len(self.limites_nivel)
+        vistos = set()
+        aprendida = [None]
+        pendientes = 0
+        literal = None
+        indice = len(self.traza) - 1
+        clausula = conflicto
+        while True:
+            for codigo in clausula:
+                variable = codigo >> 1
+                if variable not in vistos and self.nivel[variable] > 0:
+                    vistos.add(variable)
+                    self._aumentar_actividad(variable)
+                    if self.nivel[variable] == nivel_actual:
+                        pendientes += 1
+                    else:
+                        aprendida.append(codigo)
+            while (self.traza[indice] >> 1) not in vistos:
+                indice -= 1
+            literal = self.traza[indice]
+            indice -= 1
+            pendientes -= 1
+            if pendientes == 0:
+                break
+            clausula = self.razon[literal >> 1]
+        aprendida[0] = literal ^ 1
+        if len(aprendida) == 1:
+            return aprendida, 0
+        # El literal del nivel más alto (tras el UIP) va en la posición 1 para vigilarlo
+        maximo = max(range(1, len(aprendida)), key=lambda p: self.nivel[aprendida[p] >> 1])
+        aprendida[1], aprendida[maximo] = aprendida[maximo], aprendida[1]
+        return aprendida, self.nivel[aprendida[1] >> 1]
+
+    def _aumentar_actividad(self, variable):
+        self.actividad[variable] += self.incremento
+        if self.actividad[variable] > 1e100:
+            self.actividad = [a * 1e-100 for a in self.actividad]
+            self.incremento *= 1e-100
+            self.monticulo = [(-self.actividad[v], v) for v in range(1, self.num_variables + 1)
+                              if self.valor[2 * v] == 0]
+            heapq.heapify(self.monticulo)
+        elif self.valor[2 * variable] == 0:
+            heapq.heappush(self.monticulo, (-self.actividad[variable], variable))
+
+    def _retroceder(self, nivel):
+        if len(self.limites_nivel) <= nivel:
+            return
+        limite = self.limites_nivel[nivel]
+        for codigo in self.traza[limite:]:
+            variable = codigo >> 1
+            self.fase[variable] = (codigo & 1) == 0
+            self.valor[codigo] = 0
+            self.valor[codigo ^ 1] = 0
+            self.razon[variable] = None
+            heapq.heappush(self.monticulo, (-self.actividad[variable], variable))
+        del self.traza[limite:]
+        del self.limites_nivel[nivel:]
+        self.cabeza_propagacion = len(self.traza)
+
+    def _elegir_variable(self):
+        while self.monticulo:
+            _, variable = heapq.heappop(self.monticulo)
+            if self.valor[2 * variable] == 0:
+                return variable
+        return None
+
+    @staticmethod
+    def _luby(i):
+        """Término i (desde 1) de la secuencia de Luby: 1 1 2 1 1 2 4 ..."""
+        while True:
+            k = 1
+            while (1 << k) - 1 < i:
+                k += 1
+            if i == (1 << k) - 1:
+                return 1 << (k - 1)
+            i -= (1 << (k - 1)) - 1
+
+    def resolver(self, comprobar_limites=None, intervalo=256):
+        """
+        True si es satisfacible, False si no. 'comprobar_limites' se llama cada
+        'intervalo' conflictos y puede lanzar una excepción para abortar.
+        """
+        if self.inconsistente:
+            return False
+        self._retroceder(0)
+        if self._propagar() is not None:
+            self.inconsistente = True
+            return False
+        reinicio = 1
+        conflictos_hasta_reinicio = 100 * self._luby(reinicio)
+        while True:
+            conflicto = self._propagar()
+            if conflicto is not None:
+                self.conflictos += 1
+                if not self.limites_nivel:
+                    self.inconsistente = True
+                    return False
+                aprendida, nivel_salto = self._analizar(conflicto)
+                self._retroceder(nivel_salto)
+                if len(aprendida) == 1:
+                    self._asignar(aprendida[0], None)
+                else:
+                    self._vigilar(aprendida)
+                    self.aprendidas += 1
+                    self._asignar(aprendida[0], aprendida)
+                self.incremento /= 0.95
+                conflictos_hasta_reinicio -= 1
+                if comprobar_limites is not None and self.conflictos % intervalo == 0:
+                    comprobar_limites()
+                continue
+            if conflictos_hasta_reinicio <= 0:
+                reinicio += 1
+                conflictos_hasta_reinicio = 100 * self._luby(reinicio)
+                self._retroceder(0)
+                continue
+            variable = self._elegir_variable()
+            if variable is None:
+                return True
+            self.decisiones += 1
+            self.limites_nivel.append(len(self.traza))
+            self._asignar(2 * variable if self.fase[variable] else 2 * variable + 1, None)
+
+    def valor_de(self, variable):
+        return self.valor[2 * variable] == 1
+
+
+class CodificacionFlow:
+    """Traduce un nivel a CNF y decodifica un modelo en caminos."""
+    def __init__(self, nivel, solucionador):
+        self.nivel = nivel
+        self.sat = solucionador
+        total = nivel.alto * nivel.ancho
+        num_colores = len(nivel.colores)
+        self.var_color = [None] * total
+        self.var_arista = {} # (a, b) con a < b -> variable
+        for i in range(total):
+            if nivel.celdas_base[i] != DatosNivel.CODIGO_PARED:
+                self.var_color[i] = [solucionador.nueva_variable() for _ in range(num_colores)]
+        for i in range(total):
+            if self.var_color[i] is None: # Las paredes también tienen tupla de vecinos, pero no aristas
+                continue
+            for v in nivel.vecinos[i]:
+                if i < v and self.var_color[v] is not None:
+                    self.var_arista[i, v] = solucionador.nueva_variable()
+        self._codificar()
+
+    def arista(self, a, b):
+        return self.var_arista[(a, b) if a < b else (b, a)]
+
+    def _exactamente_uno(self, variables):
+        self.sat.agregar_clausula(list(variables))
+        for a in range(len(variables)):
+            for b in range(a + 1, len(variables)):
+                self.sat.agregar_clausula([-variables[a], -variables[b]])
+
+    def _exactamente_dos(self, variables):
+        # Al menos dos: quitando cualquiera queda alguna; como mucho dos: nunca tres
+        for a in range(len(variables)):
+            self.sat.agregar_clausula(variables[:a] + variables[a + 1:])
+        for a, b, c in itertools.combinations(variables, 3):
+            self.sat.agregar_clausula([-a, -b, -c])
+
+    def _codificar(self):
+        nivel = self.nivel
+        agregar = self.sat.agregar_clausula
+        num_colores = len(nivel.colores)
+        for (a, b), arista in self.var_arista.items():
+            for k in range(num_colores):
+                # arista -> color(a) == color(b)
+                agregar([-arista, -self.var_color[a][k], self.var_color[b][k]])
+                agregar([-arista, self.var_color[a][k], -self.var_color[b][k]])
+        for i, colores in enumerate(self.var_color):
+            if colores is None:
+                continue
+            self._exactamente_uno(colores)
+            aristas = [self.arista(i, v) for v in nivel.vecinos[i]]
+            codigo_base = nivel.celdas_base[i]
+            if codigo_base != 0:
+                # Extremo: color fijo y grado 1
+                agregar([colores[codigo_base - 1]])
+                self._exactamente_uno(aristas)
+            elif len(aristas) < 2:
+                agregar([]) # Celda de paso sin dos vecinos: imposible
+            else:
+                self._exactamente_dos(aristas)
+
+    def fijar_caminos(self, estado):
+        """Fija el color y las aristas de los caminos ya dibujados en un EstadoBusqueda parcial."""
+        for i, codigo in enumerate(estado.celdas):
+            if 0 < codigo < DatosNivel.CODIGO_PARED:
+                self.sat.agregar_clausula([self.var_color[i][codigo - 1]])
+        for camino in estado.caminos:
+            for a, b in zip(camino, camino[1:]):
+                self.sat.agregar_clausula([self.arista(a, b)])
+
+    def prohibir_caminos(self, caminos):
+        """Añade una cláusula que descarta exactamente esta solución (caminos en índices planos)."""
+        self.sat.agregar_clausula([-self.arista(a, b) for camino in caminos for a, b in zip(camino, camino[1:])])
+
+    def color_de(self, i):
+        for k, variable in enumerate(self.var_color[i]):
+            if self.sat.valor_de(variable):
+                return k
+        return None
+
+    def decodificar(self):
+        """
+        Devuelve (caminos, ciclos): caminos como listas de índices por color y, si
+        aparecen, los ciclos como listas de variables de arista que los forman.
+        """
+        nivel = self.nivel
+        caminos = []
+        en_camino = set()
+        for k in range(len(nivel.colores)):
+            camino = [nivel.inicios[k]]
+            anterior = None
+            actual = nivel.inicios[k]
+            while actual != nivel.fines[k]:
+                siguiente = None
+                for v in nivel.vecinos[actual]:
+                    if v != anterior and self.sat.valor_de(self.arista(actual, v)):
+                        siguiente = v
+                        break
+                if siguiente is None or siguiente in en_camino or len(camino) > len(nivel.celdas_base):
+                    raise RuntimeError("El modelo SAT no describe un camino válido.")
+                anterior, actual = actual, siguiente
+                camino.append(actual)
+            en_camino.update(camino)
+            caminos.append(camino)
+
+        ciclos = []
+        sueltas = [i for i, colores in enumerate(self.var_color) if colores is not None and i not in en_camino]
+        visitadas = set()
+        for i in sueltas:
+            if i in visitadas:
+                continue
+            ciclo = []
+            pila = [i]
+            visitadas.add(i)
+            while pila:
+                x = pila.pop()
+                for v in nivel.vecinos[x]:
+                    arista = self.arista(x, v)
+                    if not self.sat.valor_de(arista):
+                        continue
+                    if x < v:
+                        ciclo.append(arista)
+                    if v not in visitadas:
+                        visitadas.add(v)
+                        pila.append(v)
+            ciclos.append(ciclo)
+        return caminos, ciclos
+
+
+def resolver_sat(tablero, presupuesto=None):
+    """
+    Resuelve un TableroJuego (o EstadoBusqueda) con el motor SAT. En el resultado,
+    nodos_expandidos son decisiones, nodos_generados propagaciones y frontera_maxima
+    el número de cláusulas aprendidas.
+    """
+    # Importación diferida: algoritmos_busqueda importa este módulo bajo demanda
+    from algoritmos_busqueda import ContextoBusqueda, LimiteAlcanzado
+
+    ctx = ContextoBusqueda('sat', presupuesto)
+    estado = tablero if isinstance(tablero, EstadoBusqueda) else EstadoBusqueda.desde_tablero(tablero)
+    nivel = estado.nivel
+    sat = SolucionadorCDCL()
+    codificacion = CodificacionFlow(nivel, sat)
+    codificacion.fijar_caminos(estado)
+
+    def comprobar_limites():
+        ctx.nodos_expandidos = sat.decisiones
+        ctx.nodos_generados = sat.propagaciones
+        ctx.registrar_frontera(sat.aprendidas)
+        if ctx.presupuesto.max_nodos is not None and sat.decisiones > ctx.presupuesto.max_nodos:
+            raise LimiteAlcanzado('limite_nodos')
+        ctx.comprobar_limites()
+
+    solucion = None
+    motivo = 'agotado'
+    try:
+        while sat.resolver(comprobar_limites):
+            caminos, ciclos = codificacion.decodificar()
+            if not ciclos:
+                solucion = caminos
+                motivo = 'solucion'
+                break
+            for ciclo in ciclos:
+                sat.agregar_clausula([-variable for variable in ciclo])
+    except LimiteAlcanzado as limite:
+        motivo = limite.motivo
+
+    ctx.nodos_expandidos = sat.decisiones
+    ctx.nodos_generados = sat.propagaciones
+    ctx.registrar_frontera(sat.aprendidas)
+    final = EstadoBusqueda.desde_caminos(nivel, solucion) if solucion is not None else None
+    return ctx.resultado(final, motivo)
@@ -0,0 +1,112 @@
+# FlowFree/structures/bench_structures.py
+"""
+Micro-benchmark of the frontier containers in structures.py.
+
+Runs a push-all / pop-all cycle for growing sizes and prints the time per
+operation, which should stay roughly flat (O(log n) for the heap, O(1) for
+the deque and the list-backed stack) as the frontier grows to millions.
+
+    python structures/bench_structures.py --max 4000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+try:
+    # Importado desde la raíz del repositorio (p. ej. por benchmark.py)
+    from structures.structures import Stack, Queue, PriorityQueue, BoundedPriorityQueue
+except ImportError:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from structures import Stack, Queue, PriorityQueue, BoundedPriorityQueue
+
+
+def _cycle_stack(n, priorities):
+    s = Stack()
+    for i in range(n):
+        s.push(i)
+    while not s.is_empty():
+        s.pop()
+
+
+def _cycle_queue(n, priorities):
+    q = Queue()
+    for i in range(n):
+        q.enqueue(i)
+    while not q.is_empty():
+        q.dequeue()
+
+
+def _cycle_priority_queue(n, priorities):
+    pq = PriorityQueue()
+    for i in range(n):
+        pq.add(i, priorities[i])
+    while not pq.is_empty():
+        pq.remove()
+
+
+def _cycle_indexed_priority_queue(n, priorities):
+    pq = PriorityQueue(indexed=True)
+    for i in range(n):
+        pq.add(i, priorities[i])
+    # Decrease-key on a tenth of the items
+    for i in range(0, n, 10):
+        pq.update(i, priorities[i] - 1)
+    while not pq.is_empty():
+        pq.remove()
+
+
+def _cycle_bounded_priority_queue(n, priorities):
+    pq = BoundedPriorityQueue(capacity=1000)
+    for i in range(n):
+        pq.add(i, priorities[i])
+    while not pq.is_empty():
+        pq.remove()
+
+
+CONTAINERS = {
+    'Stack': _cycle_stack,
+    'Queue': _cycle_queue,
+    'PriorityQueue': _cycle_priority_queue,
+    'PriorityQueue(indexed)': _cycle_indexed_priority_queue,
+    'BoundedPriorityQueue(1000)': _cycle_bounded_priority_queue,
+}
+
+
+def sizes_up_to(maximum, start=1000):
+    n = start
+    while n <= maximum:
+        yield n
+        n *= 4
+
+
+def run(maximum, seed=0, names=None):
+    """Return a list of (container, n, seconds, ns_per_item) rows."""
+    rng = random.Random(seed)
+    priorities = [rng.random() for _ in range(maximum)]
+    rows = []
+    for name, cycle in CONTAINERS.items():
+        if names and name not in names:
+            continue
+        for n in sizes_up_to(maximum):
+            start = time.perf_counter()
+            cycle(n, priorities)
+            elapsed = time.perf_counter() - start
+            rows.append((name, n, elapsed, elapsed / n * 1e9))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--max', type=int, default=1_024_000, help="largest frontier size")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"{'container':<28}{'n':>10}{'total (s)':>12}{'ns/item':>10}")
+    for name, n, elapsed, ns in run(args.max, args.seed):
+        print(f"{name:<28}{n:>10}{elapsed:>12.3f}{ns:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,8 @@
+import heapq
+import itertools
+from collections import deque
+
+
 class Stack:
     def __init__(self):
         self.items = []
@@ -20,25 +25,25 @@ class Stack:
 
     def size(self):
         return len(self.items)
-    
+
     def __str__(self):
         return str(self.items)
-    
-    
+
+
     def __repr__(self):
         return str(self)
-    
-    
+
+
 class Queue:
     def __init__(self):
-        self.items = []
+        self.items = deque()
 
     def enqueue(self, item):
         self.items.append(item)
 
     def dequeue(self):
         if not self.is_empty():
-            return self.items.pop(0)
+            return self.items.popleft()
         raise IndexError("dequeue from empty queue")
 
     def peek(self):
@@ -51,39 +56,175 @@ class Queue:
 
     def size(self):
         return len(self.items)
-    
+
     def __str__(self):
-        return str(self.items)
-    
+        return str(list(self.items))
+
     def __repr__(self):
         return str(self)
-    
+
+
+class BoundedQueue(Queue):
+    """
+    FIFO queue that keeps at most `capacity` items.
+    When full, the oldest item is dropped to make room for the new one.
+    """
+    def __init__(self, capacity):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.items = deque(maxlen=capacity)
+        self.dropped = 0
+
+    def enqueue(self, item):
+        if len(self.items) == self.capacity:
+            self.dropped += 1
+        self.items.append(item)
+
+
 class PriorityQueue:
-    def __init__(self):
+    """
+    Binary-heap priority queue (lowest priority first).
+    Ties are broken by insertion order, so equal priorities come out FIFO.
+
+    With indexed=True, items must be hashable and each item is stored at most
+    once: adding an item that is already queued updates its priority
+    (decrease-key or increase-key), and discard() removes it. Both are done by
+    lazy deletion, so stale heap entries are skipped when they reach the top.
+    """
+    _REMOVED = object()
+
+    def __init__(self, indexed=False):
         self.items = []
+        self.indexed = indexed
+        self._index = {} if indexed else None
+        self._counter = itertools.count()
+        self._live = 0
 
     def add(self, item, priority):
-        self.items.append((item, priority))
-        self.items.sort(key=lambda x: x[1])
+        if self.indexed:
+            entry = self._index.get(item)
+            if entry is not None:
+                entry[2] = self._REMOVED
+                self._live -= 1
+            entry = [priority, next(self._counter), item]
+            self._index[item] = entry
+        else:
+            entry = [priority, next(self._counter), item]
+        heapq.heappush(self.items, entry)
+        self._live += 1
+
+    def update(self, item, priority):
+        """Change the priority of a queued item, or add it if absent (indexed only)."""
+        if not self.indexed:
+            raise TypeError("update requires an indexed priority queue")
+        self.add(item, priority)
+
+    def discard(self, item):
+        """Remove an item if it is queued (indexed only). Returns True if it was."""
+        if not self.indexed:
+            raise TypeError("discard requires an indexed priority queue")
+        entry = self._index.pop(item, None)
+        if entry is None:
+            return False
+        entry[2] = self._REMOVED
+        self._live -= 1
+        return True
+
+    def priority_of(self, item):
+        """Current priority of a queued item, or None (indexed only)."""
+        if not self.indexed:
+            raise TypeError("priority_of requires an indexed priority queue")
+        entry = self._index.get(item)
+        return None if entry is None else entry[0]
+
+    def __contains__(self, item):
+        if self.indexed:
+            return item in self._index
+        return any(entry[2] is item or entry[2] == item for entry in self.items
+                   if entry[2] is not self._REMOVED)
+
+    def _drop_removed(self):
+        items = self.items
+        while items and items[0][2] is self._REMOVED:
+            heapq.heappop(items)
 
     def remove(self):
+        self._drop_removed()
         if not self.is_empty():
-            return self.items.pop(0)[0]
+            priority, _, item = heapq.heappop(self.items)
+            self._live -= 1
+            if self.indexed:
+                del self._index[item]
+            return item
         raise IndexError("dequeue from empty priority queue")
 
     def peek(self):
+        self._drop_removed()
+        if not self.is_empty():
+            return self.items[0][2]
+        raise IndexError("peek from empty priority queue")
+
+    def peek_priority(self):
+        self._drop_removed()
         if not self.is_empty():
             return self.items[0][0]
         raise IndexError("peek from empty priority queue")
 
     def is_empty(self):
-        return len(self.items) == 0
+        return self._live == 0
 
     def size(self):
-        return len(self.items)
-    
+        return self._live
+
+    def entries(self):
+        """Live (priority, sequence, item) triples in pop order, for serialization."""
+        return sorted((entry[0], entry[1], entry[2]) for entry in self.items
+                      if entry[2] is not self._REMOVED)
+
     def __str__(self):
-        return str([item[0] for item in self.items])
-    
+        return str([entry[2] for entry in sorted(self.items) if entry[2] is not self._REMOVED])
+
     def __repr__(self):
-        return str(self)
\ No newline at end of file
+        return str(self)
+
+
+class BoundedPriorityQueue(PriorityQueue):
+    """
+    Priority queue that keeps only the `capacity` best (lowest) priorities,
+    as used by beam search. The heap is allowed to grow to twice the capacity
+    and is then trimmed back in one pass, so each add stays O(log n) amortized.
+    `dropped` counts the items discarded by trimming.
+    """
+    def __init__(self, capacity, indexed=False):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        super().__init__(indexed=indexed)
+        self.capacity = capacity
+        self.dropped = 0
+
+    def add(self, item, priority):
+        super().add(item, priority)
+        if len(self.items) >= 2 * self.capacity:
+            self._trim()
+
+    def _trim(self):
+        live = [entry for entry in self.items if entry[2] is not self._REMOVED]
+        kept = heapq.nsmallest(self.capacity, live)
+        if self.indexed:
+            kept_ids = {id(entry) for entry in kept}
+            for entry in live:
+                if id(entry) not in kept_ids:
+                    del self._index[entry[2]]
+        self.dropped += len(live) - len(kept)
+        heapq.heapify(kept)
+        self.items = kept
+        self._live = len(kept)
+
+    def size(self):
+        return min(self._live, self.capacity)
+
+    def remove(self):
+        if self._live > self.capacity:
+            self._trim()
+        return super().remove()
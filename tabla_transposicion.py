@@ -0,0 +1,130 @@
+# FlowFree/tabla_transposicion.py
+"""
+Tabla de transposición de tamaño fijo para deduplicar estados en la búsqueda.
+
+Guarda huellas de 64 bits (el hash Zobrist de EstadoBusqueda) en arrays
+preasignados, así que la memoria queda fijada al crearla (unos 10 bytes por
+entrada) por muchos estados que se visiten. Cuando dos estados caen en la misma
+posición, la política de reemplazo decide cuál se queda:
+- 'siempre': el nuevo sustituye al antiguo.
+- 'profundidad': el nuevo solo sustituye si su profundidad es mayor o igual.
+- 'dos_niveles': cada posición tiene dos huecos, uno por profundidad y otro que
+  se reemplaza siempre; se busca en los dos.
+'profundidad' es el tamaño del subárbol que protege la entrada (en la búsqueda,
+los pasos que faltan): conviene conservar las entradas que evitan más trabajo.
+Perder una entrada nunca da resultados incorrectos; como mucho se reexpande un estado.
+"""
+from array import array
+
+POLITICAS = ('siempre', 'profundidad', 'dos_niveles')
+_MASCARA_64 = (1 << 64) - 1
+
+
+class TablaTransposicion:
+    def __init__(self, capacidad=1 << 20, politica='dos_niveles'):
+        if politica not in POLITICAS:
+            raise ValueError(f"Política desconocida '{politica}'. Opciones: {', '.join(POLITICAS)}")
+        tamano = 2
+        while tamano < capacidad:
+            tamano *= 2
+        self.politica = politica
+        self.tamano = tamano
+        self.mascara = tamano - 1
+        self.huellas = array('Q', bytes(8 * tamano)) # 0 = hueco vacío
+        self.profundidades = array('H', bytes(2 * tamano))
+        self.aciertos = 0
+        self.fallos = 0
+        self.colisiones = 0 # Inserciones que encontraron el hueco ocupado por otra huella
+        self.ocupadas = 0
+
+    @classmethod
+    def con_memoria(cls, memoria_mb, politica='dos_niveles'):
+        """Tabla con la mayor capacidad (potencia de dos) que cabe en memoria_mb."""
+        entradas = int(memoria_mb * 1024 * 1024 // 10)
+        capacidad = 2
+        while capacidad * 2 <= entradas:
+            capacidad *= 2
+        return cls(capacidad, politica)
+
+    def memoria_bytes(self):
+        return self.huellas.itemsize * len(self.huellas) + self.profundidades.itemsize * len(self.profundidades)
+
+    def limpiar(self):
+        self.huellas = array('Q', bytes(8 * self.tamano))
+        self.profundidades = array('H', bytes(2 * self.tamano))
+        self.ocupadas = 0
+
+    @staticmethod
+    def _huella(valor):
+        valor &= _MASCARA_64
+        return valor or 1
+
+    def __contains__(self, valor):
+        huella = self._huella(valor)
+        i = huella & self.mascara
+        if self.politica == 'dos_niveles':
+            i &= ~1
+            return self.huellas[i] == huella or self.huellas[i + 1] == huella
+        return self.huellas[i] == huella
+
+    def visitar(self, valor, profundidad=0):
+        """
+        Registra el estado. Devuelve True si es nuevo (hay que explorarlo) y False
+        si ya estaba en la tabla.
+        """
+        huella = self._huella(valor)
+        profundidad = min(profundidad, 0xFFFF)
+        huellas = self.huellas
+        i = huella & self.mascara
+        if self.politica == 'dos_niveles':
+            i &= ~1
+            if huellas[i] == huella or huellas[i + 1] == huella:
+                self.aciertos += 1
+                return False
+            self.fallos += 1
+            if huellas[i] == 0 or profundidad >= self.profundidades[i]:
+                # El antiguo del hueco por profundidad baja al hueco de reemplazo
+                if huellas[i]:
+                    self._guardar(i + 1, huellas[i], self.profundidades[i])
+                    huellas[i] = huella
+                    self.profundidades[i] = profundidad
+                else:
+                    self._guardar(i, huella, profundidad)
+            else:
+                self._guardar(i + 1, huella, profundidad)
+            return True
+
+        if huellas[i] == huella:
+            self.aciertos += 1
+            return False
+        self.fallos += 1
+        if huellas[i] == 0 or self.politica == 'siempre' or profundidad >= self.profundidades[i]:
+            self._guardar(i, huella, profundidad)
+        else:
+            self.colisiones += 1
+        return True
+
+    def _guardar(self, i, huella, profundidad):
+        if self.huellas[i] == 0:
+            self.ocupadas += 1
+        else:
+            self.colisiones += 1
+        self.huellas[i] = huella
+        self.profundidades[i] = profundidad
+
+    def estadisticas(self):
+        return {
+            'politica': self.politica,
+            'capacidad': self.tamano,
+            'ocupadas': self.ocupadas,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'colisiones': self.colisiones,
+            'memoria_bytes': self.memoria_bytes(),
+        }
+
+    def __len__(self):
+        return self.ocupadas
+
+    def __repr__(self):
+        return f"TablaTransposicion({self.tamano} entradas, {self.politica}, ocupadas={self.ocupadas})"
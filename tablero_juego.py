@@ -1,6 +1,7 @@
 # FlowFree/tablero_juego.py
 
 import copy
+import random
 
 class TableroJuego:
     """
@@ -11,11 +12,17 @@ class TableroJuego:
     - Letra de color (ej: 'R'): Punto de inicio/fin o parte de un camino.
     - '.' (punto): Celda vacía transitable.
     - '#' (almohadilla): Pared, no transitable.
+    Cada color crece desde sus dos extremos: 'caminos' va desde 'inicio' y
+    'caminos_fin' desde 'fin'. Cuando las dos cabezas se juntan, 'caminos' pasa a
+    tener el camino entero de 'inicio' a 'fin' y 'caminos_fin' vuelve a ser [fin].
     """
     CARACTER_VACIO = '.'
     CARACTER_PARED = '#'
 
-    def __init__(self, filas_cuadricula, pares_colores_originales=None, caminos_actuales=None):
+    EXTREMOS = ('inicio', 'fin')
+
+    def __init__(self, filas_cuadricula, pares_colores_originales=None, caminos_actuales=None,
+                 caminos_fin_actuales=None):
         if not filas_cuadricula:
             raise ValueError("Las filas de la cuadrícula no pueden estar vacías.")
 
@@ -23,16 +30,25 @@ class TableroJuego:
         self.ancho = len(filas_cuadricula[0])
         self.cuadricula_base_con_paredes = [list(fila) for fila in filas_cuadricula]
         self.cuadricula = [list(fila) for fila in filas_cuadricula] 
+        self._datos_nivel = None # Se crea bajo demanda (ver DatosNivel.desde_tablero)
 
         if pares_colores_originales is None:
             self.pares_colores = self._encontrar_pares_colores(self.cuadricula_base_con_paredes)
         else:
             self.pares_colores = pares_colores_originales
 
+        if caminos_fin_actuales is None:
+            self.caminos_fin = {
+                color: [detalles['fin']] for color, detalles in self.pares_colores.items()
+            }
+        else:
+            self.caminos_fin = caminos_fin_actuales
         if caminos_actuales is None:
             self.caminos = {
                 color: [detalles['inicio']] for color, detalles in self.pares_colores.items()
             }
+            if caminos_fin_actuales is not None:
+                self._actualizar_cuadricula_de_trabajo_desde_caminos()
         else:
             self.caminos = caminos_actuales
             self._actualizar_cuadricula_de_trabajo_desde_caminos()
@@ -40,7 +56,8 @@ class TableroJuego:
 
     def _actualizar_cuadricula_de_trabajo_desde_caminos(self):
         self.cuadricula = [list(fila) for fila in self.cuadricula_base_con_paredes]
-        for color, ruta in self.caminos.items():
+        rutas = list(self.caminos.items()) + list(self.caminos_fin.items())
+        for color, ruta in rutas:
             if not ruta: continue
             for f, c in ruta:
                 celda_base = self.cuadricula_base_con_paredes[f][c]
@@ -83,14 +100,9 @@ class TableroJuego:
         return estado_colores
 
     def mostrar_tablero_consola(self):
-        print("\n" + "-" * (self.ancho * 2 + 3))
-        for f in range(self.alto):
-            fila_str = "| "
-            for c in range(self.ancho):
-                fila_str += str(self.cuadricula[f][c]) + " "
-            fila_str += "|"
-            print(fila_str)
-        print("-" * (self.ancho * 2 + 3))
+        borde = "-" * (self.ancho * 2 + 3)
+        filas = ["| " + "".join(f"{celda} " for celda in fila) + "|" for fila in self.cuadricula]
+        print("\n" + "\n".join([borde] + filas + [borde])) # Una sola escritura
 
     def es_posicion_valida(self, f, c):
         return 0 <= f < self.alto and 0 <= c < self.ancho
@@ -114,11 +126,15 @@ class TableroJuego:
                     return False
         return True
 
-    def intentar_extender_camino(self, color_char, direccion):
+    def intentar_extender_camino(self, color_char, direccion, extremo='inicio'):
+        """Avanza un paso la cabeza del color que sale de 'extremo' ('inicio' o 'fin')."""
         if self.camino_esta_completo(color_char):
             return False, f"El camino del color {color_char} ya está completo."
+        if extremo not in self.EXTREMOS:
+            return False, "Extremo no válido."
 
-        camino_actual = self.caminos[color_char]
+        propios, contrarios = (self.caminos, self.caminos_fin) if extremo == 'inicio' else (self.caminos_fin, self.caminos)
+        camino_actual = propios[color_char]
         if not camino_actual: # No debería pasar si se inicializa con el punto de inicio
             return False, f"Error interno: Camino para {color_char} está vacío."
             
@@ -136,19 +152,19 @@ class TableroJuego:
             return False, "Movimiento fuera del tablero."
 
         valor_celda_destino = self.cuadricula[nf][nc]
-        punto_final_color_actual = self.pares_colores[color_char]['fin']
+        cabeza_contraria = contrarios[color_char][-1] # El 'fin' mientras no se dibuje desde él
 
         if valor_celda_destino == self.CARACTER_PARED:
             return False, "No se puede mover hacia una pared ('#')."
         
         if valor_celda_destino == self.CARACTER_VACIO:
             pass
-        elif (nf, nc) == punto_final_color_actual:
-            if self.cuadricula_base_con_paredes[nf][nc] != color_char:
-                return False, f"Error interno: El punto final esperado {nf},{nc} para {color_char} no es {color_char} en la base."
+        elif (nf, nc) == cabeza_contraria:
+            if valor_celda_destino != color_char:
+                return False, f"Error interno: La cabeza esperada {nf},{nc} para {color_char} no es {color_char} en la cuadrícula."
             pass
         elif valor_celda_destino == color_char:
-            if (nf,nc) in camino_actual: # Evita pisarse a sí mismo
+            if (nf,nc) in camino_actual or (nf,nc) in contrarios[color_char]: # Evita pisarse a sí mismo
                  return False, f"El camino de {color_char} no puede cruzarse a sí mismo."
             # Si no está en el camino actual pero es del mismo color (y no es el final), es un error o un estado inválido.
             return False, f"Celda ya ocupada por el mismo color {color_char} (pero no es el final ni parte del camino actual)."
@@ -156,15 +172,20 @@ class TableroJuego:
             return False, f"Celda ({nf},{nc}) ocupada por '{valor_celda_destino}' (otro color o camino)."
 
         self.cuadricula[nf][nc] = color_char
-        self.caminos[color_char].append((nf, nc))
-
-        if (nf, nc) == punto_final_color_actual:
+        if (nf, nc) == cabeza_contraria:
+            # Las dos cabezas se juntan: 'caminos' se queda con el camino entero de inicio a fin
+            if extremo == 'inicio':
+                self.caminos[color_char] = camino_actual + self.caminos_fin[color_char][::-1]
+            else:
+                self.caminos[color_char] = self.caminos[color_char] + camino_actual[::-1]
+            self.caminos_fin[color_char] = [self.pares_colores[color_char]['fin']]
             return True, f"¡Color {color_char} completado!"
+        camino_actual.append((nf, nc))
         return True, "Movimiento exitoso."
 
 
-    def deshacer_ultimo_paso(self, color_char):
-        camino = self.caminos.get(color_char)
+    def deshacer_ultimo_paso(self, color_char, extremo='inicio'):
+        camino = (self.caminos_fin if extremo == 'fin' else self.caminos).get(color_char)
         if not camino or len(camino) <= 1:
             return False, "No hay suficientes pasos para deshacer en este color."
 
@@ -191,14 +212,15 @@ class TableroJuego:
 
     def __eq__(self, otro):
         if not isinstance(otro, TableroJuego): return False
-        return self.cuadricula == otro.cuadricula and self.caminos == otro.caminos
+        return (self.cuadricula == otro.cuadricula and self.caminos == otro.caminos
+                and self.caminos_fin == otro.caminos_fin)
 
     def __hash__(self):
         cuadricula_tupla = tuple(map(tuple, self.cuadricula))
         caminos_items_ordenados = sorted(self.caminos.items())
         caminos_tupla_final = []
         for color, ruta_lista in caminos_items_ordenados:
-            caminos_tupla_final.append((color, tuple(ruta_lista)))
+            caminos_tupla_final.append((color, tuple(ruta_lista), tuple(self.caminos_fin.get(color, ()))))
         return hash((cuadricula_tupla, tuple(caminos_tupla_final)))
 
     def generar_copia_profunda(self):
@@ -207,10 +229,346 @@ class TableroJuego:
         nuevo_tablero = TableroJuego(
             filas_cuadricula_base_str,
             pares_colores_originales=self.pares_colores, 
-            caminos_actuales=caminos_copiados
+            caminos_actuales=caminos_copiados,
+            caminos_fin_actuales=copy.deepcopy(self.caminos_fin)
         )
+        nuevo_tablero._datos_nivel = self._datos_nivel
         return nuevo_tablero
 
+
+class DatosNivel:
+    """
+    Datos inmutables de un nivel, compartidos por todos los estados de búsqueda
+    que derivan de él: dimensiones, paredes, extremos de cada color, tabla de
+    vecinos y claves Zobrist. Se construye una sola vez por nivel y nunca se copia.
+    Las celdas se identifican con un índice plano: indice = fila * ancho + columna.
+    Cada color k tiene dos extremos que crecen: k (desde 'inicio') y k + n (desde
+    'fin'), con n el número de colores; parejas[e] es el índice del otro extremo.
+    """
+    __slots__ = ('alto', 'ancho', 'filas_base', 'pares_colores', 'colores',
+                 'indice_color', 'celdas_base', 'inicios', 'fines', 'vecinos',
+                 'parejas', 'zobrist_celda', 'zobrist_cabeza', 'derivados')
+
+    CODIGO_VACIO = 0
+    CODIGO_PARED = 255
+    SEMILLA_ZOBRIST = 0x5EED_F10F # Fija: los hashes son reproducibles entre procesos
+
+    def __init__(self, filas_base, pares_colores):
+        self.alto = len(filas_base)
+        self.ancho = len(filas_base[0])
+        self.filas_base = tuple(filas_base)
+        self.pares_colores = pares_colores
+        self.colores = tuple(pares_colores.keys())
+        if len(self.colores) >= self.CODIGO_PARED:
+            raise ValueError(f"Demasiados colores ({len(self.colores)}) para el estado compacto.")
+        self.indice_color = {color: k for k, color in enumerate(self.colores)}
+
+        ancho = self.ancho
+        celdas_base = bytearray(self.alto * ancho)
+        for f, fila in enumerate(self.filas_base):
+            for c, caracter in enumerate(fila):
+                if caracter == TableroJuego.CARACTER_PARED:
+                    celdas_base[f * ancho + c] = self.CODIGO_PARED
+                elif caracter != TableroJuego.CARACTER_VACIO:
+                    celdas_base[f * ancho + c] = self.indice_color[caracter] + 1
+        self.celdas_base = bytes(celdas_base)
+
+        self.inicios = tuple(f * ancho + c for f, c in (pares_colores[color]['inicio'] for color in self.colores))
+        self.fines = tuple(f * ancho + c for f, c in (pares_colores[color]['fin'] for color in self.colores))
+
+        vecinos = []
+        for i in range(self.alto * ancho):
+            f, c = divmod(i, ancho)
+            candidatos = []
+            if f > 0: candidatos.append(i - ancho)
+            if f < self.alto - 1: candidatos.append(i + ancho)
+            if c > 0: candidatos.append(i - 1)
+            if c < ancho - 1: candidatos.append(i + 1)
+            vecinos.append(tuple(v for v in candidatos if self.celdas_base[v] != self.CODIGO_PARED))
+        self.vecinos = tuple(vecinos)
+        self.parejas = self._calcular_parejas(len(self.colores))
+
+        generador = random.Random(self.SEMILLA_ZOBRIST)
+        total_celdas = self.alto * ancho
+        self.zobrist_celda = tuple(
+            tuple(generador.getrandbits(64) for _ in range(total_celdas)) for _ in self.colores
+        )
+        # Una tabla por extremo; las de los extremos 'fin' van después para no cambiar las demás
+        self.zobrist_cabeza = tuple(
+            tuple(generador.getrandbits(64) for _ in range(total_celdas)) for _ in range(2 * len(self.colores))
+        )
+        # Tablas derivadas que otros módulos calculan una sola vez por nivel (poda, heurísticas...)
+        self.derivados = {}
+
+    @classmethod
+    def desde_tablero(cls, tablero):
+        """Devuelve los datos del nivel de un tablero, creándolos una sola vez."""
+        if tablero._datos_nivel is None:
+            filas_base = ["".join(fila) for fila in tablero.cuadricula_base_con_paredes]
+            tablero._datos_nivel = cls(filas_base, tablero.pares_colores)
+        return tablero._datos_nivel
+
+    @staticmethod
+    def _calcular_parejas(num_colores):
+        return tuple(range(num_colores, 2 * num_colores)) + tuple(range(num_colores))
+
+    @classmethod
+    def desde_tablas(cls, filas_base, pares_colores, celdas_base, inicios, fines, vecinos,
+                     zobrist_celda, zobrist_cabeza):
+        """Reconstruye los datos a partir de tablas ya calculadas (ver niveles_compilados)."""
+        nivel = cls.__new__(cls)
+        nivel.alto = len(filas_base)
+        nivel.ancho = len(filas_base[0])
+        nivel.filas_base = tuple(filas_base)
+        nivel.pares_colores = pares_colores
+        nivel.colores = tuple(pares_colores.keys())
+        nivel.indice_color = {color: k for k, color in enumerate(nivel.colores)}
+        nivel.celdas_base = celdas_base
+        nivel.inicios = tuple(inicios)
+        nivel.fines = tuple(fines)
+        nivel.vecinos = vecinos
+        nivel.parejas = cls._calcular_parejas(len(nivel.colores))
+        nivel.zobrist_celda = zobrist_celda
+        nivel.zobrist_cabeza = zobrist_cabeza
+        nivel.derivados = {}
+        return nivel
+
+    def indice(self, f, c):
+        return f * self.ancho + c
+
+    def posicion(self, indice):
+        return divmod(indice, self.ancho)
+
+
+class EstadoBusqueda:
+    """
+    Estado compacto del tablero pensado para la búsqueda.
+    - celdas: bytearray plano con el código de cada celda (0 vacía, k+1 color k, 255 pared).
+    - caminos: lista por extremo con los índices planos de cada camino: en la
+      posición k el del color k desde 'inicio' y en la k + n el que crece desde
+      'fin' (n colores). Un color está completo cuando sus dos cabezas coinciden.
+    - hash_zobrist: hash de 64 bits que se actualiza en O(1) con cada paso.
+    Los datos fijos del nivel (paredes, extremos, vecinos) se comparten vía 'nivel'.
+    Dos estados son iguales si ocupan las mismas celdas con las mismas cabezas en
+    los colores sin terminar: el orden en que se dibujó cada camino, o por qué
+    lado se cerró, no cambia los movimientos futuros.
+    """
+    __slots__ = ('nivel', 'celdas', 'caminos', 'hash_zobrist', 'pendientes')
+
+    DESPLAZAMIENTOS = {'arriba': (-1, 0), 'abajo': (1, 0), 'izquierda': (0, -1), 'derecha': (0, 1)}
+
+    def __init__(self, nivel, celdas, caminos, hash_zobrist, pendientes):
+        self.nivel = nivel
+        self.celdas = celdas
+        self.caminos = caminos
+        self.hash_zobrist = hash_zobrist
+        self.pendientes = pendientes
+
+    @classmethod
+    def desde_tablero(cls, tablero):
+        nivel = DatosNivel.desde_tablero(tablero)
+        caminos = []
+        for extremo, rutas in (('inicio', tablero.caminos), ('fin', tablero.caminos_fin)):
+            for color in nivel.colores:
+                ruta = rutas.get(color) or [tablero.pares_colores[color][extremo]]
+                caminos.append([f * nivel.ancho + c for f, c in ruta])
+        return cls.desde_caminos(nivel, caminos)
+
+    @classmethod
+    def desde_caminos(cls, nivel, caminos):
+        """
+        Construye un estado a partir de caminos en índices planos: uno por extremo
+        (2n) o solo los que salen de 'inicio' (n), y entonces los de 'fin' no han crecido.
+        """
+        n = len(nivel.colores)
+        caminos = [list(camino) for camino in caminos]
+        if len(caminos) == n:
+            caminos += [[fin] for fin in nivel.fines]
+        celdas = bytearray(nivel.celdas_base)
+        for e, camino in enumerate(caminos):
+            for i in camino:
+                celdas[i] = e % n + 1
+        pendientes = sum(1 for k in range(n) if caminos[k][-1] != caminos[k + n][-1])
+        estado = cls(nivel, celdas, caminos, 0, pendientes)
+        estado.hash_zobrist = estado._calcular_hash()
+        return estado
+
+    def a_tablero(self):
+        """Convierte el estado en un TableroJuego equivalente (sin pérdida)."""
+        nivel = self.nivel
+        tablero = TableroJuego(list(nivel.filas_base), pares_colores_originales=nivel.pares_colores,
+                               caminos_actuales=self.caminos_por_color(),
+                               caminos_fin_actuales=self.caminos_fin_por_color())
+        tablero._datos_nivel = nivel
+        return tablero
+
+    def _calcular_hash(self):
+        """Recalcula el hash desde cero. Solo para conversiones y verificación."""
+        nivel = self.nivel
+        n = len(nivel.colores)
+        h = 0
+        for k in range(n):
+            claves = nivel.zobrist_celda[k]
+            for i in set(self.caminos[k]) | set(self.caminos[k + n]):
+                h ^= claves[i]
+            if not self.esta_completo(k): # Las cabezas de un color terminado no cuentan
+                h ^= nivel.zobrist_cabeza[k][self.caminos[k][-1]]
+                h ^= nivel.zobrist_cabeza[k + n][self.caminos[k + n][-1]]
+        return h
+
+    def copiar(self):
+        return EstadoBusqueda(self.nivel, bytearray(self.celdas), [list(c) for c in self.caminos],
+                              self.hash_zobrist, self.pendientes)
+
+    def cabeza(self, e):
+        return self.caminos[e][-1]
+
+    def esta_completo(self, e):
+        """True si el color del extremo e (o del color e) ya unió sus dos cabezas."""
+        return self.caminos[e][-1] == self.caminos[self.nivel.parejas[e]][-1]
+
+    def movimientos(self, e):
+        """Índices de las celdas a las que puede avanzar el extremo e."""
+        cabeza = self.caminos[e][-1]
+        objetivo = self.caminos[self.nivel.parejas[e]][-1]
+        if cabeza == objetivo:
+            return []
+        celdas = self.celdas
+        return [v for v in self.nivel.vecinos[cabeza] if celdas[v] == 0 or v == objetivo]
+
+    def extender(self, e, destino):
+        """
+        Avanza el extremo e a 'destino', que debe ser vecino de su cabeza. Si
+        'destino' es la cabeza del otro extremo, el color queda completo.
+        Devuelve False (sin modificar nada) si la celda no está libre.
+        """
+        camino = self.caminos[e]
+        cabeza = camino[-1]
+        nivel = self.nivel
+        pareja = nivel.parejas[e]
+        objetivo = self.caminos[pareja][-1]
+        if cabeza == objetivo:
+            return False
+        claves_cabeza = nivel.zobrist_cabeza[e]
+        if self.celdas[destino] == 0:
+            k = min(e, pareja)
+            self.celdas[destino] = k + 1
+            self.hash_zobrist ^= claves_cabeza[cabeza] ^ claves_cabeza[destino] ^ nivel.zobrist_celda[k][destino]
+        elif destino == objetivo:
+            # Se unen las dos cabezas: la celda ya estaba contada y las cabezas dejan de contar
+            self.pendientes -= 1
+            self.hash_zobrist ^= claves_cabeza[cabeza] ^ nivel.zobrist_cabeza[pareja][objetivo]
+        else:
+            return False
+        camino.append(destino)
+        return True
+
+    def deshacer(self, e):
+        """Retira el último paso del extremo e. Devuelve False si solo queda el punto de partida."""
+        camino = self.caminos[e]
+        if len(camino) <= 1:
+            return False
+        nivel = self.nivel
+        pareja = nivel.parejas[e]
+        celda = camino.pop()
+        claves_cabeza = nivel.zobrist_cabeza[e]
+        if celda == self.caminos[pareja][-1]: # Era el paso que unía las dos cabezas
+            self.pendientes += 1
+            self.hash_zobrist ^= claves_cabeza[camino[-1]] ^ nivel.zobrist_cabeza[pareja][celda]
+        else:
+            k = min(e, pareja)
+            self.celdas[celda] = 0
+            self.hash_zobrist ^= claves_cabeza[celda] ^ claves_cabeza[camino[-1]] ^ nivel.zobrist_celda[k][celda]
+        return True
+
+    def _extremo(self, color_char, extremo):
+        k = self.nivel.indice_color.get(color_char)
+        if k is None or extremo not in TableroJuego.EXTREMOS:
+            return None
+        return k if extremo == 'inicio' else k + len(self.nivel.colores)
+
+    def intentar_extender_camino(self, color_char, direccion, extremo='inicio'):
+        """Misma interfaz que TableroJuego.intentar_extender_camino."""
+        e = self._extremo(color_char, extremo)
+        if e is None:
+            return False, f"El color {color_char} no existe en el nivel."
+        if self.esta_completo(e):
+            return False, f"El camino del color {color_char} ya está completo."
+        if direccion not in self.DESPLAZAMIENTOS:
+            return False, "Dirección no válida."
+        df, dc = self.DESPLAZAMIENTOS[direccion]
+        f, c = divmod(self.cabeza(e), self.nivel.ancho)
+        nf, nc = f + df, c + dc
+        if not (0 <= nf < self.nivel.alto and 0 <= nc < self.nivel.ancho):
+            return False, "Movimiento fuera del tablero."
+        destino = nf * self.nivel.ancho + nc
+        if self.celdas[destino] == DatosNivel.CODIGO_PARED:
+            return False, "No se puede mover hacia una pared ('#')."
+        if not self.extender(e, destino):
+            return False, f"Celda ({nf},{nc}) ocupada."
+        if self.esta_completo(e):
+            return True, f"¡Color {color_char} completado!"
+        return True, "Movimiento exitoso."
+
+    def deshacer_ultimo_paso(self, color_char, extremo='inicio'):
+        """Misma interfaz que TableroJuego.deshacer_ultimo_paso."""
+        e = self._extremo(color_char, extremo)
+        if e is None or not self.deshacer(e):
+            return False, "No hay suficientes pasos para deshacer en este color."
+        return True, f"Último paso de {color_char} deshecho."
+
+    def esta_resuelto(self):
+        return self.pendientes == 0 and 0 not in self.celdas
+
+    def pasos_desde(self, raiz):
+        """
+        Pasos (e, celda) que llevan de 'raiz' (un estado anterior de la misma
+        búsqueda) a este. Repetidos en orden con extender() reconstruyen el estado:
+        cada paso ocupa una celda distinta, salvo el que une las dos cabezas de un
+        color, que va al final.
+        """
+        pasos = [(e, i) for e, camino in enumerate(self.caminos) for i in camino[len(raiz.caminos[e]):]]
+        pasos.sort(key=lambda paso: self.esta_completo(paso[0]) and paso[1] == self.caminos[paso[0]][-1])
+        return pasos
+
+    def caminos_por_color(self):
+        """
+        Caminos en el formato de TableroJuego.caminos: {color: [(f, c), ...]} desde
+        'inicio'. En los colores completos es el camino entero hasta 'fin'.
+        """
+        ancho = self.nivel.ancho
+        n = len(self.nivel.colores)
+        caminos = {}
+        for k, color in enumerate(self.nivel.colores):
+            ruta = self.caminos[k]
+            if ruta[-1] == self.caminos[k + n][-1]:
+                ruta = ruta + self.caminos[k + n][-2::-1]
+            caminos[color] = [divmod(i, ancho) for i in ruta]
+        return caminos
+
+    def caminos_fin_por_color(self):
+        """Formato de TableroJuego.caminos_fin: lo que creció desde 'fin' en los colores sin terminar."""
+        ancho = self.nivel.ancho
+        n = len(self.nivel.colores)
+        return {color: ([divmod(i, ancho) for i in self.caminos[k + n]] if not self.esta_completo(k)
+                        else [divmod(self.nivel.fines[k], ancho)])
+                for k, color in enumerate(self.nivel.colores)}
+
+    def __eq__(self, otro):
+        if not isinstance(otro, EstadoBusqueda): return False
+        if self.hash_zobrist != otro.hash_zobrist or self.celdas != otro.celdas: return False
+        n = len(self.nivel.colores)
+        for k in range(n):
+            if self.esta_completo(k) and otro.esta_completo(k):
+                continue
+            if (self.caminos[k][-1] != otro.caminos[k][-1]
+                    or self.caminos[k + n][-1] != otro.caminos[k + n][-1]):
+                return False
+        return True
+
+    def __hash__(self):
+        return self.hash_zobrist
+
 # --- Funciones auxiliares ---
 def cargar_nivel_desde_archivo(ruta_archivo):
     try:
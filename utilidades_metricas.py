@@ -1,3 +1,280 @@
-#Cantidades de colores restantes por completar
-#cantidad de celdas vacias
-#
\ No newline at end of file
+# FlowFree/utilidades_metricas.py
+"""
+Métricas de resolución: contadores, reparto del tiempo y memoria de un solve.
+
+- Metricas: se pasa a resolver(..., metricas=Metricas()) y recoge nodos generados
+  y expandidos, muestras del tamaño de la frontera a lo largo del tiempo, nodos/s,
+  el tiempo gastado en generar movimientos, copiar estados, comprobar huellas
+  (hash), podar, propagar movimientos forzados y evaluar heurísticas, el pico de
+  memoria (RSS y, si se pide, tracemalloc) y las podas por regla.
+- METRICAS_NULAS: la variante apagada que usa ContextoBusqueda por defecto. Sus
+  métodos no hacen nada y envolver() devuelve la función sin tocar, así que el
+  bucle de búsqueda no paga nada por las métricas cuando no se piden.
+- instrumentar(): mide métodos de cualquier clase (p. ej. TableroJuego) mientras dure un bloque.
+- perfilar() y MuestreadorPila: cProfile o muestreo de pila para un solve concreto.
+
+También incluye las dos métricas de tablero de siempre: colores restantes por
+completar y celdas vacías.
+"""
+import csv
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+try:
+    import resource
+    RESOURCE_DISPONIBLE = True
+except ImportError: # Windows
+    RESOURCE_DISPONIBLE = False
+
+SECCIONES = ('generacion', 'copia', 'hash', 'poda', 'propagacion', 'heuristica')
+
+
+# --- Métricas de tablero ---
+
+def colores_restantes(tablero):
+    """Colores sin terminar de un TableroJuego o EstadoBusqueda."""
+    if hasattr(tablero, 'pendientes'):
+        return tablero.pendientes
+    return sum(1 for color in tablero.pares_colores if not tablero.camino_esta_completo(color))
+
+
+def celdas_vacias(tablero):
+    """Celdas vacías de un TableroJuego o EstadoBusqueda."""
+    if hasattr(tablero, 'celdas'):
+        return tablero.celdas.count(0)
+    return sum(fila.count(tablero.CARACTER_VACIO) for fila in tablero.cuadricula)
+
+
+def rss_pico_mb():
+    """Pico de memoria residente del proceso en MB (None si no se puede medir)."""
+    if not RESOURCE_DISPONIBLE:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux da KB; macOS, bytes
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+class MetricasNulas:
+    """Métricas apagadas: misma interfaz que Metricas, sin coste."""
+    activo = False
+
+    def iniciar(self):
+        pass
+
+    def envolver(self, seccion, funcion):
+        return funcion
+
+    def muestrear(self, ctx):
+        pass
+
+    def registrar_resultado(self, resultado):
+        pass
+
+    @contextmanager
+    def instrumentar(self, objetivo, *nombres):
+        yield self
+
+
+METRICAS_NULAS = MetricasNulas()
+
+
+class Metricas:
+    """
+    Recoge las métricas de un solve. 'usar_tracemalloc' mide también el pico de
+    memoria de Python (más preciso que el RSS, pero ralentiza la búsqueda).
+    """
+    activo = True
+
+    def __init__(self, usar_tracemalloc=False):
+        self.usar_tracemalloc = usar_tracemalloc
+        self.tiempos = defaultdict(float) # seccion -> segundos
+        self.llamadas = Counter() # seccion -> veces
+        self.muestras_frontera = [] # (segundos, nodos_expandidos, nodos_generados, tamano)
+        self.resultado = None
+        self.tracemalloc_pico_mb = None
+        self.inicio = None
+
+    def iniciar(self):
+        self.inicio = time.perf_counter()
+        if self.usar_tracemalloc:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+
+    def envolver(self, seccion, funcion):
+        """Devuelve 'funcion' midiendo su tiempo y sus llamadas en 'seccion'."""
+        tiempos, llamadas, reloj = self.tiempos, self.llamadas, time.perf_counter
+
+        def medida(*args):
+            t0 = reloj()
+            try:
+                return funcion(*args)
+            finally:
+                tiempos[seccion] += reloj() - t0
+                llamadas[seccion] += 1
+        medida.__wrapped__ = funcion
+        return medida
+
+    def muestrear(self, ctx):
+        """Anota el tamaño de la frontera; ContextoBusqueda llama cada INTERVALO_COMPROBACION nodos."""
+        if self.inicio is None:
+            self.iniciar()
+        self.muestras_frontera.append((time.perf_counter() - self.inicio, ctx.nodos_expandidos,
+                                       ctx.nodos_generados, ctx.frontera_actual))
+
+    def registrar_resultado(self, resultado):
+        self.resultado = resultado
+        if self.usar_tracemalloc and tracemalloc.is_tracing():
+            self.tracemalloc_pico_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+
+    @contextmanager
+    def instrumentar(self, objetivo, *nombres):
+        """
+        Mide los métodos 'nombres' de 'objetivo' (clase u objeto) dentro del bloque:
+
+            with metricas.instrumentar(TableroJuego, 'generar_copia_profunda', '__hash__'):
+                ...
+        Cada método cuenta como su propia sección.
+        """
+        originales = {nombre: objetivo.__dict__.get(nombre) for nombre in nombres}
+        for nombre in nombres:
+            setattr(objetivo, nombre, self.envolver(nombre, getattr(objetivo, nombre)))
+        try:
+            yield self
+        finally:
+            for nombre, original in originales.items():
+                if original is None:
+                    delattr(objetivo, nombre)
+                else:
+                    setattr(objetivo, nombre, original)
+
+    def nodos_por_segundo(self):
+        if self.resultado is None or not self.resultado.tiempo_segundos:
+            return None
+        return self.resultado.nodos_expandidos / self.resultado.tiempo_segundos
+
+    def resumen(self):
+        resultado = self.resultado
+        tiempo = resultado.tiempo_segundos if resultado else None
+        return {
+            'algoritmo': resultado.algoritmo if resultado else None,
+            'motivo': resultado.motivo if resultado else None,
+            'nodos_expandidos': resultado.nodos_expandidos if resultado else 0,
+            'nodos_generados': resultado.nodos_generados if resultado else 0,
+            'frontera_maxima': resultado.frontera_maxima if resultado else 0,
+            'tiempo_segundos': tiempo,
+            'nodos_por_segundo': self.nodos_por_segundo(),
+            'tiempos': dict(self.tiempos),
+            'llamadas': dict(self.llamadas),
+            'fraccion_tiempo': ({s: t / tiempo for s, t in self.tiempos.items()} if tiempo else {}),
+            'rss_pico_mb': rss_pico_mb(),
+            'memoria_pico_mb': resultado.memoria_pico_mb if resultado else None,
+            'tracemalloc_pico_mb': self.tracemalloc_pico_mb,
+            'podas': dict(resultado.podas) if resultado and resultado.podas else {},
+            'muestras_frontera': len(self.muestras_frontera),
+        }
+
+    def a_json(self, ruta, con_muestras=True):
+        datos = self.resumen()
+        if con_muestras:
+            datos['muestras_frontera'] = [list(m) for m in self.muestras_frontera]
+        with open(ruta, 'w') as f:
+            json.dump(datos, f, indent=2, ensure_ascii=False)
+
+    def a_csv(self, ruta):
+        """Resumen aplanado en filas 'metrica,valor' (p. ej. 'tiempos.copia,0.12')."""
+        with open(ruta, 'w', newline='') as f:
+            escritor = csv.writer(f)
+            escritor.writerow(['metrica', 'valor'])
+            for clave, valor in self.resumen().items():
+                if isinstance(valor, dict):
+                    for subclave, subvalor in sorted(valor.items()):
+                        escritor.writerow([f"{clave}.{subclave}", subvalor])
+                else:
+                    escritor.writerow([clave, valor])
+
+    def frontera_a_csv(self, ruta):
+        with open(ruta, 'w', newline='') as f:
+            escritor = csv.writer(f)
+            escritor.writerow(['segundos', 'nodos_expandidos', 'nodos_generados', 'tamano_frontera'])
+            escritor.writerows(self.muestras_frontera)
+
+    def __str__(self):
+        datos = self.resumen()
+        lineas = [f"{datos['algoritmo']}: {datos['motivo']} en {datos['tiempo_segundos'] or 0:.3f}s, "
+                  f"{datos['nodos_expandidos']} expandidos ({datos['nodos_por_segundo'] or 0:.0f} nodos/s)"]
+        for seccion, segundos in sorted(self.tiempos.items(), key=lambda x: -x[1]):
+            lineas.append(f"  {seccion:<24} {segundos:8.3f}s  {self.llamadas[seccion]:>10} llamadas")
+        if datos['podas']:
+            lineas.append("  podas: " + ', '.join(f"{r}={n}" for r, n in datos['podas'].items()))
+        return '\n'.join(lineas)
+
+
+# --- Perfilado de un solve ---
+
+def perfilar(funcion, *args, ordenar='cumulative', lineas=30, ruta=None, **kwargs):
+    """
+    Ejecuta funcion(*args, **kwargs) bajo cProfile. Devuelve (resultado, informe)
+    con las 'lineas' primeras funciones por 'ordenar'; 'ruta' guarda el .prof.
+    """
+    perfil = cProfile.Profile()
+    resultado = perfil.runcall(funcion, *args, **kwargs)
+    if ruta:
+        perfil.dump_stats(ruta)
+    salida = io.StringIO()
+    pstats.Stats(perfil, stream=salida).sort_stats(ordenar).print_stats(lineas)
+    return resultado, salida.getvalue()
+
+
+class MuestreadorPila:
+    """
+    Perfilador por muestreo: un hilo mira cada 'intervalo' segundos qué función
+    ejecuta el hilo que lo creó. Cuesta mucho menos que cProfile.
+
+        with MuestreadorPila() as muestreo:
+            resolver(tablero, 'dfs')
+        print(muestreo.informe())
+    """
+    def __init__(self, intervalo=0.005):
+        self.intervalo = intervalo
+        self.muestras = Counter() # (archivo, línea, función) -> veces
+        self.total = 0
+        self._hilo_objetivo = None
+        self._parar = threading.Event()
+        self._hilo = None
+
+    def __enter__(self):
+        self._hilo_objetivo = threading.get_ident()
+        self._parar.clear()
+        self._hilo = threading.Thread(target=self._muestrear, daemon=True)
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self._hilo.join()
+        return False
+
+    def _muestrear(self):
+        while not self._parar.wait(self.intervalo):
+            marco = sys._current_frames().get(self._hilo_objetivo)
+            if marco is not None:
+                codigo = marco.f_code
+                linea = marco.f_lineno or codigo.co_firstlineno
+                self.muestras[(codigo.co_filename, linea, codigo.co_name)] += 1
+                self.total += 1
+
+    def informe(self, lineas=20):
+        filas = [f"{self.total} muestras"]
+        for (archivo, linea, funcion), veces in self.muestras.most_common(lineas):
+            filas.append(f"{100 * veces / max(1, self.total):6.1f}%  {funcion} ({archivo}:{linea})")
+        return '\n'.join(filas)